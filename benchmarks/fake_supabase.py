@@ -0,0 +1,373 @@
+"""
+In-memory stand-in for the slice of the supabase-py client this repo uses:
+table().select/insert/upsert/update/delete with eq/neq/gt/gte/lt/lte/in_/is_/not_/or_,
+order/limit/range, count="exact"/head=True, and rpc() for the SQL functions in sql/.
+eq/in_ filters use lazily built hash indexes (like the real table's indexes); other
+filters and ordering are linear scans, so absolute query times are not Postgres
+times — the point is to measure this codebase's own overhead. `latency` adds a
+fixed delay per execute() to model the network round trip to Supabase.
+"""
+
+import os
+import re
+import sys
+import threading
+import time
+import uuid
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "tools"))
+
+# One PostgREST filter parser for both stand-ins, so they cannot drift apart
+from sqlite_store import parse_filter  # noqa: E402
+
+
+class Result:
+    def __init__(self, data, count=None):
+        self.data = data
+        self.count = count
+
+
+_OPS = {
+    "eq": lambda a, b: a == b,
+    "neq": lambda a, b: a != b,
+    "gt": lambda a, b: a is not None and a > b,
+    "gte": lambda a, b: a is not None and a >= b,
+    "lt": lambda a, b: a is not None and a < b,
+    "lte": lambda a, b: a is not None and a <= b,
+    "is": lambda a, b: a is None if b == "null" else a == b,
+}
+
+
+def _predicate(node):
+    """sqlite_store.parse_filter() tree → predicate(row)."""
+    if len(node) == 2:
+        preds = [_predicate(child) for child in node[1]]
+        combine = all if node[0] == "and" else any
+        return lambda row: combine(p(row) for p in preds)
+    column, op, value = node
+    return lambda row: _OPS[op](row.get(column), value)
+
+
+class Table:
+    def __init__(self, name):
+        self.name = name
+        self.rows = []
+        self.lock = threading.Lock()
+        self._unique = {}   # conflict columns → {key: row}
+        self._columns = {}  # column → {value: [rows]}
+
+    def index(self, columns):
+        if columns not in self._unique:
+            self._unique[columns] = {tuple(r.get(c) for c in columns): r for r in self.rows}
+        return self._unique[columns]
+
+    def _column_index(self, column):
+        if column not in self._columns:
+            idx = {}
+            for r in self.rows:
+                idx.setdefault(r.get(column), []).append(r)
+            self._columns[column] = idx
+        return self._columns[column]
+
+    def estimate(self, column, values):
+        idx = self._column_index(column)
+        return sum(len(idx.get(v, ())) for v in values)
+
+    def lookup(self, column, values):
+        """Rows whose `column` is one of `values`."""
+        idx = self._column_index(column)
+        return [r for v in values for r in idx.get(v, ())]
+
+    def add(self, row):
+        self.rows.append(row)
+        for columns, idx in self._unique.items():
+            idx[tuple(row.get(c) for c in columns)] = row
+        for column, idx in self._columns.items():
+            idx.setdefault(row.get(column), []).append(row)
+
+    def reindex(self):
+        self._unique.clear()
+        self._columns.clear()
+
+
+class Query:
+    def __init__(self, client, table):
+        self.client = client
+        self.table = table
+        self.action = "select"
+        self.columns = None
+        self.count = None
+        self.head = False
+        self.filters = []
+        self.orders = []
+        self.limit_n = None
+        self.offset = 0
+        self.payload = None
+        self.on_conflict = None
+        self.lookups = []   # (column, values) from eq/in_, served by Table.lookup
+        self._negate = False
+
+    # --- actions ---
+    def select(self, columns="*", count=None, head=False):
+        self.columns = None if columns.strip() == "*" else [c.strip() for c in columns.split(",")]
+        self.count = count
+        self.head = head
+        return self
+
+    def insert(self, rows):
+        self.action, self.payload = "insert", rows
+        return self
+
+    def upsert(self, rows, on_conflict=None, **kwargs):
+        self.action, self.payload, self.on_conflict = "upsert", rows, on_conflict
+        return self
+
+    def update(self, values):
+        self.action, self.payload = "update", values
+        return self
+
+    def delete(self):
+        self.action = "delete"
+        return self
+
+    # --- filters ---
+    @property
+    def not_(self):
+        self._negate = True
+        return self
+
+    def _filter(self, pred, lookup=None):
+        if self._negate:
+            self._negate = False
+            self.filters.append(lambda row: not pred(row))
+        else:
+            self.filters.append(pred)
+            if lookup:
+                self.lookups.append(lookup)
+        return self
+
+    def eq(self, column, value):
+        return self._filter(lambda row: row.get(column) == value, (column, [value]))
+
+    def neq(self, column, value):
+        return self._filter(lambda row: row.get(column) != value)
+
+    def gt(self, column, value):
+        return self._filter(lambda row: _OPS["gt"](row.get(column), value))
+
+    def gte(self, column, value):
+        return self._filter(lambda row: _OPS["gte"](row.get(column), value))
+
+    def lt(self, column, value):
+        return self._filter(lambda row: _OPS["lt"](row.get(column), value))
+
+    def lte(self, column, value):
+        return self._filter(lambda row: _OPS["lte"](row.get(column), value))
+
+    def in_(self, column, values):
+        values = set(values)
+        return self._filter(lambda row: row.get(column) in values, (column, values))
+
+    def is_(self, column, value):
+        return self._filter(lambda row: _OPS["is"](row.get(column), value))
+
+    def or_(self, expr):
+        return self._filter(_predicate(parse_filter(f"or({expr})")))
+
+    # --- shaping ---
+    def order(self, column, desc=False):
+        self.orders.append((column, desc))
+        return self
+
+    def limit(self, n):
+        self.limit_n = n
+        return self
+
+    def range(self, start, end):
+        self.offset, self.limit_n = start, end - start + 1
+        return self
+
+    # --- execution ---
+    def _matching(self):
+        rows = self.table.rows
+        if self.lookups:
+            # Narrow by the most selective indexed filter, then check everything
+            column, values = min(self.lookups, key=lambda lk: self.table.estimate(*lk))
+            rows = self.table.lookup(column, values)
+        return [r for r in rows if all(f(r) for f in self.filters)]
+
+    def execute(self):
+        if self.client.latency:
+            time.sleep(self.client.latency)
+        with self.table.lock:
+            result = getattr(self, "_" + self.action)()
+        if self.action != "select":
+            self.client.bump_version(self.table.name)
+        return result
+
+    def _select(self):
+        rows = self._matching()
+        total = len(rows) if self.count else None
+        if self.head:
+            return Result([], total)
+        for column, desc in reversed(self.orders):
+            rows.sort(key=lambda r: (r.get(column) is None, r.get(column) or ""), reverse=desc)
+        end = None if self.limit_n is None else self.offset + self.limit_n
+        rows = rows[self.offset:end]
+        if self.columns:
+            rows = [{c: r.get(c) for c in self.columns} for r in rows]
+        else:
+            rows = [dict(r) for r in rows]
+        return Result(rows, total)
+
+    def _insert(self):
+        rows = self.payload if isinstance(self.payload, list) else [self.payload]
+        out = []
+        for row in rows:
+            row = {"id": str(uuid.uuid4()), **row}
+            self.table.add(row)
+            out.append(dict(row))
+        return Result(out)
+
+    def _upsert(self):
+        if not self.on_conflict:
+            return self._insert()
+        columns = tuple(c.strip() for c in self.on_conflict.split(","))
+        idx = self.table.index(columns)
+        rows = self.payload if isinstance(self.payload, list) else [self.payload]
+        out = []
+        for row in rows:
+            existing = idx.get(tuple(row.get(c) for c in columns))
+            if existing is not None:
+                existing.update(row)
+                out.append(dict(existing))
+            else:
+                row = {"id": str(uuid.uuid4()), **row}
+                self.table.add(row)
+                out.append(dict(row))
+        return Result(out)
+
+    def _update(self):
+        rows = self._matching()
+        for row in rows:
+            row.update(self.payload)
+        self.table.reindex()
+        return Result([dict(r) for r in rows])
+
+    def _delete(self):
+        doomed = self._matching()
+        ids = {id(r) for r in doomed}
+        self.table.rows = [r for r in self.table.rows if id(r) not in ids]
+        self.table.reindex()
+        return Result([dict(r) for r in doomed])
+
+
+class RPC:
+    def __init__(self, client, name, params):
+        self.client = client
+        self.name = name
+        self.params = params or {}
+
+    def execute(self):
+        if self.client.latency:
+            time.sleep(self.client.latency)
+        return Result(getattr(self.client, "_rpc_" + self.name)(**self.params))
+
+
+class FakeSupabase:
+    """Drop-in for supabase_client's shared client: `supabase_client._client = FakeSupabase()`."""
+
+    def __init__(self, latency=0.0):
+        self.latency = latency
+        self.tables = {}
+        self._tables_lock = threading.Lock()
+        self.postgrest = self
+
+    def _table(self, name):
+        with self._tables_lock:
+            if name not in self.tables:
+                self.tables[name] = Table(name)
+            return self.tables[name]
+
+    def table(self, name):
+        return Query(self, self._table(name))
+
+    def bump_version(self, key):
+        """The statement-level triggers from sql/007."""
+        if key not in ("circulars", "bookmarks"):
+            return
+        table = self._table("data_versions")
+        with table.lock:
+            for row in table.rows:
+                if row["key"] == key:
+                    row["version"] += 1
+                    return
+            table.add({"key": key, "version": 1})
+
+    def rpc(self, name, params=None):
+        return RPC(self, name, params)
+
+    # --- SQL functions (sql/003, 005, 006) ---
+    def _circulars(self):
+        table = self._table("circulars")
+        with table.lock:
+            return list(table.rows)
+
+    def _rpc_search_circulars(self, q, source_filter=None, page_size=20, page_offset=0):
+        terms = [t.lower() for t in re.findall(r"\w+", q)]
+        hits = []
+        for row in self._circulars():
+            if source_filter and row.get("source") != source_filter:
+                continue
+            text = " ".join(str(row.get(f) or "") for f in ("title", "circular_number", "body_text")).lower()
+            rank = sum(text.count(t) for t in terms)
+            if terms and all(t in text for t in terms):
+                hits.append((rank, row))
+        hits.sort(key=lambda h: (h[0], h[1].get("published_date") or "", h[1]["id"]), reverse=True)
+        fields = ("id", "title", "circular_number", "published_date", "source", "category",
+                  "pdf_url", "detail_url")
+        return [
+            {**{f: row.get(f) for f in fields}, "rank": float(rank), "total": len(hits)}
+            for rank, row in hits[page_offset:page_offset + page_size]
+        ]
+
+    def _rpc_refresh_circular_stats(self):
+        return None
+
+    def _rpc_circular_stats(self, window_days=14):
+        cutoff = (date.today() - timedelta(days=window_days)).isoformat()
+        by_source, by_category, by_day = {}, {}, {}
+        total = 0
+        for row in self._circulars():
+            if (row.get("published_date") or "") < cutoff:
+                continue
+            source, category = row.get("source"), (row.get("category") or "").strip()
+            total += 1
+            by_source[source] = by_source.get(source, 0) + 1
+            if category:
+                by_category[(source, category)] = by_category.get((source, category), 0) + 1
+            by_day[(row["published_date"], source)] = by_day.get((row["published_date"], source), 0) + 1
+        return {
+            "by_source": by_source,
+            "by_category": [
+                {"source": s, "category": c, "count": n}
+                for (s, c), n in sorted(by_category.items(), key=lambda kv: (-kv[1], kv[0]))
+            ],
+            "by_day": [{"date": d, "source": s, "count": n} for (d, s), n in sorted(by_day.items())],
+            "total": total,
+        }
+
+    def _rpc_refresh_circular_categories(self, sources=None):
+        counts = {}
+        for row in self._circulars():
+            category = (row.get("category") or "").strip()
+            if category and (not sources or row.get("source") in sources):
+                key = (row["source"], category)
+                counts[key] = counts.get(key, 0) + 1
+        table = self._table("circular_categories")
+        with table.lock:
+            table.rows = [r for r in table.rows if sources and r["source"] not in sources]
+            table.rows += [{"source": s, "category": c, "n": n} for (s, c), n in counts.items()]
+            table.reindex()
+        return None
@@ -0,0 +1,131 @@
+"""
+Benchmark fixtures: exchange responses in the shapes the scrapers parse.
+Item templates come from benchmarks/fixtures/*.json when a recorded response has
+been saved there (see RECORDED), otherwise from the built-in samples below, which
+mirror the field names confirmed in scrape_nse / scrape_bse / scrape_sebi.
+Templates are cycled with unique IDs and dates spread over `span_days` back from today,
+so any number of circulars can be produced.
+"""
+
+import html
+import json
+import os
+from datetime import datetime, timedelta
+
+FIXTURE_DIR = os.path.join(os.path.dirname(__file__), "fixtures")
+
+# Recorded responses, if present: NSE /api/circulars JSON, BSE GetDataCirToListComp JSON
+RECORDED = {
+    "NSE": "nse_circulars.json",
+    "BSE": "bse_circulars.json",
+}
+
+NSE_SAMPLE = {
+    "sub": "Listing of further issues of {n} Limited",
+    "cirDate": "20260220",
+    "cirDisplayDate": "February 20, 2026",
+    "circFilelink": "/content/circulars/CMPL{n}.pdf",
+    "circDisplayNo": "NSE/CML/{n}",
+    "circCategory": "Listing",
+    "circDepartment": "Listing",
+    "circFilename": "CMPL{n}.pdf",
+    "fileExt": "pdf",
+}
+
+BSE_SAMPLE = {
+    "mr_heading": "Revision in margin requirements for scrip {n}",
+    "mr_date": "20/02/2026",
+    "articleid": "{n}",
+}
+
+SEBI_TITLES = (
+    "Framework for {n} in the securities market",
+    "Master Circular on {n} for stock brokers",
+    "Guidelines for disclosures by listed entity {n}",
+)
+
+CATEGORIES = ("Listing", "Surveillance", "Trading", "Clearing", "Inspection", "Legal")
+
+
+def _load_template(source, sample):
+    path = os.path.join(FIXTURE_DIR, RECORDED.get(source, ""))
+    if source in RECORDED and os.path.exists(path):
+        with open(path) as f:
+            data = json.load(f)
+        items = data.get("data" if source == "NSE" else "Table", []) if isinstance(data, dict) else data
+        if items:
+            return items
+    return [sample]
+
+
+def _dates(n, span_days):
+    today = datetime.now()
+    return [today - timedelta(days=i * span_days // max(n, 1)) for i in range(n)]
+
+
+def _fill(template, n):
+    return {k: v.replace("{n}", str(n)) if isinstance(v, str) else v for k, v in template.items()}
+
+
+def nse_listing(n, span_days=365):
+    """Body of NSE /api/circulars: {"data": [...]}."""
+    templates = _load_template("NSE", NSE_SAMPLE)
+    items = []
+    for i, day in enumerate(_dates(n, span_days)):
+        item = _fill(templates[i % len(templates)], 100000 + i)
+        item["cirDate"] = day.strftime("%Y%m%d")
+        item["cirDisplayDate"] = day.strftime("%B %d, %Y")
+        item["circFilelink"] = f"/content/circulars/CMPL{100000 + i}.pdf"
+        item["circDisplayNo"] = f"NSE/BENCH/{100000 + i}"
+        item["circCategory"] = CATEGORIES[i % len(CATEGORIES)]
+        items.append(item)
+    return json.dumps({"data": items}).encode()
+
+
+def bse_listing(n, span_days=365):
+    """Body of BSE GetDataCirToListComp: {"Table": [...]}."""
+    templates = _load_template("BSE", BSE_SAMPLE)
+    items = []
+    for i, day in enumerate(_dates(n, span_days)):
+        item = _fill(templates[i % len(templates)], 200000 + i)
+        item["mr_date"] = day.strftime("%d/%m/%Y")
+        item["articleid"] = str(200000 + i)
+        items.append(item)
+    return json.dumps({"Table": items}).encode()
+
+
+def sebi_listing(n, span_days=365):
+    """Body of SEBI getnewslistinfo.jsp: an HTML table fragment, then '#@#' and paging data."""
+    rows = []
+    for i, day in enumerate(_dates(n, span_days)):
+        cid = 300000 + i
+        title = html.escape(SEBI_TITLES[i % len(SEBI_TITLES)].replace("{n}", str(cid)))
+        rows.append(
+            f"<tr role='row' class='odd'><td>{day.strftime('%b %d, %Y')}</td>"
+            f"<td><a href='/legal/circulars/{day.strftime('%b-%Y').lower()}/circular_{cid}.html' "
+            f"title='{title}'>{title}</a></td></tr>"
+        )
+    return (
+        "<table id='sample_1' class='table'><tbody>" + "".join(rows) + "</tbody></table>"
+        f"#@#{n}#@#1"
+    ).encode()
+
+
+def sebi_detail(circular_id, base_url):
+    """SEBI detail page: the PDF is the `file` parameter of the viewer iframe."""
+    pdf = f"{base_url}/sebi_data/attachdocs/bench/{circular_id}.pdf"
+    return (
+        "<html><head><title>Circular</title></head><body><div class='main_full'>"
+        f"<h1>Circular {circular_id}</h1>"
+        f"<iframe src='../../../web/?file={pdf}' width='100%'></iframe>"
+        "</div></body></html>"
+    ).encode()
+
+
+def bse_detail(notice_id):
+    """BSE detail page: a DownloadAttach.aspx link to the attachment."""
+    return (
+        "<html><body><table><tr><td class='TTHeadergrey'>Notice</td></tr>"
+        f"<tr><td><a href='/markets/MarketInfo/DownloadAttach.aspx?id={notice_id}.pdf' "
+        "target='_blank'>Attachment</a></td></tr></table></body></html>"
+    ).encode()
@@ -0,0 +1,284 @@
+"""
+Offline benchmark suite: scrapers, PDF resolution, store_circulars, the full
+pipeline and the main API endpoints, at several archive sizes, without touching
+the exchanges or Supabase.
+
+Exchange sites are replaced by local stand-ins (stand_in.py) serving generated
+responses (fixtures.py); Supabase is replaced by an in-memory fake (fake_supabase.py),
+or with --store sqlite by the embedded backend (tools/sqlite_store.py).
+Local caches and pipeline state go to a temporary directory.
+
+Usage:
+    python benchmarks/run_benchmarks.py                        # 1k, 10k, 100k circulars
+    python benchmarks/run_benchmarks.py --sizes 1000 --repeat 10
+    python benchmarks/run_benchmarks.py --latency-ms 50 --db-latency-ms 20
+    python benchmarks/run_benchmarks.py --production-rates     # keep detail-page rate limits
+    python benchmarks/run_benchmarks.py --json .tmp/bench.json
+    python benchmarks/run_benchmarks.py --store sqlite          # embedded backend (sqlite_store.py)
+
+Reports p50/p95 wall time per call and throughput (circulars/s, or requests/s for
+API endpoints). Sizes are circulars per exchange; store and pipeline rows cover all three.
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import sys
+import tempfile
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+TOOLS_DIR = os.path.join(BENCH_DIR, "..", "tools")
+sys.path.insert(0, BENCH_DIR)
+sys.path.insert(0, TOOLS_DIR)
+
+# Keep caches/state out of .tmp/, and never call out to a deployed API or bucket
+_WORKDIR = tempfile.mkdtemp(prefix="circulars-bench-")
+os.environ["PDF_URL_CACHE_PATH"] = os.path.join(_WORKDIR, "pdf_url_cache.db")
+os.environ["PIPELINE_STATE_DIR"] = _WORKDIR
+os.environ["PDF_CACHE_DIR"] = os.path.join(_WORKDIR, "pdf_cache")
+for var in ("API_BASE_URL", "PDF_STORAGE_BUCKET", "CACHE_INVALIDATE_TOKEN"):
+    os.environ.pop(var, None)
+
+import pdf_resolver  # noqa: E402
+import pdf_url_cache  # noqa: E402
+import pipeline_engine  # noqa: E402
+import response_cache  # noqa: E402
+import scrape_bse  # noqa: E402
+import scrape_nse  # noqa: E402
+import scrape_sebi  # noqa: E402
+import sqlite_store  # noqa: E402
+import store_circulars  # noqa: E402
+import supabase_client  # noqa: E402
+
+import stand_in  # noqa: E402
+from fake_supabase import FakeSupabase  # noqa: E402
+
+DEFAULT_SIZES = (1_000, 10_000, 100_000)
+SPAN_DAYS = 365
+UNTHROTTLED = 1e6
+STORES = ("fake", "sqlite")
+
+
+@contextlib.contextmanager
+def quiet():
+    """Swallow the tools' progress prints while a call is being timed."""
+    with contextlib.redirect_stdout(io.StringIO()):
+        yield
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    rank = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered) + 0.5) - 1))
+    return ordered[rank]
+
+
+def measure(fn, repeat, setup=None):
+    """Time `fn(state)` `repeat` times; `setup()` runs untimed before each call."""
+    samples = []
+    result = None
+    for _ in range(repeat):
+        state = setup() if setup else None
+        with quiet():
+            start = time.perf_counter()
+            result = fn(state)
+            samples.append(time.perf_counter() - start)
+    return samples, result
+
+
+def report(rows, name, size, samples, items, unit="circulars/s"):
+    p50 = percentile(samples, 50)
+    row = {
+        "benchmark": name,
+        "size": size,
+        "runs": len(samples),
+        "p50_ms": round(p50 * 1000, 2),
+        "p95_ms": round(percentile(samples, 95) * 1000, 2),
+        "throughput": round(items / p50, 1) if p50 else None,
+        "unit": unit,
+    }
+    rows.append(row)
+    print(f"  {name:<32} p50 {row['p50_ms']:>10.2f} ms   p95 {row['p95_ms']:>10.2f} ms   "
+          f"{row['throughput']:>12} {unit}")
+    return row
+
+
+def use_db(latency, store="fake"):
+    """Fresh, empty database: the in-memory fake, or a new SQLite file in the workdir."""
+    if store == "sqlite":
+        fd, path = tempfile.mkstemp(suffix=".db", dir=_WORKDIR)
+        os.close(fd)
+        db = sqlite_store.SQLiteClient(path)
+    else:
+        db = FakeSupabase(latency=latency)
+    supabase_client._client = db
+    return db
+
+
+def clear_pdf_url_cache():
+    conn = pdf_url_cache._conn()
+    conn.execute("DELETE FROM pdf_urls")
+    conn.commit()
+
+
+def bench_scrapers(rows, n, repeat):
+    days = SPAN_DAYS + 1
+    samples, nse = measure(lambda _: scrape_nse.scrape_nse(days=days), repeat)
+    report(rows, "scrape_nse", n, samples, len(nse))
+    samples, bse = measure(lambda _: scrape_bse.scrape_bse(days=days, resolve_pdfs=False), repeat)
+    report(rows, "scrape_bse (listing)", n, samples, len(bse))
+    samples, sebi = measure(lambda _: scrape_sebi.scrape_sebi(days=days, resolve_pdfs=False), repeat)
+    report(rows, "scrape_sebi (listing)", n, samples, len(sebi))
+
+    def fresh(circulars):
+        def setup():
+            clear_pdf_url_cache()
+            return [dict(c, pdf_url=None) for c in circulars]
+        return setup
+
+    samples, _ = measure(scrape_bse.resolve_pdf_links, repeat, fresh(bse))
+    report(rows, "scrape_bse (detail pages)", n, samples, len(bse))
+    samples, _ = measure(scrape_sebi.resolve_pdf_links, repeat, fresh(sebi))
+    report(rows, "scrape_sebi (detail pages)", n, samples, len(sebi))
+
+    # Cache-warm resolution: what a daily re-run over the same window costs
+    samples, _ = measure(scrape_sebi.resolve_pdf_links, repeat,
+                         lambda: [dict(c, pdf_url=None) for c in sebi])
+    report(rows, "scrape_sebi (detail, cached)", n, samples, len(sebi))
+
+    for c in bse + sebi:
+        c["pdf_url"] = c["pdf_url"] or c["detail_url"]
+    return nse + bse + sebi
+
+
+def bench_store(rows, n, circulars, repeat, db_latency, store):
+    samples, _ = measure(lambda _: store_circulars.store_circulars(circulars), repeat,
+                         lambda: use_db(db_latency, store))
+    report(rows, "store_circulars (insert)", n, samples, len(circulars))
+    # The last setup's database now holds every row
+    samples, _ = measure(lambda _: store_circulars.store_circulars(circulars), repeat)
+    report(rows, "store_circulars (unchanged)", n, samples, len(circulars))
+
+
+def bench_pipeline(rows, n, repeat, db_latency, store):
+    def setup():
+        clear_pdf_url_cache()
+        use_db(db_latency, store)
+
+    samples, result = measure(
+        lambda _: pipeline_engine.run(days=SPAN_DAYS + 1, full=True, tag="Bench"),
+        repeat, setup,
+    )
+    scraped = sum(r.scraped for r in result.sources.values())
+    report(rows, "pipeline (full, cold caches)", n, samples, scraped)
+
+
+def bench_api(rows, n, requests_per_endpoint):
+    from fastapi.testclient import TestClient
+
+    import api_server
+
+    # The database from the last pipeline run holds the full archive; the async
+    # endpoints reach it through a thread-backed async view
+    db = supabase_client._client
+    store_circulars.refresh_aggregates(db)
+    supabase_client._async_client = supabase_client.ThreadedAsyncClient(db)
+    # As a context manager: one event loop (and lifespan) for every request
+    with TestClient(api_server.app) as client:
+        _bench_endpoints(rows, n, requests_per_endpoint, db, client)
+
+
+def _bench_endpoints(rows, n, requests_per_endpoint, db, client):
+    first = client.get("/api/circulars", params={"days": 90}).json()
+    sample = db.table("circulars").select("id").limit(1).execute().data[0]
+    endpoints = [
+        ("GET /api/circulars", "/api/circulars", {"days": 90}),
+        ("GET /api/circulars (page 2)", "/api/circulars", {"days": 90, "cursor": first.get("next_cursor")}),
+        ("GET /api/circulars (limit 500)", "/api/circulars",
+         {"from_date": "2000-01-01", "to_date": "2100-01-01", "limit": 500}),
+        ("GET /api/circulars/{id}", f"/api/circulars/{sample['id']}", {}),
+        ("GET /api/stats", "/api/stats", {}),
+        ("GET /api/categories", "/api/categories", {}),
+        ("GET /api/search", "/api/search", {"q": "margin"}),
+    ]
+
+    for name, path, params in endpoints:
+        def call(_, path=path, params=params):
+            resp = client.get(path, params=params)
+            resp.raise_for_status()
+        # Cold: response cache cleared before every request
+        samples, _ = measure(call, requests_per_endpoint, response_cache.invalidate)
+        report(rows, name, n, samples, 1, unit="requests/s")
+
+    samples, _ = measure(lambda _: client.get("/api/circulars", params={"days": 90}), requests_per_endpoint)
+    report(rows, "GET /api/circulars (cached)", n, samples, 1, unit="requests/s")
+
+    # Repeat load from a browser that already has the page: ETag revalidation
+    etag = client.get("/api/circulars", params={"days": 90}).headers.get("etag")
+    samples, _ = measure(lambda _: client.get("/api/circulars", params={"days": 90},
+                                              headers={"If-None-Match": etag}), requests_per_endpoint)
+    report(rows, "GET /api/circulars (304)", n, samples, 1, unit="requests/s")
+
+
+def run(sizes=DEFAULT_SIZES, repeat=3, api_requests=50, latency_ms=0.0, db_latency_ms=0.0,
+        production_rates=False, store="fake"):
+    rows = []
+    if not production_rates:
+        # Measure the code, not the politeness limits
+        for module in (scrape_bse, scrape_sebi):
+            module.DETAIL_RATE = UNTHROTTLED
+            module.DETAIL_BURST = int(UNTHROTTLED)
+
+    for n in sizes:
+        print(f"\n[Bench] {n:,} circulars per exchange "
+              f"(exchange latency {latency_ms} ms, db latency {db_latency_ms} ms, store {store})")
+        servers = stand_in.start_exchanges(n, latency=latency_ms / 1000, span_days=SPAN_DAYS)
+        try:
+            stand_in.point_scrapers_at(servers)
+            with pdf_resolver._buckets_lock:
+                pdf_resolver._buckets.clear()
+
+            circulars = bench_scrapers(rows, n, repeat)
+            bench_store(rows, n, circulars, repeat, db_latency_ms / 1000, store)
+            bench_pipeline(rows, n, repeat, db_latency_ms / 1000, store)
+            bench_api(rows, n, api_requests)
+        finally:
+            for server in servers.values():
+                server.stop()
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline benchmarks for the circulars pipeline and API")
+    parser.add_argument("--sizes", default=",".join(str(s) for s in DEFAULT_SIZES),
+                        help="Comma-separated circulars per exchange (default: 1000,10000,100000)")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per scraper/store/pipeline benchmark")
+    parser.add_argument("--api-requests", type=int, default=50, help="Timed requests per API endpoint")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Stand-in exchange response latency")
+    parser.add_argument("--db-latency-ms", type=float, default=0.0, help="Fake Supabase round-trip latency")
+    parser.add_argument("--store", choices=STORES, default="fake",
+                        help="Database behind store/pipeline/API benchmarks (default: in-memory fake)")
+    parser.add_argument("--production-rates", action="store_true",
+                        help="Keep the scrapers' detail-page rate limits (slow at large sizes)")
+    parser.add_argument("--json", dest="json_path", help="Also write the results to this JSON file")
+    args = parser.parse_args()
+
+    rows = run(
+        sizes=[int(s) for s in args.sizes.split(",") if s.strip()],
+        repeat=max(1, args.repeat),
+        api_requests=max(1, args.api_requests),
+        latency_ms=args.latency_ms,
+        db_latency_ms=args.db_latency_ms,
+        production_rates=args.production_rates,
+        store=args.store,
+    )
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump(rows, f, indent=2)
+        print(f"\n[Bench] Results written to {args.json_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+"""
+Local HTTP stand-ins for the exchange websites, serving benchmark fixtures.
+One server per exchange (separate ports, so the per-host token buckets stay
+separate, as they are in production). Every response waits `latency` seconds
+first, to model the round trip to the real site.
+"""
+
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import fixtures
+
+PDF_STUB = b"%PDF-1.4\n%bench\n1 0 obj<<>>endobj\ntrailer<<>>\n%%EOF\n"
+
+
+class StandIn:
+    """Serves one exchange's routes on 127.0.0.1:<ephemeral port>."""
+
+    def __init__(self, name, routes, latency=0.0):
+        self.name = name
+        self.routes = routes        # [(method, compiled path regex, handler(match, query) → (status, ctype, body))]
+        self.latency = latency
+        self.requests = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self._server.server_address[1]}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _handler_class(self):
+        stand_in = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def _serve(self, method):
+                if method == "POST":
+                    length = int(self.headers.get("Content-Length") or 0)
+                    self.rfile.read(length)
+                with stand_in._lock:
+                    stand_in.requests += 1
+                if stand_in.latency:
+                    time.sleep(stand_in.latency)
+
+                url = urlparse(self.path)
+                query = parse_qs(url.query)
+                for route_method, pattern, handler in stand_in.routes:
+                    match = pattern.fullmatch(url.path)
+                    if route_method == method and match:
+                        status, ctype, body = handler(match, query)
+                        break
+                else:
+                    status, ctype, body = 404, "text/plain", b"not found"
+
+                self.send_response(status)
+                self.send_header("Content-Type", ctype)
+                self.send_header("Content-Length", str(len(body)))
+                self.send_header("Set-Cookie", f"bench_{stand_in.name.lower()}=1; Path=/")
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                self._serve("GET")
+
+            def do_POST(self):
+                self._serve("POST")
+
+        return Handler
+
+
+def _html(body):
+    return 200, "text/html; charset=utf-8", body
+
+
+def start_exchanges(n, latency=0.0, span_days=365):
+    """
+    Start NSE, BSE and SEBI stand-ins serving `n` circulars each.
+    Returns {name: StandIn}; the listing bodies are built once, up front.
+    """
+    nse_body = fixtures.nse_listing(n, span_days)
+    bse_body = fixtures.bse_listing(n, span_days)
+    sebi_body = fixtures.sebi_listing(n, span_days)
+    home = _html(b"<html><body>home</body></html>")
+    pdf = (200, "application/pdf", PDF_STUB)
+
+    nse = StandIn("NSE", [
+        ("GET", re.compile(r"/"), lambda m, q: home),
+        ("GET", re.compile(r"/api/circulars"), lambda m, q: (200, "application/json", nse_body)),
+        ("GET", re.compile(r"/content/circulars/.+"), lambda m, q: pdf),
+    ], latency)
+
+    bse = StandIn("BSE", [
+        ("GET", re.compile(r"/"), lambda m, q: home),
+        ("GET", re.compile(r"/BseIndiaAPI/api/GetDataCirToListComp/w"),
+         lambda m, q: (200, "application/json", bse_body)),
+        ("GET", re.compile(r"/markets/MarketInfo/DispNewNoticesCirculars\.aspx"),
+         lambda m, q: _html(fixtures.bse_detail(q.get("page", [""])[0]))),
+        ("GET", re.compile(r"/markets/MarketInfo/DownloadAttach\.aspx"), lambda m, q: pdf),
+    ], latency)
+
+    sebi = StandIn("SEBI", [
+        ("GET", re.compile(r"/sebiweb/home/HomeAction\.do"), lambda m, q: home),
+        ("POST", re.compile(r"/sebiweb/ajax/home/getnewslistinfo\.jsp"), lambda m, q: _html(sebi_body)),
+        # Detail pages link back to this server (`sebi` is bound by the time a request arrives)
+        ("GET", re.compile(r"/legal/circulars/[^/]+/[^/]*_(\d+)\.html"),
+         lambda m, q: _html(fixtures.sebi_detail(m.group(1), sebi.base_url))),
+        ("GET", re.compile(r"/sebi_data/attachdocs/.+"), lambda m, q: pdf),
+    ], latency)
+
+    servers = {"NSE": nse, "BSE": bse, "SEBI": sebi}
+    for server in servers.values():
+        server.start()
+    return servers
+
+
+def point_scrapers_at(servers):
+    """Redirect the scraper and session modules' URLs to the stand-ins."""
+    import exchange_sessions
+    import scrape_bse
+    import scrape_nse
+    import scrape_sebi
+
+    nse, bse, sebi = servers["NSE"].base_url, servers["BSE"].base_url, servers["SEBI"].base_url
+
+    scrape_nse.NSE_BASE = nse
+    scrape_nse.ARCHIVES_BASE = nse
+
+    scrape_bse.API_URL = bse + "/BseIndiaAPI/api/GetDataCirToListComp/w"
+    scrape_bse.DETAIL_BASE = bse + "/markets/MarketInfo/DispNewNoticesCirculars.aspx?page="
+    scrape_bse.BSE_BASE = bse
+
+    scrape_sebi.LISTING_URL = sebi + "/sebiweb/home/HomeAction.do?doListing=yes&sid=1&ssid=7&smid=0"
+    scrape_sebi.AJAX_URL = sebi + "/sebiweb/ajax/home/getnewslistinfo.jsp"
+    scrape_sebi.BASE_URL = sebi
+
+    exchange_sessions.HANDSHAKES.update({
+        "NSE": (nse + "/", 0.0, 15 * 60),
+        "BSE": (bse + "/", 0.0, 30 * 60),
+        "SEBI": (scrape_sebi.LISTING_URL, 0.0, 10 * 60),
+    })
+    with exchange_sessions._managers_lock:
+        exchange_sessions._managers.clear()
@@ -3,6 +3,10 @@ let currentSource = 'ALL';
 let allCirculars = [];
 let bookmarkedIds = new Set();
 let categories = [];
+let nextCursor = null;
+let currentParams = null;
+let totalCirculars = 0;
+const PAGE_SIZE = 100;
 
 // === Data Loading ===
 
@@ -46,6 +50,7 @@ async function loadCirculars(source) {
 
     list.innerHTML = '<div class="loading-state"><div class="spinner"></div><p>Loading circulars...</p></div>';
     emptyState.style.display = 'none';
+    nextCursor = null;
 
     try {
         // Handle bookmarks tab
@@ -65,6 +70,13 @@ async function loadCirculars(source) {
             return;
         }
 
+        // Full-text search replaces the date/category listing
+        const searchTerm = document.getElementById('searchInput').value.trim();
+        if (searchTerm) {
+            await loadSearchResults(searchTerm, source);
+            return;
+        }
+
         // Build query params
         const params = new URLSearchParams();
         const fromDate = document.getElementById('fromDate').value;
@@ -86,9 +98,14 @@ async function loadCirculars(source) {
             params.set('category', category);
         }
 
+        params.set('limit', String(PAGE_SIZE));
+        currentParams = params;
+
         const res = await fetch(`${API_BASE}/api/circulars?${params.toString()}`);
         const data = await res.json();
         allCirculars = data.circulars || [];
+        nextCursor = data.next_cursor || null;
+        totalCirculars = data.total || allCirculars.length;
 
         // Track bookmarked IDs
         bookmarkedIds = new Set(
@@ -102,16 +119,77 @@ async function loadCirculars(source) {
             return;
         }
 
-        list.innerHTML = renderTable(allCirculars);
+        list.innerHTML = renderTable(allCirculars) + renderLoadMore();
     } catch (err) {
         list.innerHTML = `<div class="loading-state"><p>Error loading circulars: ${err.message}</p></div>`;
     }
 }
 
+async function loadSearchResults(term, source) {
+    const list = document.getElementById('circularList');
+    const emptyState = document.getElementById('emptyState');
+    const emptyText = document.getElementById('emptyText');
+
+    const params = new URLSearchParams({ q: term, limit: '100' });
+    if (source && source !== 'ALL') {
+        params.set('source', source);
+    }
+
+    const res = await fetch(`${API_BASE}/api/search?${params.toString()}`);
+    if (!res.ok) {
+        throw new Error(`search failed (${res.status})`);
+    }
+    const data = await res.json();
+    allCirculars = data.results || [];
+    bookmarkedIds = new Set(
+        allCirculars.filter(c => c.is_bookmarked).map(c => c.id)
+    );
+
+    if (allCirculars.length === 0) {
+        list.innerHTML = '';
+        emptyText.textContent = `No circulars match "${term}".`;
+        emptyState.style.display = 'block';
+        return;
+    }
+
+    list.innerHTML = renderTable(allCirculars);
+}
+
+async function loadMore() {
+    if (!nextCursor || !currentParams) return;
+    const button = document.getElementById('loadMoreBtn');
+    if (button) {
+        button.disabled = true;
+        button.textContent = 'Loading...';
+    }
+
+    try {
+        const params = new URLSearchParams(currentParams);
+        params.set('cursor', nextCursor);
+        const res = await fetch(`${API_BASE}/api/circulars?${params.toString()}`);
+        const data = await res.json();
+        const page = data.circulars || [];
+        nextCursor = data.next_cursor || null;
+
+        page.filter(c => c.is_bookmarked).forEach(c => bookmarkedIds.add(c.id));
+        allCirculars = allCirculars.concat(page);
+
+        document.querySelector('#circularList tbody').insertAdjacentHTML('beforeend', renderRows(page));
+        const wrapper = document.getElementById('loadMore');
+        if (wrapper) wrapper.outerHTML = renderLoadMore();
+    } catch (err) {
+        console.error('Failed to load more circulars:', err);
+        if (button) {
+            button.disabled = false;
+            button.textContent = 'Retry';
+        }
+    }
+}
+
 // === Rendering ===
 
-function renderTable(circulars) {
-    const rows = circulars.map(c => {
+function renderRows(circulars) {
+    return circulars.map(c => {
         const date = formatDate(c.published_date);
         const sourceBadge = getSourceBadge(c.source);
         const newBadge = isNew(c.published_date) ? '<span class="new-badge">NEW</span>' : '';
@@ -161,6 +239,10 @@ function renderTable(circulars) {
             </tr>
         `;
     }).join('');
+}
+
+function renderTable(circulars) {
+    const rows = renderRows(circulars);
 
     return `
         <table class="circular-table">
@@ -179,6 +261,18 @@ function renderTable(circulars) {
     `;
 }
 
+function renderLoadMore() {
+    if (!nextCursor) return '';
+    const remaining = Math.max(totalCirculars - allCirculars.length, 0);
+    return `
+        <div class="load-more" id="loadMore">
+            <button class="btn btn-pill btn-outline" id="loadMoreBtn" onclick="loadMore()">
+                Load more${remaining ? ` (${remaining} remaining)` : ''}
+            </button>
+        </div>
+    `;
+}
+
 function getSourceBadge(source) {
     const cls = {
         'SEBI': 'badge-sebi',
@@ -217,6 +311,7 @@ function applyFilters() {
 }
 
 function clearFilters() {
+    document.getElementById('searchInput').value = '';
     document.getElementById('fromDate').value = '';
     document.getElementById('toDate').value = '';
     document.getElementById('categoryFilter').value = '';
@@ -253,7 +348,7 @@ async function toggleBookmark(circularId) {
         if (currentSource === 'BOOKMARKS') {
             loadCirculars('BOOKMARKS');
         } else {
-            document.getElementById('circularList').innerHTML = renderTable(allCirculars);
+            document.getElementById('circularList').innerHTML = renderTable(allCirculars) + renderLoadMore();
         }
     } catch (err) {
         console.error('Bookmark toggle failed:', err);
@@ -0,0 +1,10 @@
+-- Keyset pagination for GET /api/circulars.
+-- Pages are ordered by (published_date DESC, id DESC) and seek past the cursor row,
+-- so every page is an index range scan regardless of how wide the date window is.
+-- Apply in the Supabase SQL editor (or `psql`) once.
+
+create index if not exists circulars_published_date_id_idx
+    on circulars (published_date desc, id desc);
+
+create index if not exists circulars_source_published_date_id_idx
+    on circulars (source, published_date desc, id desc);
@@ -0,0 +1,11 @@
+-- PDF prefetch metadata (tools/prefetch_pdfs.py).
+-- Filled after the pipeline downloads a circular's document; NULL pdf_sha256 means
+-- "not fetched yet", which is how the prefetch stage finds its work.
+
+alter table circulars add column if not exists pdf_sha256 text;
+alter table circulars add column if not exists pdf_size bigint;
+alter table circulars add column if not exists pdf_content_type text;
+
+create index if not exists circulars_pdf_pending_idx
+    on circulars (source, published_date desc)
+    where pdf_url is not null and pdf_sha256 is null;
@@ -0,0 +1,55 @@
+-- Full-text search for GET /api/search.
+-- Titles are stemmed (english); circular numbers are indexed verbatim (simple) so
+-- references like "SEBI/HO/MRD/2024/123" match token by token.
+
+alter table circulars add column if not exists search_tsv tsvector
+    generated always as (
+        setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('simple', coalesce(circular_number, '')), 'A')
+    ) stored;
+
+create index if not exists circulars_search_tsv_idx
+    on circulars using gin (search_tsv);
+
+-- Ranked, paginated search. `total` repeats the full match count on every row.
+create or replace function search_circulars(
+    q text,
+    source_filter text default null,
+    page_size int default 20,
+    page_offset int default 0
+)
+returns table (
+    id text,
+    title text,
+    circular_number text,
+    published_date text,
+    source text,
+    category text,
+    pdf_url text,
+    detail_url text,
+    rank real,
+    total bigint
+)
+language sql stable
+as $$
+    with query as (
+        select websearch_to_tsquery('english', q) as tsq
+    )
+    select
+        c.id::text,
+        c.title,
+        c.circular_number,
+        c.published_date::text,
+        c.source,
+        c.category,
+        c.pdf_url,
+        c.detail_url,
+        ts_rank_cd(c.search_tsv, query.tsq) as rank,
+        count(*) over () as total
+    from circulars c, query
+    where c.search_tsv @@ query.tsq
+      and (source_filter is null or c.source = source_filter)
+    order by rank desc, c.published_date desc, c.id desc
+    limit page_size
+    offset page_offset;
+$$;
@@ -0,0 +1,25 @@
+-- Extracted PDF text (tools/extract_text.py), searchable through search_circulars.
+-- text_sha256 is the pdf_sha256 the text was extracted from; null means pending.
+
+alter table circulars add column if not exists body_text text;
+alter table circulars add column if not exists page_count int;
+alter table circulars add column if not exists text_sha256 text;
+
+create index if not exists circulars_text_pending_idx
+    on circulars (published_date desc)
+    where pdf_sha256 is not null and text_sha256 is null;
+
+-- Generated columns can't be altered in place: rebuild search_tsv with the body
+-- text at a lower weight, so title/number matches still rank first.
+drop index if exists circulars_search_tsv_idx;
+alter table circulars drop column if exists search_tsv;
+
+alter table circulars add column search_tsv tsvector
+    generated always as (
+        setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('simple', coalesce(circular_number, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(body_text, '')), 'C')
+    ) stored;
+
+create index circulars_search_tsv_idx
+    on circulars using gin (search_tsv);
@@ -0,0 +1,63 @@
+-- Aggregates for GET /api/stats: one row per (day, source, category).
+-- Refreshed by store_circulars after it writes (refresh_circular_stats()).
+
+create materialized view if not exists circular_daily_counts as
+    select
+        published_date,
+        source,
+        coalesce(trim(category), '') as category,
+        count(*)::bigint as n
+    from circulars
+    group by 1, 2, 3;
+
+-- Required for REFRESH ... CONCURRENTLY (readers are not blocked)
+create unique index if not exists circular_daily_counts_key
+    on circular_daily_counts (published_date, source, category);
+
+create or replace function refresh_circular_stats()
+returns void
+language plpgsql
+security definer
+set search_path = public
+as $$
+begin
+    refresh materialized view concurrently circular_daily_counts;
+end;
+$$;
+
+-- Security definer: only the pipeline (service role) may trigger a refresh, never
+-- anon/authenticated callers through /rpc. Re-running this file applies the grants.
+revoke execute on function refresh_circular_stats() from public, anon, authenticated;
+grant execute on function refresh_circular_stats() to service_role;
+
+-- Counts for the last `window_days` days (inclusive of today), as one JSON document:
+--   {"by_source": {"SEBI": n, ...}, "by_category": [{source, category, count}],
+--    "by_day": [{date, source, count}], "total": n}
+create or replace function circular_stats(window_days int default 14)
+returns json
+language sql stable
+as $$
+    with w as (
+        select * from circular_daily_counts
+        where published_date >= current_date - window_days
+    )
+    select json_build_object(
+        'by_source', coalesce((
+            select json_object_agg(source, n)
+            from (select source, sum(n)::bigint as n from w group by source) s
+        ), '{}'::json),
+        'by_category', coalesce((
+            select json_agg(json_build_object('source', source, 'category', category, 'count', n)
+                            order by n desc, source, category)
+            from (select source, category, sum(n)::bigint as n from w
+                  where category <> '' group by source, category) c
+        ), '[]'::json),
+        'by_day', coalesce((
+            select json_agg(json_build_object('date', published_date, 'source', source, 'count', n)
+                            order by published_date, source)
+            from (select published_date, source, sum(n)::bigint as n from w
+                  group by published_date, source) d
+        ), '[]'::json),
+        'total', coalesce((select sum(n) from w), 0)::bigint
+    );
+$$;
@@ -0,0 +1,40 @@
+-- Distinct categories with per-source counts, for GET /api/categories.
+-- store_circulars calls refresh_circular_categories(sources) after each write,
+-- right after refresh_circular_stats(), so only the touched sources are recounted
+-- and the counts come from the (small) circular_daily_counts view, not circulars.
+
+create table if not exists circular_categories (
+    source text not null,
+    category text not null,
+    n bigint not null,
+    primary key (source, category)
+);
+
+create or replace function refresh_circular_categories(sources text[] default null)
+returns void
+language plpgsql
+security definer
+set search_path = public
+as $$
+begin
+    delete from circular_categories
+    where sources is null or source = any(sources);
+
+    insert into circular_categories (source, category, n)
+    select source, category, sum(n)::bigint
+    from circular_daily_counts
+    where category <> ''
+      and (sources is null or source = any(sources))
+    group by source, category;
+end;
+$$;
+
+-- Security definer: callable by the pipeline (service role) only, not through /rpc
+-- by anon/authenticated callers. Re-running this file applies the grants.
+revoke execute on function refresh_circular_categories(text[]) from public, anon, authenticated;
+grant execute on function refresh_circular_categories(text[]) to service_role;
+
+-- Backfill. store_circulars writes categories trimmed; trim older rows to match,
+-- so a category listed here is found by the list endpoint's exact filter.
+update circulars set category = trim(category) where category <> trim(category);
+select refresh_circular_categories();
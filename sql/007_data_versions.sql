@@ -0,0 +1,40 @@
+-- Data versions behind the API's ETags (tools/api_server.py, conditional_get).
+-- Any write to circulars (pipeline store, prefetch, text extraction) or bookmarks
+-- bumps its version once per statement; unchanged data keeps its ETags valid.
+
+create table if not exists data_versions (
+    key text primary key,
+    version bigint not null default 0,
+    updated_at timestamptz not null default now()
+);
+
+insert into data_versions (key) values ('circulars'), ('bookmarks')
+on conflict (key) do nothing;
+
+create or replace function bump_data_version()
+returns trigger
+language plpgsql
+security definer
+set search_path = public
+as $$
+begin
+    update data_versions
+    set version = version + 1, updated_at = now()
+    where key = tg_argv[0];
+    return null;
+end;
+$$;
+
+-- Security definer: only ever run by the triggers below, never through /rpc. A
+-- trigger function needs no execute grant, so none is given back.
+revoke execute on function bump_data_version() from public, anon, authenticated;
+
+drop trigger if exists circulars_data_version on circulars;
+create trigger circulars_data_version
+    after insert or update or delete or truncate on circulars
+    for each statement execute function bump_data_version('circulars');
+
+drop trigger if exists bookmarks_data_version on bookmarks;
+create trigger bookmarks_data_version
+    after insert or update or delete or truncate on bookmarks
+    for each statement execute function bump_data_version('bookmarks');
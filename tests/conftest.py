@@ -0,0 +1,5 @@
+import os
+import sys
+
+# The tools are flat modules importing each other by name, as under api/index.py
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "tools"))
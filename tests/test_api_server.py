@@ -0,0 +1,184 @@
+import uuid
+
+import pytest
+
+for module in ("fastapi", "dotenv", "httpx", "requests"):
+    pytest.importorskip(module)
+
+from fastapi import HTTPException  # noqa: E402
+
+import api_server  # noqa: E402
+
+
+def test_cursor_round_trip():
+    row = {"published_date": "2024-03-05", "id": str(uuid.uuid4())}
+    cursor = api_server._encode_cursor(row, 1234)
+    assert "=" not in cursor
+    assert api_server._decode_cursor(cursor) == (row["published_date"], row["id"], 1234)
+
+
+@pytest.mark.parametrize("row", [
+    {"published_date": "2024-03-05", "id": "x),id.gt.0"},
+    {"published_date": "2024-03-05", "id": 7},
+    {"published_date": "2024-03-05)", "id": str(uuid.uuid4())},
+    {"published_date": None, "id": str(uuid.uuid4())},
+])
+def test_cursor_rejects_crafted_keys(row):
+    with pytest.raises(HTTPException) as e:
+        api_server._decode_cursor(api_server._encode_cursor(row, 1))
+    assert e.value.status_code == 400
+
+
+@pytest.mark.parametrize("cursor", ["", "!!!", "bm90IGpzb24"])
+def test_cursor_rejects_garbage(cursor):
+    with pytest.raises(HTTPException) as e:
+        api_server._decode_cursor(cursor)
+    assert e.value.status_code == 400
+
+
+def test_select_columns_defaults_and_all():
+    assert api_server._select_columns(None) == ", ".join(api_server.LIST_FIELDS)
+    assert api_server._select_columns(" ALL ") == "*"
+
+
+def test_select_columns_adds_required_and_dedupes():
+    assert api_server._select_columns("title, Title,category", required=("id", "published_date")) == \
+        "published_date, id, title, category"
+
+
+@pytest.mark.parametrize("fields", ["nope", "title,search_tsv", "title,id)", "title;drop"])
+def test_select_columns_rejects_unknown(fields):
+    with pytest.raises(HTTPException) as e:
+        api_server._select_columns(fields)
+    assert e.value.status_code == 400
+
+
+@pytest.fixture
+def sqlite_api(tmp_path, monkeypatch):
+    """api_server over a fresh SQLite store, recording every bookmark lookup's ID count."""
+    import sqlite_store
+    import supabase_client
+
+    client = sqlite_store.SQLiteClient(str(tmp_path / "circulars.db"))
+    async_client = supabase_client.ThreadedAsyncClient(client)
+
+    async def get_async_client():
+        return async_client
+
+    monkeypatch.setattr(supabase_client, "get_async_client", get_async_client)
+    monkeypatch.setattr(api_server.response_cache, "cache", api_server.response_cache.TTLCache())
+
+    lookups = []
+    in_ = sqlite_store.Query.in_
+
+    def recording_in(self, column, values):
+        values = list(values)
+        if self.table == "bookmarks":
+            lookups.append(len(values))
+        return in_(self, column, values)
+
+    monkeypatch.setattr(sqlite_store.Query, "in_", recording_in)
+    yield client, lookups
+    client.close()
+
+
+def test_500_row_page_looks_up_bookmarks_in_chunks(sqlite_api):
+    import asyncio
+    import json
+
+    client, lookups = sqlite_api
+    client.table("circulars").insert([
+        {"source": "SEBI", "title": f"C{i}", "published_date": f"2024-01-{i % 28 + 1:02d}",
+         "detail_url": f"https://www.sebi.gov.in/c_{i}.html"}
+        for i in range(600)
+    ]).execute()
+    ids = [r["id"] for r in client.table("circulars").select("id").execute().data]
+    client.table("bookmarks").insert([{"circular_id": i} for i in ids[::7]]).execute()
+
+    response = asyncio.run(api_server.list_circulars(
+        source=None, days=14, from_date="2024-01-01", to_date="2024-01-31", category=None,
+        limit=500, cursor=None, fields=None,
+    ))
+    page = json.loads(response.body)
+
+    assert len(page["circulars"]) == 500
+    assert page["total"] == 600
+    assert lookups and max(lookups) <= api_server.BOOKMARK_LOOKUP_CHUNK
+    assert sum(lookups) == 500
+    expected = set(ids[::7])
+    assert all(c["is_bookmarked"] == (c["id"] in expected) for c in page["circulars"])
+    assert sum(c["is_bookmarked"] for c in page["circulars"]) > 0
+
+
+class FakeRequest:
+    def __init__(self, path, query="", method="GET", headers=None):
+        self.method = method
+        self.url = type("URL", (), {"path": path, "query": query})()
+        self.headers = {k.lower(): v for k, v in (headers or {}).items()}
+        self.scope = {}
+
+
+@pytest.fixture
+def versions(monkeypatch):
+    current = {"circulars": 1, "bookmarks": 1}
+
+    async def data_versions():
+        return dict(current)
+
+    monkeypatch.setattr(api_server, "_data_versions", data_versions)
+    return current
+
+
+def get(request):
+    import asyncio
+
+    calls = []
+
+    async def call_next(req):
+        calls.append(req)
+        return api_server.Response(status_code=200)
+
+    response = asyncio.run(api_server.conditional_get(request, call_next))
+    return response, len(calls)
+
+
+def test_etag_then_304(versions):
+    response, calls = get(FakeRequest("/api/stats", "days=7"))
+    etag = response.headers.get("ETag")
+    assert response.status_code == 200 and calls == 1 and etag
+    assert response.headers.get("Cache-Control") == api_server.PUBLIC_CACHE
+
+    for if_none_match in (etag, f"W/{etag}", f'"other", {etag}', "*"):
+        response, calls = get(FakeRequest("/api/stats", "days=7", headers={"If-None-Match": if_none_match}))
+        assert response.status_code == 304 and calls == 0
+        assert response.headers.get("ETag") == etag
+
+
+def test_etag_covers_query_encoding_and_versions(versions):
+    def etag(*args, **kwargs):
+        return get(FakeRequest(*args, **kwargs))[0].headers.get("ETag")
+
+    base = etag("/api/circulars", "days=7&source=NSE")
+    assert etag("/api/circulars", "source=NSE&days=7") == base
+    assert etag("/api/circulars", "days=7&source=BSE") != base
+    assert etag("/api/circulars", "days=7&source=NSE", headers={"Accept-Encoding": "br"}) != base
+
+    versions["bookmarks"] += 1
+    assert etag("/api/circulars", "days=7&source=NSE") != base
+    # /api/stats does not depend on bookmarks
+    stats = etag("/api/stats")
+    versions["bookmarks"] += 1
+    assert etag("/api/stats") == stats
+
+
+def test_no_etag_for_writes_pdfs_or_failed_lookups(versions, monkeypatch):
+    for request in (FakeRequest("/api/bookmarks/x", method="POST"), FakeRequest("/api/circulars/x/pdf")):
+        response, calls = get(request)
+        assert calls == 1 and response.headers.get("ETag") is None
+
+    async def broken():
+        raise RuntimeError("database down")
+
+    monkeypatch.setattr(api_server, "_data_versions", broken)
+    response, calls = get(FakeRequest("/api/stats", headers={"If-None-Match": "*"}))
+    assert response.status_code == 200 and calls == 1 and response.headers.get("ETag") is None
@@ -0,0 +1,77 @@
+import pytest
+
+pytest.importorskip("requests")
+pytest.importorskip("dotenv")
+
+from backfill import plan_chunks  # noqa: E402
+
+
+def test_chunks_cover_the_range_newest_first():
+    chunks = plan_chunks("2024-01-01", "2024-03-15", 30)
+    assert chunks == [
+        ("2024-02-15", "2024-03-15"),
+        ("2024-01-16", "2024-02-14"),
+        ("2024-01-01", "2024-01-15"),
+    ]
+
+
+def test_single_day_and_exact_multiple():
+    assert plan_chunks("2024-01-01", "2024-01-01", 30) == [("2024-01-01", "2024-01-01")]
+    assert plan_chunks("2024-01-01", "2024-01-20", 10) == [
+        ("2024-01-11", "2024-01-20"), ("2024-01-01", "2024-01-10"),
+    ]
+
+
+def test_no_chunk_size_is_one_chunk():
+    assert plan_chunks("2020-01-01", "2024-12-31") == [("2020-01-01", "2024-12-31")]
+
+
+def test_bad_ranges():
+    with pytest.raises(ValueError):
+        plan_chunks("2024-02-01", "2024-01-01", 30)
+    with pytest.raises(ValueError):
+        plan_chunks("2024-13-01", "2024-12-31", 30)
+
+
+@pytest.fixture
+def state(tmp_path, monkeypatch):
+    import backfill
+    import pipeline_state
+
+    monkeypatch.setattr(pipeline_state, "STATE_DIR", str(tmp_path))
+    monkeypatch.setattr(pipeline_state, "STATE_PATH", str(tmp_path / "pipeline_state.json"))
+    stored = []
+
+    def fake_store(circulars, refresh=True):
+        stored.extend(circulars)
+        failed = sum(1 for c in circulars if c.get("bad"))
+        return {"inserted": len(circulars) - failed, "updated": 0, "unchanged": 0, "failed": failed}
+
+    monkeypatch.setattr(backfill, "store_circulars", fake_store)
+    return pipeline_state
+
+
+def source(name, rows):
+    from pipeline_engine import Source
+
+    return Source(name, scrape=lambda days, since, until: [dict(r) for r in rows])
+
+
+def test_run_chunk_checkpoints_only_complete_date_addressable_chunks(state):
+    from backfill import run_chunk
+
+    rows = [{"published_date": "2024-01-05", "circular_number": "1"}]
+    run_chunk(source("NSE", rows), ("2024-01-01", "2024-01-30"))
+    assert set(state.backfill_done("NSE")) == {"2024-01-01..2024-01-30"}
+    assert state.high_water("NSE")["published_date"] == "2024-01-05"
+
+    # BSE's listing takes no dates: never checkpointed, the mark still moves
+    run_chunk(source("BSE", rows), ("2024-01-01", "2024-01-30"))
+    assert state.backfill_done("BSE") == {}
+    assert state.high_water("BSE")["published_date"] == "2024-01-05"
+
+    # A chunk with failed rows is retried next time
+    run_chunk(source("SEBI", rows + [{"published_date": "2024-01-06", "bad": True}]),
+              ("2024-01-01", "2024-03-30"))
+    assert state.backfill_done("SEBI") == {}
+    assert state.high_water("SEBI") is None
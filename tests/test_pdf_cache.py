@@ -0,0 +1,100 @@
+import asyncio
+import os
+import threading
+import time
+
+import pytest
+
+import pdf_cache
+
+PDF = b"%PDF-1.7\n" + b"x" * 1000
+
+
+@pytest.fixture(autouse=True)
+def cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(pdf_cache, "CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(pdf_cache, "_local", threading.local())
+
+
+def test_put_then_get():
+    blob = pdf_cache.put("https://x/a.pdf", [PDF[:10], PDF[10:]], "application/pdf")
+    assert blob.size == len(PDF)
+    assert open(blob.path, "rb").read() == PDF
+    assert pdf_cache.get("https://x/a.pdf") == blob
+    assert pdf_cache.get("https://x/missing.pdf") is None
+
+
+@pytest.mark.parametrize("body", [b"<!DOCTYPE html><title>Just a moment...</title>", b""])
+def test_non_documents_are_not_cached(tmp_path, body):
+    with pytest.raises(pdf_cache.NotADocument):
+        pdf_cache.put("https://x/challenge.pdf", [body], "text/html")
+    assert pdf_cache.get("https://x/challenge.pdf") is None
+    assert not [f for f in os.listdir(tmp_path) if f.startswith(".incoming-")]
+
+
+def test_zip_bodies_are_cached():
+    assert pdf_cache.put("https://x/a.zip", [b"PK\x03\x04rest"], "application/zip").size == 8
+
+
+def test_get_or_fetch_single_flight():
+    calls = []
+    gate = threading.Event()
+
+    def fetch():
+        calls.append(1)
+        gate.wait(5)
+        return [PDF], "application/pdf"
+
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(pdf_cache.get_or_fetch("https://x/b.pdf", fetch)))
+        for _ in range(8)
+    ]
+    for t in threads:
+        t.start()
+    time.sleep(0.2)
+    gate.set()
+    for t in threads:
+        t.join()
+
+    assert len(calls) == 1
+    assert len(results) == 8 and len({r.sha256 for r in results}) == 1
+    assert "https://x/b.pdf" not in pdf_cache._inflight
+
+
+def test_get_or_fetch_shares_failures_and_retries():
+    def fail():
+        raise RuntimeError("upstream down")
+
+    with pytest.raises(RuntimeError):
+        pdf_cache.get_or_fetch("https://x/c.pdf", fail)
+    assert pdf_cache.get_or_fetch("https://x/c.pdf", lambda: ([PDF], None)).size == len(PDF)
+
+
+def test_aget_or_fetch_single_flight_survives_leader_cancel():
+    async def main():
+        calls = []
+        gate = asyncio.Event()
+
+        async def chunks():
+            yield PDF
+
+        async def fetch():
+            calls.append(1)
+            await gate.wait()
+            return chunks(), "application/pdf"
+
+        leader = asyncio.ensure_future(pdf_cache.aget_or_fetch("https://x/d.pdf", fetch))
+        await asyncio.sleep(0.05)
+        followers = [asyncio.ensure_future(pdf_cache.aget_or_fetch("https://x/d.pdf", fetch)) for _ in range(3)]
+        await asyncio.sleep(0.05)
+        leader.cancel()
+        gate.set()
+        blobs = await asyncio.gather(*followers)
+        return calls, blobs, leader
+
+    calls, blobs, leader = asyncio.run(main())
+    assert len(calls) == 1
+    assert leader.cancelled()
+    assert all(b.size == len(PDF) for b in blobs)
+    assert not pdf_cache._ainflight
@@ -0,0 +1,110 @@
+import threading
+import time
+
+import pytest
+
+import pdf_resolver
+import pdf_url_cache
+from pdf_resolver import TokenBucket, resolve_pdf_urls
+
+
+@pytest.fixture(autouse=True)
+def url_cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(pdf_url_cache, "CACHE_PATH", str(tmp_path / "pdf_url_cache.db"))
+    monkeypatch.setattr(pdf_url_cache, "_local", threading.local())
+    monkeypatch.setattr(pdf_resolver, "_buckets", {})
+
+
+def test_token_bucket_allows_burst_then_paces():
+    bucket = TokenBucket(rate=20, burst=3)
+    start = time.monotonic()
+    for _ in range(3):
+        bucket.acquire()
+    assert time.monotonic() - start < 0.05
+
+    for _ in range(4):
+        bucket.acquire()
+    # 4 tokens beyond the burst at 20/s take at least ~0.2s
+    assert time.monotonic() - start >= 0.18
+
+
+def test_token_bucket_is_shared_across_threads():
+    bucket = TokenBucket(rate=50, burst=1)
+    start = time.monotonic()
+    threads = [threading.Thread(target=bucket.acquire) for _ in range(6)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert time.monotonic() - start >= 0.09
+
+
+def circulars(n):
+    return [{"title": f"C{i}", "detail_url": f"https://www.sebi.gov.in/c_{i}.html"} for i in range(n)]
+
+
+def test_resolves_concurrently_in_place_and_in_order():
+    active, peak = [0], [0]
+    lock = threading.Lock()
+
+    def extract(session, detail_url):
+        with lock:
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+        time.sleep(0.05)
+        with lock:
+            active[0] -= 1
+        return detail_url.replace(".html", ".pdf")
+
+    rows = circulars(8) + [{"title": "no detail page"}]
+    result = resolve_pdf_urls(None, rows, extract, "SEBI", rate=1000, burst=8, max_workers=4)
+
+    assert result is rows
+    assert [r.get("pdf_url") for r in rows[:8]] == [r["detail_url"].replace(".html", ".pdf") for r in rows[:8]]
+    assert "pdf_url" not in rows[8]
+    assert 1 < peak[0] <= 4
+
+
+def test_failures_leave_pdf_url_unset():
+    def extract(session, detail_url):
+        if detail_url.endswith("_1.html"):
+            raise RuntimeError("403")
+        return "https://x/doc.pdf"
+
+    rows = resolve_pdf_urls(None, circulars(3), extract, "BSE", rate=1000, burst=3)
+    assert [r.get("pdf_url") for r in rows] == ["https://x/doc.pdf", None, "https://x/doc.pdf"]
+    assert "pdf_url" not in rows[1]
+
+
+def test_resolutions_are_cached_across_runs():
+    calls = []
+
+    def extract(session, detail_url):
+        calls.append(detail_url)
+        return None if detail_url.endswith("_1.html") else "https://x/doc.pdf"
+
+    resolve_pdf_urls(None, circulars(2), extract, "SEBI", rate=1000, burst=2)
+    rows = resolve_pdf_urls(None, circulars(2), extract, "SEBI", rate=1000, burst=2)
+
+    assert len(calls) == 2   # "not found" is cached too
+    assert [r["pdf_url"] for r in rows] == ["https://x/doc.pdf", None]
+
+
+def test_expired_negatives_and_failures_are_retried(monkeypatch):
+    calls = []
+
+    def extract(session, detail_url):
+        calls.append(detail_url)
+        if len(calls) == 1:
+            raise RuntimeError("503 Service Unavailable")
+        return None
+
+    resolve_pdf_urls(None, circulars(1), extract, "SEBI", rate=1000)
+    assert pdf_url_cache.get(circulars(1)[0]["detail_url"]) == (False, None)
+
+    resolve_pdf_urls(None, circulars(1), extract, "SEBI", rate=1000)
+    assert pdf_url_cache.get(circulars(1)[0]["detail_url"]) == (True, None)
+
+    monkeypatch.setattr(pdf_url_cache, "NEGATIVE_TTL", -1)
+    resolve_pdf_urls(None, circulars(1), extract, "SEBI", rate=1000)
+    assert len(calls) == 3
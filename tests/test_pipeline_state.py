@@ -0,0 +1,68 @@
+import threading
+
+import pytest
+
+import pipeline_state
+
+
+@pytest.fixture(autouse=True)
+def state_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(pipeline_state, "STATE_DIR", str(tmp_path))
+    monkeypatch.setattr(pipeline_state, "STATE_PATH", str(tmp_path / "pipeline_state.json"))
+    monkeypatch.setattr(pipeline_state, "REPORTS_DIR", str(tmp_path / "runs"))
+
+
+def test_high_water_never_moves_backwards():
+    assert pipeline_state.high_water("SEBI") is None
+    mark = pipeline_state.advance_high_water("SEBI", [
+        {"published_date": "2024-03-01", "circular_number": "X/1"},
+        {"published_date": "2024-03-05", "circular_number": "X/2"},
+        {"published_date": None},
+    ])
+    assert mark == {"published_date": "2024-03-05", "id": "X/2"}
+
+    assert pipeline_state.advance_high_water("SEBI", [{"published_date": "2024-01-01"}]) == mark
+    assert pipeline_state.advance_high_water("SEBI", []) == mark
+    assert pipeline_state.high_water("SEBI") == mark
+    assert pipeline_state.high_water("NSE") is None
+
+
+def test_mark_run_and_marks_share_the_source_record():
+    pipeline_state.advance_high_water("NSE", [{"published_date": "2024-03-01"}])
+    pipeline_state.mark_run("NSE")
+    assert pipeline_state.last_run("NSE") is not None
+    assert pipeline_state.high_water("NSE")["published_date"] == "2024-03-01"
+
+
+def test_backfill_checkpoints_round_trip():
+    assert pipeline_state.backfill_done("NSE") == {}
+    counts = {"scraped": 3, "inserted": 3, "updated": 0, "unchanged": 0, "failed": 0}
+    pipeline_state.mark_backfill_chunk("NSE", ("2024-01-01", "2024-01-30"), counts)
+    pipeline_state.mark_backfill_chunk("NSE", ("2024-01-31", "2024-02-29"), counts)
+    pipeline_state.mark_backfill_chunk("SEBI", ("2024-01-01", "2024-03-30"), counts)
+
+    assert set(pipeline_state.backfill_done("NSE")) == {"2024-01-01..2024-01-30", "2024-01-31..2024-02-29"}
+    assert pipeline_state.backfill_done("NSE")["2024-01-01..2024-01-30"] == counts
+
+    pipeline_state.reset_backfill("NSE")
+    assert pipeline_state.backfill_done("NSE") == {}
+    assert set(pipeline_state.backfill_done("SEBI")) == {"2024-01-01..2024-03-30"}
+
+
+def test_checkpoints_do_not_clobber_source_records():
+    pipeline_state.mark_run("NSE")
+    pipeline_state.mark_backfill_chunk("NSE", ("2024-01-01", "2024-01-30"), {})
+    assert pipeline_state.last_run("NSE") is not None
+
+
+def test_concurrent_advances_keep_the_newest():
+    dates = [f"2024-01-{d:02d}" for d in range(1, 29)]
+    threads = [
+        threading.Thread(target=pipeline_state.advance_high_water, args=("NSE", [{"published_date": d}]))
+        for d in dates
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert pipeline_state.high_water("NSE")["published_date"] == "2024-01-28"
@@ -0,0 +1,89 @@
+import asyncio
+
+import pytest
+
+import response_cache
+from response_cache import TTLCache, cached, make_key
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(response_cache.time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_entries_expire_after_ttl(clock):
+    cache = TTLCache(maxsize=10, ttl=30)
+    cache.set("a", 1)
+    cache.set("b", 2, ttl=60)
+    clock[0] += 31
+    assert cache.get("a") is None
+    assert cache.get("b") == 2
+    assert cache.stats() == {"entries": 1, "max_entries": 10, "hits": 1, "misses": 1}
+
+
+def test_least_recently_used_is_evicted():
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert (cache.get("a"), cache.get("c")) == (1, 3)
+
+
+def test_invalidate_by_namespace_or_all():
+    cache = TTLCache()
+    cache.set(("circulars", ()), 1)
+    cache.set(("circulars", (("days", 7),)), 2)
+    cache.set(("stats", ()), 3)
+    assert cache.invalidate("circulars") == 2
+    assert cache.get(("stats", ())) == 3
+    assert cache.invalidate() == 1
+    assert cache.stats()["entries"] == 0
+
+
+def test_make_key_normalizes_params():
+    key = make_key("circulars", {"source": " sebi ", "days": 7, "category": None, "fields": ""},
+                   normalize={"source": str.upper})
+    assert key == ("circulars", (("days", 7), ("source", "SEBI")))
+    assert key == make_key("circulars", {"days": 7, "source": "SEBI"})
+
+
+@pytest.fixture
+def fresh_cache(monkeypatch):
+    monkeypatch.setattr(response_cache, "cache", TTLCache())
+
+
+def test_cached_sync_endpoint(fresh_cache):
+    calls = []
+
+    @cached("stats", normalize={"source": str.upper})
+    def stats(source=None, days=14):
+        calls.append((source, days))
+        return {"source": source, "days": days}
+
+    assert stats(source="nse", days=7) == stats(source="NSE ", days=7)
+    assert len(calls) == 1
+    stats(source="NSE", days=30)
+    assert len(calls) == 2
+
+    response_cache.invalidate("stats")
+    stats(source="NSE", days=7)
+    assert len(calls) == 3
+
+
+def test_cached_async_endpoint(fresh_cache):
+    calls = []
+
+    @cached("circulars")
+    async def circulars(days=14):
+        calls.append(days)
+        return [days]
+
+    async def main():
+        return [await circulars(days=7), await circulars(days=7)]
+
+    assert asyncio.run(main()) == [[7], [7]]
+    assert calls == [7]
@@ -0,0 +1,123 @@
+import threading
+
+import pytest
+
+from sqlite_store import QueryError, SQLiteClient, parse_filter
+
+
+@pytest.fixture
+def client(tmp_path):
+    client = SQLiteClient(str(tmp_path / "circulars.db"))
+    client.table("circulars").insert([
+        {"source": "SEBI", "title": "A", "published_date": "2024-01-01", "detail_url": "a", "category": "Debt"},
+        {"source": "SEBI", "title": "B", "published_date": "2024-01-02", "detail_url": "b", "category": "Equity"},
+        {"source": "NSE", "title": "C", "published_date": "2024-01-02", "detail_url": "c", "category": "Debt"},
+        {"source": "BSE", "title": "D", "published_date": "2024-01-03", "detail_url": "d", "category": None},
+    ]).execute()
+    yield client
+    client.close()
+
+
+def titles(result):
+    return [r["title"] for r in result.data]
+
+
+def test_insert_generates_ids(client):
+    rows = client.table("circulars").select("id, title").execute().data
+    assert len(rows) == 4
+    assert all(r["id"] for r in rows)
+    assert "seq" not in client.table("circulars").select("*").limit(1).execute().data[0]
+
+
+def test_filters_order_and_range(client):
+    q = client.table("circulars").select("title")
+    assert titles(q.eq("source", "SEBI").order("published_date", desc=True).execute()) == ["B", "A"]
+
+    q = client.table("circulars").select("title").in_("source", ["NSE", "BSE"]).order("title")
+    assert titles(q.execute()) == ["C", "D"]
+
+    q = client.table("circulars").select("title").gte("published_date", "2024-01-02").lt("published_date", "2024-01-03")
+    assert sorted(titles(q.execute())) == ["B", "C"]
+
+    q = client.table("circulars").select("title").is_("category", "null")
+    assert titles(q.execute()) == ["D"]
+
+    q = client.table("circulars").select("title").not_.is_("category", "null").order("title").range(1, 2)
+    assert titles(q.execute()) == ["B", "C"]
+
+    assert client.table("circulars").select("title").in_("source", []).execute().data == []
+
+
+def test_keyset_or_filter(client):
+    rows = client.table("circulars").select("id, published_date").order("published_date", desc=True) \
+        .order("id", desc=True).execute().data
+    after = rows[1]
+    q = (
+        client.table("circulars").select("id")
+        .or_(f"published_date.lt.{after['published_date']},"
+             f"and(published_date.eq.{after['published_date']},id.lt.{after['id']})")
+        .order("published_date", desc=True).order("id", desc=True)
+    )
+    assert [r["id"] for r in q.execute().data] == [r["id"] for r in rows[2:]]
+
+
+def test_parse_filter_tree():
+    assert parse_filter("or(published_date.lt.2024-01-02,and(published_date.eq.2024-01-02,id.lt.a.b))") == (
+        "or", [
+            ("published_date", "lt", "2024-01-02"),
+            ("and", [("published_date", "eq", "2024-01-02"), ("id", "lt", "a.b")]),
+        ],
+    )
+    with pytest.raises(QueryError):
+        parse_filter("or(nodots)")
+
+
+def test_count_exact_and_head(client):
+    result = client.table("circulars").select("id", count="exact", head=True).eq("category", "Debt").execute()
+    assert result.count == 2
+    assert result.data == []
+
+
+def test_upsert_update_delete(client):
+    client.table("circulars").upsert(
+        [{"source": "SEBI", "detail_url": "a", "title": "A2", "published_date": "2024-01-01"}],
+        on_conflict="source,detail_url",
+    ).execute()
+    assert titles(client.table("circulars").select("title").eq("detail_url", "a").execute()) == ["A2"]
+
+    client.table("circulars").update({"title": "B2"}).eq("detail_url", "b").execute()
+    assert titles(client.table("circulars").select("title").eq("detail_url", "b").execute()) == ["B2"]
+
+    client.table("circulars").delete().eq("source", "BSE").execute()
+    assert client.table("circulars").select("id", count="exact", head=True).execute().count == 3
+
+
+@pytest.mark.parametrize("build", [
+    lambda c: c.table("nope").select("*"),
+    lambda c: c.table("circulars").select("id; drop table circulars"),
+    lambda c: c.table("circulars").select("id").eq("nope", 1),
+    lambda c: c.table("circulars").select("id").or_("title.like.x"),
+    lambda c: c.table("circulars").select("id").or_("garbage"),
+])
+def test_malformed_queries_raise_query_error(client, build):
+    with pytest.raises(QueryError):
+        build(client).execute()
+
+
+def test_close_closes_every_thread_connection(client):
+    threads = [threading.Thread(target=lambda: client.table("circulars").select("id").execute())
+               for _ in range(3)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    opened = set(client._conns)
+    assert len(opened) >= 4
+
+    client.close()
+    assert not client._conns
+    # Closed connections refuse work; the client reconnects on next use
+    for conn in opened:
+        with pytest.raises(Exception):
+            conn.execute("SELECT 1")
+    assert len(client.table("circulars").select("id").execute().data) == 4
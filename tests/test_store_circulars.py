@@ -0,0 +1,73 @@
+import pytest
+
+pytest.importorskip("dotenv")
+
+import store_circulars  # noqa: E402
+from sqlite_store import SQLiteClient  # noqa: E402
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    client = SQLiteClient(str(tmp_path / "circulars.db"))
+    monkeypatch.setattr(store_circulars, "get_client", lambda: client)
+    yield client
+    client.close()
+
+
+def circular(i, **fields):
+    return {"source": "SEBI", "title": f"Circular {i}", "published_date": "2024-01-01",
+            "detail_url": f"https://www.sebi.gov.in/c_{i}.html", **fields}
+
+
+def stored(client):
+    return client.table("circulars").select("detail_url, title, category").order("detail_url").execute().data
+
+
+def test_counts_inserted_updated_unchanged(client):
+    counts = store_circulars.store_circulars([circular(i) for i in range(5)], refresh=False)
+    assert counts == {"inserted": 5, "updated": 0, "unchanged": 0, "failed": 0}
+
+    batch = [circular(0), circular(1, title="Renamed"), circular(5)]
+    counts = store_circulars.store_circulars(batch, refresh=False)
+    assert counts == {"inserted": 1, "updated": 1, "unchanged": 1, "failed": 0}
+    assert len(stored(client)) == 6
+
+
+def test_duplicates_in_one_call_keep_the_last(client):
+    counts = store_circulars.store_circulars([circular(0), circular(0, title="Second")], refresh=False)
+    assert counts["inserted"] == 1
+    assert stored(client)[0]["title"] == "Second"
+
+
+def test_small_batches_and_lookup_chunks(client, monkeypatch):
+    monkeypatch.setattr(store_circulars, "LOOKUP_CHUNK", 3)
+    rows = [circular(i) for i in range(10)]
+    assert store_circulars.store_circulars(rows, batch_size=4, refresh=False)["inserted"] == 10
+    assert store_circulars.store_circulars(rows, batch_size=4, refresh=False)["unchanged"] == 10
+
+
+def test_failed_batch_falls_back_row_by_row(client, monkeypatch):
+    upsert = store_circulars._upsert
+    calls = []
+
+    def flaky_upsert(c, rows):
+        calls.append(rows)
+        if isinstance(rows, list) and len(rows) > 1:
+            raise RuntimeError("batch rejected")
+        row = rows[0] if isinstance(rows, list) else rows
+        if row["title"] == "Bad":
+            raise RuntimeError("row rejected")
+        upsert(c, rows)
+
+    monkeypatch.setattr(store_circulars, "_upsert", flaky_upsert)
+    counts = store_circulars.store_circulars(
+        [circular(0), circular(1, title="Bad"), circular(2)], refresh=False)
+
+    assert counts == {"inserted": 2, "updated": 0, "unchanged": 0, "failed": 1}
+    assert len(calls) == 4   # one batch, then each row
+    assert [r["title"] for r in stored(client)] == ["Circular 0", "Circular 2"]
+
+
+def test_categories_are_stored_trimmed(client):
+    store_circulars.store_circulars([circular(0, category="  Debt ")], refresh=False)
+    assert stored(client)[0]["category"] == "Debt"
@@ -1,21 +1,91 @@
 """
 Tool: API Server
 FastAPI backend serving regulatory circular data, filters, bookmarks, and PDF proxy.
+Read endpoints carry ETags derived from the data_versions table (sql/007) and
+answer If-None-Match with 304. Prometheus-style metrics are served at /metrics.
+JSON is encoded with orjson when installed and compressed (brotli when
+brotli-asgi is installed, else gzip) for clients that accept it.
+Data endpoints are async: database calls go through supabase_client's async
+client and the PDF proxy downloads with httpx, so a request waiting on I/O
+holds no threadpool worker.
 """
 
+import asyncio
+import base64
+import hashlib
+import hmac
+import json
 import os
-import requests as http_requests
+import threading
+import time
+import uuid
+from contextlib import asynccontextmanager
 from datetime import datetime, timezone, timedelta
-from fastapi import FastAPI, HTTPException, Query
-from fastapi.responses import Response, FileResponse, HTMLResponse, StreamingResponse
+from fastapi import FastAPI, Header, HTTPException, Query
+from fastapi.responses import (
+    Response, FileResponse, HTMLResponse, JSONResponse, PlainTextResponse, StreamingResponse,
+)
 from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 from dotenv import load_dotenv
-from supabase import create_client
+
+import exchange_sessions
+import metrics
+import pdf_cache
+import pdf_fetcher
+import response_cache
+import supabase_client
+from response_cache import cached
+from sqlite_store import QueryError
+
+try:
+    import orjson
+except ImportError:  # optional — falls back to the stdlib encoder
+    orjson = None
+
+try:
+    from brotli_asgi import BrotliMiddleware
+except ImportError:  # optional — gzip only
+    BrotliMiddleware = None
 
 load_dotenv(os.path.join(os.path.dirname(__file__), '..', '.env'))
 
-app = FastAPI(title="Regulatory Circular Aggregator API")
+
+@asynccontextmanager
+async def lifespan(app):
+    """Warm the shared Supabase client on boot; close its connections on shutdown."""
+    try:
+        await supabase_client.awarm()
+    except Exception as e:
+        print(f"[API] Supabase warm-up skipped: {e}")
+    yield
+    await supabase_client.close_async_client()
+    await pdf_fetcher.close_async_http()
+    supabase_client.close_client()
+
+
+def dumps(content):
+    if orjson is not None:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":"), default=str).encode()
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    JSON response encoded by dumps(). Endpoints that return one directly also
+    skip FastAPI's jsonable_encoder pass over the payload.
+    """
+
+    def render(self, content):
+        return dumps(content)
+
+
+app = FastAPI(
+    title="Regulatory Circular Aggregator API",
+    lifespan=lifespan,
+    default_response_class=FastJSONResponse,
+)
 
 app.add_middleware(
     CORSMiddleware,
@@ -24,23 +94,147 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+
+# How long a looked-up data version is trusted before asking the database again
+DATA_VERSION_TTL = float(os.getenv("DATA_VERSION_TTL", "5"))
+# Seconds Vercel's edge may serve a shared (non-bookmark) response without asking us
+EDGE_MAX_AGE = int(os.getenv("EDGE_MAX_AGE", "300"))
+
+PUBLIC_CACHE = f"public, max-age=0, s-maxage={EDGE_MAX_AGE}, stale-while-revalidate=60"
+# Responses carrying bookmark flags change on every bookmark click: always revalidate
+REVALIDATE_CACHE = "no-cache"
+
+_versions = {"data": None, "at": 0.0, "seen": None}
+_versions_lock = threading.Lock()
+
+
+async def _data_versions():
+    """
+    {key: version} from data_versions, memoized for DATA_VERSION_TTL seconds.
+    When the versions move (a write by the pipeline or another instance), the
+    response cache is dropped, so a new ETag is never paired with a cached old body.
+    """
+    with _versions_lock:
+        if _versions["data"] is not None and time.monotonic() - _versions["at"] < DATA_VERSION_TTL:
+            return _versions["data"]
+    client = await supabase_client.get_async_client()
+    rows = (await client.table("data_versions").select("key, version").execute()).data
+    data = {r["key"]: r["version"] for r in rows}
+    with _versions_lock:
+        changed = data != _versions["seen"]
+        _versions.update(data=data, at=time.monotonic(), seen=data)
+    if changed:
+        response_cache.invalidate()
+    return data
+
+
+def _forget_data_versions():
+    """Called after this instance writes, so its next ETag reflects the write."""
+    with _versions_lock:
+        _versions["data"] = None
+
+
+def _conditional_policy(path):
+    """(route template, data_versions keys, Cache-Control) for ETag-able GETs, else None."""
+    if path in ("/api/circulars", "/api/circulars/stream", "/api/search"):
+        return path, ("circulars", "bookmarks"), REVALIDATE_CACHE
+    if path == "/api/bookmarks":
+        return path, ("circulars", "bookmarks"), REVALIDATE_CACHE
+    if path in ("/api/stats", "/api/categories"):
+        return path, ("circulars",), PUBLIC_CACHE
+    if path.startswith("/api/circulars/") and not path.endswith("/pdf"):
+        return "/api/circulars/{circular_id}", ("circulars",), PUBLIC_CACHE
+    return None
+
+
+def _etag_matches(if_none_match, etag):
+    if not if_none_match:
+        return False
+    candidates = [t.strip() for t in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates or f"W/{etag}" in candidates
+
+
+@app.middleware("http")
+async def conditional_get(request, call_next):
+    """
+    Strong ETag = hash(path, query, Accept-Encoding, today's date, relevant data
+    versions). Today's date is part of it because default windows are relative to
+    now; Accept-Encoding because each encoding is a different representation.
+    A matching If-None-Match gets a 304 without running the endpoint.
+    """
+    policy = _conditional_policy(request.url.path) if request.method in ("GET", "HEAD") else None
+    if policy is None:
+        return await call_next(request)
+
+    template, keys, cache_control = policy
+    request.scope["route_template"] = template
+    try:
+        versions = await _data_versions()
+    except Exception as e:
+        print(f"[API] Data version lookup failed, serving without ETag: {e}")
+        return await call_next(request)
+
+    query = "&".join(sorted(request.url.query.split("&"))) if request.url.query else ""
+    basis = "|".join([
+        request.url.path, query, request.headers.get("accept-encoding", ""),
+        datetime.now(timezone.utc).strftime("%Y-%m-%d"),
+        *(f"{k}={versions.get(k, 0)}" for k in keys),
+    ])
+    etag = '"' + hashlib.sha256(basis.encode()).hexdigest()[:32] + '"'
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+
+    if _etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+
+    response = await call_next(request)
+    if response.status_code == 200:
+        response.headers.update(headers)
+    return response
+
+
+@app.middleware("http")
+async def record_latency(request, call_next):
+    """
+    Per-route handler latency, labelled by the route template (not the raw path).
+    An unhandled exception is recorded as a 500 before it propagates.
+    """
+    start = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        route = request.scope.get("route")
+        metrics.observe(
+            "circulars_api_request_seconds", time.perf_counter() - start,
+            buckets=metrics.FAST_BUCKETS,
+            path=getattr(route, "path", None) or request.scope.get("route_template", "unmatched"),
+            status=status,
+        )
+
+
+# Added last, so it is outermost: compresses every body, streamed NDJSON included
+if BrotliMiddleware is not None:
+    app.add_middleware(BrotliMiddleware, minimum_size=1024, gzip_fallback=True)
+else:
+    app.add_middleware(GZipMiddleware, minimum_size=1024)
+
+
 DASHBOARD_DIR = os.path.join(os.path.dirname(__file__), '..', 'dashboard')
 
-PDF_HEADERS = {
-    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
-    "Accept": "application/pdf,*/*",
-}
+async def get_client():
+    """Shared, process-wide async Supabase client (see supabase_client)."""
+    try:
+        return await supabase_client.get_async_client()
+    except supabase_client.SupabaseNotConfigured as e:
+        raise HTTPException(status_code=503, detail=str(e))
 
 
-def get_client():
-    url = os.getenv("SUPABASE_URL")
-    key = os.getenv("SUPABASE_SERVICE_KEY")
-    if not url or not key:
-        raise HTTPException(
-            status_code=503,
-            detail="SUPABASE_URL or SUPABASE_SERVICE_KEY not configured",
-        )
-    return create_client(url, key)
+@app.exception_handler(QueryError)
+async def query_error(request, exc):
+    """Malformed query on the SQLite backend: 400, as PostgREST would answer."""
+    return FastJSONResponse(status_code=400, content={"detail": str(exc)})
 
 
 @app.get("/api/health")
@@ -50,74 +244,291 @@ def health_check():
         "status": "ok",
         "supabase_url_set": bool(os.getenv("SUPABASE_URL")),
         "supabase_key_set": bool(os.getenv("SUPABASE_SERVICE_KEY")),
+        "response_cache": response_cache.cache.stats(),
+        "pdf_cache": pdf_cache.stats(),
+        "exchange_sessions": exchange_sessions.stats(),
     }
 
 
-@app.get("/api/circulars")
-def list_circulars(
-    source: str = Query(default=None, description="Filter by source: SEBI, BSE, NSE"),
-    days: int = Query(default=14, ge=1, le=90),
-    from_date: str = Query(default=None, description="Start date YYYY-MM-DD"),
-    to_date: str = Query(default=None, description="End date YYYY-MM-DD"),
-    category: str = Query(default=None, description="Filter by category"),
-):
-    """List circulars with optional source, date range, and category filters."""
-    client = get_client()
+@app.get("/metrics", include_in_schema=False)
+def prometheus_metrics():
+    """Counters and histograms from metrics, plus cache gauges sampled now."""
+    rc = response_cache.cache.stats()
+    pc = pdf_cache.stats()
+    gauges = {
+        "circulars_response_cache_entries": {(): rc["entries"]},
+        "circulars_response_cache_lookups": {
+            (("result", "hit"),): rc["hits"],
+            (("result", "miss"),): rc["misses"],
+        },
+        "circulars_pdf_cache_blobs": {(): pc["blobs"]},
+        "circulars_pdf_cache_bytes": {(): pc["bytes"]},
+        "circulars_exchange_handshakes": {
+            (("source", name),): s["handshakes"] for name, s in exchange_sessions.stats().items()
+        },
+    }
+    return PlainTextResponse(metrics.render(gauges), media_type="text/plain; version=0.0.4")
 
-    if from_date and to_date:
-        cutoff_start = from_date
-        cutoff_end = to_date
+
+PAGE_SIZE = 100
+MAX_PAGE_SIZE = 500
+# Rows per database round trip in /api/circulars/stream
+STREAM_CHUNK = 1000
+# Circular IDs per bookmark lookup (keeps the PostgREST query string short, as
+# store_circulars.LOOKUP_CHUNK does): 100 UUIDs is ~4 KB of URL, 1000 is ~39 KB
+BOOKMARK_LOOKUP_CHUNK = 100
+
+# Default projection for list endpoints — exactly what the dashboard table renders
+LIST_FIELDS = (
+    "id", "title", "circular_number", "published_date",
+    "source", "category", "pdf_url", "detail_url",
+)
+# Columns a `fields=` list may name (sql/001–004; search_tsv is internal)
+CIRCULAR_COLUMNS = frozenset({
+    "id", "source", "title", "circular_number", "published_date", "detail_url",
+    "pdf_url", "category", "department", "created_at",
+    "pdf_sha256", "pdf_size", "pdf_content_type",
+    "body_text", "page_count", "text_sha256",
+})
+
+
+def _select_columns(fields, required=("id",)):
+    """
+    PostgREST select string for a `fields=` parameter:
+    None → LIST_FIELDS, "all" → "*", else a comma-separated list of CIRCULAR_COLUMNS.
+    Unknown names are a 400 here, before any query runs.
+    """
+    if not fields:
+        columns = list(LIST_FIELDS)
+    elif fields.strip().lower() == "all":
+        return "*"
     else:
-        cutoff_start = (datetime.now() - timedelta(days=days)).strftime("%Y-%m-%d")
-        cutoff_end = datetime.now().strftime("%Y-%m-%d")
+        columns = [f.strip().lower() for f in fields.split(",") if f.strip()]
+        unknown = [f for f in columns if f not in CIRCULAR_COLUMNS]
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown field(s): {', '.join(unknown)}")
+    for name in required:
+        if name not in columns:
+            columns.insert(0, name)
+    return ", ".join(dict.fromkeys(columns))
+
+
+def _encode_cursor(row, total):
+    """Opaque keyset cursor: position (published_date, id) plus the first page's total."""
+    payload = json.dumps([row["published_date"], row["id"], total], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def _decode_cursor(cursor):
+    """
+    (published_date, id, total) from a cursor. Both keys are re-formatted from
+    their parsed values, since they are spliced into the keyset or_() filter.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        published_date, circular_id, total = json.loads(base64.urlsafe_b64decode(padded))
+        published_date = datetime.strptime(published_date, "%Y-%m-%d").strftime("%Y-%m-%d")
+        return published_date, str(uuid.UUID(circular_id)), int(total)
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
 
-    query = (
-        client.table("circulars")
-        .select("*")
-        .gte("published_date", cutoff_start)
-        .lte("published_date", cutoff_end)
-        .order("published_date", desc=True)
-    )
 
+def _date_window(days, from_date, to_date):
+    if from_date and to_date:
+        return from_date, to_date
+    now = datetime.now()
+    return (now - timedelta(days=days)).strftime("%Y-%m-%d"), now.strftime("%Y-%m-%d")
+
+
+def _filter_circulars(query, start, end, source=None, category=None):
+    query = query.gte("published_date", start).lte("published_date", end)
     if source:
         query = query.eq("source", source.upper())
-
     if category:
         query = query.eq("category", category)
+    return query
+
 
-    result = query.execute()
+def _newest_first(query, limit, after=None):
+    """Order by (published_date, id) desc; `after` = (date, id) continues past that row."""
+    query = query.order("published_date", desc=True).order("id", desc=True).limit(limit)
+    if after:
+        after_date, after_id = after
+        query = query.or_(
+            f"published_date.lt.{after_date},"
+            f"and(published_date.eq.{after_date},id.lt.{after_id})"
+        )
+    return query
 
-    # Annotate with bookmark status
-    bookmarks_result = client.table("bookmarks").select("circular_id").execute()
-    bookmarked_ids = set(b["circular_id"] for b in bookmarks_result.data)
 
-    for circular in result.data:
+async def _mark_bookmarked(client, rows):
+    """
+    Set is_bookmarked on each row, looking up only these rows' IDs —
+    BOOKMARK_LOOKUP_CHUNK at a time, the lookups running concurrently.
+    """
+    ids = [c["id"] for c in rows]
+    results = await asyncio.gather(*(
+        client.table("bookmarks")
+        .select("circular_id")
+        .in_("circular_id", ids[i:i + BOOKMARK_LOOKUP_CHUNK])
+        .execute()
+        for i in range(0, len(ids), BOOKMARK_LOOKUP_CHUNK)
+    ))
+    bookmarked_ids = {b["circular_id"] for result in results for b in result.data}
+
+    for circular in rows:
         circular["is_bookmarked"] = circular["id"] in bookmarked_ids
+    return rows
 
-    return {
-        "circulars": result.data,
-        "total": len(result.data),
+
+@app.get("/api/circulars")
+@cached("circulars", normalize={"source": str.upper, "fields": str.lower})
+async def list_circulars(
+    source: str = Query(default=None, description="Filter by source: SEBI, BSE, NSE"),
+    days: int = Query(default=14, ge=1, le=90),
+    from_date: str = Query(default=None, description="Start date YYYY-MM-DD"),
+    to_date: str = Query(default=None, description="End date YYYY-MM-DD"),
+    category: str = Query(default=None, description="Filter by category"),
+    limit: int = Query(default=PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE, description="Page size"),
+    cursor: str = Query(default=None, description="next_cursor from the previous page"),
+    fields: str = Query(default=None, description="Comma-separated columns, or 'all' (default: table columns)"),
+):
+    """
+    List circulars newest first, one page at a time, with optional source,
+    date range, and category filters. Pages are keyset-paginated on
+    (published_date, id); pass `next_cursor` back as `cursor` for the next page.
+    The serialized page is what gets cached, so cache hits skip encoding too.
+    On the first page the count and the rows are fetched concurrently.
+    """
+    client = await get_client()
+    columns = _select_columns(fields, required=("id", "published_date"))
+    start, end = _date_window(days, from_date, to_date)
+
+    after = None
+    if cursor:
+        after_date, after_id, total = _decode_cursor(cursor)
+        after = (after_date, after_id)
+
+    query = _filter_circulars(client.table("circulars").select(columns), start, end, source, category)
+    page = _newest_first(query, limit + 1, after).execute()
+    if cursor:
+        rows = (await page).data
+    else:
+        count_result, page_result = await asyncio.gather(
+            _filter_circulars(
+                client.table("circulars").select("id", count="exact", head=True),
+                start, end, source, category,
+            ).execute(),
+            page,
+        )
+        total = count_result.count or 0
+        rows = page_result.data
+    has_more = len(rows) > limit
+    rows = await _mark_bookmarked(client, rows[:limit])
+
+    return FastJSONResponse({
+        "circulars": rows,
+        "total": total,
+        "next_cursor": _encode_cursor(rows[-1], total) if has_more else None,
         "last_updated": datetime.now(timezone.utc).isoformat(),
-    }
+    })
+
+
+@app.get("/api/circulars/stream")
+async def stream_circulars(
+    source: str = Query(default=None, description="Filter by source: SEBI, BSE, NSE"),
+    days: int = Query(default=14, ge=1, le=90),
+    from_date: str = Query(default=None, description="Start date YYYY-MM-DD"),
+    to_date: str = Query(default=None, description="End date YYYY-MM-DD"),
+    category: str = Query(default=None, description="Filter by category"),
+    fields: str = Query(default=None, description="Comma-separated columns, or 'all' (default: table columns)"),
+):
+    """
+    Every circular in the window as NDJSON (one object per line), newest first.
+    Rows are fetched STREAM_CHUNK at a time and written as each chunk arrives, so
+    time to first byte and memory stay flat however large the window is.
+    """
+    client = await get_client()
+    columns = _select_columns(fields, required=("id", "published_date"))
+    start, end = _date_window(days, from_date, to_date)
+
+    async def chunks():
+        after = None
+        while True:
+            query = _filter_circulars(client.table("circulars").select(columns), start, end, source, category)
+            rows = (await _newest_first(query, STREAM_CHUNK, after).execute()).data
+            rows = await _mark_bookmarked(client, rows)
+            if not rows:
+                return
+            yield b"".join(dumps(row) + b"\n" for row in rows)
+            if len(rows) < STREAM_CHUNK:
+                return
+            after = (rows[-1]["published_date"], rows[-1]["id"])
+
+    return StreamingResponse(chunks(), media_type="application/x-ndjson")
+
+
+SEARCH_PAGE_SIZE = 20
+
+
+@app.get("/api/search")
+@cached("search", normalize={"source": str.upper})
+async def search_circulars(
+    q: str = Query(..., min_length=2, max_length=200, description="Search terms (web-search syntax)"),
+    source: str = Query(default=None, description="Filter by source: SEBI, BSE, NSE"),
+    limit: int = Query(default=SEARCH_PAGE_SIZE, ge=1, le=100),
+    offset: int = Query(default=0, ge=0, le=10000),
+):
+    """
+    Full-text search over circular titles, numbers and PDF text, best matches first.
+    Rows carry is_bookmarked, like /api/circulars.
+    """
+    client = await get_client()
+    result = await client.rpc("search_circulars", {
+        "q": q.strip(),
+        "source_filter": source.upper() if source else None,
+        "page_size": limit,
+        "page_offset": offset,
+    }).execute()
+
+    rows = result.data or []
+    total = rows[0]["total"] if rows else 0
+    for row in rows:
+        del row["total"]
+    rows = await _mark_bookmarked(client, rows)
+
+    return FastJSONResponse({
+        "results": rows,
+        "total": total,
+        "limit": limit,
+        "offset": offset,
+        "next_offset": offset + len(rows) if offset + len(rows) < total else None,
+    })
 
 
 @app.get("/api/categories")
-def list_categories():
-    """Get distinct category values from all circulars."""
-    client = get_client()
-    result = client.table("circulars").select("category").execute()
-    categories = sorted(set(
-        row["category"] for row in result.data
-        if row.get("category") and row["category"].strip()
-    ))
-    return {"categories": categories}
+@cached("categories", normalize={"source": str.upper})
+async def list_categories(
+    source: str = Query(default=None, description="Filter by source: SEBI, BSE, NSE"),
+):
+    """Distinct categories (optionally for one source) with circular counts."""
+    client = await get_client()
+    query = client.table("circular_categories").select("category, n")
+    if source:
+        query = query.eq("source", source.upper())
+
+    counts = {}
+    for row in (await query.execute()).data:
+        counts[row["category"]] = counts.get(row["category"], 0) + row["n"]
+    categories = sorted(counts)
+    return {"categories": categories, "counts": {c: counts[c] for c in categories}}
 
 
 @app.get("/api/circulars/{circular_id}")
-def get_circular(circular_id: str):
+async def get_circular(circular_id: str):
     """Get a single circular by ID."""
-    client = get_client()
-    result = (
+    client = await get_client()
+    result = await (
         client.table("circulars")
         .select("*")
         .eq("id", circular_id)
@@ -129,15 +540,20 @@ def get_circular(circular_id: str):
 
 
 @app.get("/api/circulars/{circular_id}/pdf")
-def download_pdf(
+async def download_pdf(
     circular_id: str,
     mode: str = Query(default="download", description="'view' for inline, 'download' for attachment"),
 ):
-    """Proxy-download the PDF from the original regulatory website."""
-    client = get_client()
-    result = (
+    """
+    Serve the circular's PDF, proxied from the original regulatory website.
+    Documents are kept in the local blob cache, so only the first view goes upstream
+    (or to the storage bucket, for documents the pipeline already prefetched).
+    The download is streamed into the cache with httpx on the event loop.
+    """
+    client = await get_client()
+    result = await (
         client.table("circulars")
-        .select("title, pdf_url, source")
+        .select("title, pdf_url, source, pdf_sha256, pdf_content_type")
         .eq("id", circular_id)
         .execute()
     )
@@ -149,73 +565,69 @@ def download_pdf(
     if not pdf_url:
         raise HTTPException(status_code=404, detail="No PDF available for this circular")
 
-    headers = dict(PDF_HEADERS)
-    source = circular["source"]
-    if source == "NSE":
-        headers["Referer"] = "https://www.nseindia.com/"
-        headers["Accept-Language"] = "en-US,en;q=0.9"
-    elif source == "BSE":
-        headers["Referer"] = "https://www.bseindia.com/"
-    elif source == "SEBI":
-        headers["Referer"] = "https://www.sebi.gov.in/"
+    async def fetch():
+        # Prefetched documents come from our own bucket instead of the exchange
+        if circular.get("pdf_sha256") and pdf_fetcher.STORAGE_BUCKET:
+            try:
+                return await pdf_fetcher.aopen_stored(
+                    client, circular["pdf_sha256"], circular.get("pdf_content_type"))
+            except Exception as e:
+                print(f"[API] Storage miss for {circular_id}, fetching upstream: {e}")
+        return await pdf_fetcher.aopen_pdf(pdf_url, circular["source"])
 
     try:
-        session = http_requests.Session()
-        session.headers.update(headers)
-        if source == "NSE":
-            session.get("https://www.nseindia.com/", timeout=10)
-
-        resp = session.get(pdf_url, timeout=30, stream=True)
-        resp.raise_for_status()
-
-        content_type = resp.headers.get("Content-Type", "application/pdf")
-        safe_title = "".join(c for c in circular["title"] if c.isalnum() or c in " -_")[:60]
-
-        # Detect file extension from URL
-        if pdf_url.endswith(".zip"):
-            ext = ".zip"
-            content_type = "application/zip"
-        elif pdf_url.endswith(".pdf"):
-            ext = ".pdf"
-            content_type = "application/pdf"
-        else:
-            ext = ".pdf"
-
-        filename = f"{safe_title}{ext}"
-
-        # ZIPs can't be viewed inline — always force download
-        if ext == ".zip" or mode == "download":
-            disposition = f'attachment; filename="{filename}"'
-        else:
-            disposition = f'inline; filename="{filename}"'
-
-        return StreamingResponse(
-            resp.iter_content(chunk_size=8192),
-            media_type=content_type,
-            headers={"Content-Disposition": disposition},
-        )
+        blob = await pdf_cache.aget_or_fetch(pdf_url, fetch)
     except Exception as e:
         raise HTTPException(status_code=502, detail=f"Failed to fetch PDF: {str(e)}")
 
+    content_type = blob.content_type or "application/pdf"
+    safe_title = "".join(c for c in circular["title"] if c.isalnum() or c in " -_")[:60]
 
-@app.get("/api/stats")
-def get_stats():
-    """Get circular counts per source."""
-    client = get_client()
-    cutoff = (datetime.now() - timedelta(days=14)).strftime("%Y-%m-%d")
-
-    stats = {}
-    for source in ["SEBI", "BSE", "NSE"]:
-        result = (
-            client.table("circulars")
-            .select("id", count="exact")
-            .eq("source", source)
-            .gte("published_date", cutoff)
-            .execute()
-        )
-        stats[source] = result.count if result.count else 0
+    # Detect file extension from URL
+    if pdf_url.endswith(".zip"):
+        ext = ".zip"
+        content_type = "application/zip"
+    elif pdf_url.endswith(".pdf"):
+        ext = ".pdf"
+        content_type = "application/pdf"
+    else:
+        ext = ".pdf"
+
+    filename = f"{safe_title}{ext}"
 
-    stats["total"] = sum(stats.values())
+    # ZIPs can't be viewed inline — always force download
+    if ext == ".zip" or mode == "download":
+        disposition = f'attachment; filename="{filename}"'
+    else:
+        disposition = f'inline; filename="{filename}"'
+
+    # FileResponse sets Content-Length, uses sendfile, and honours Range requests
+    return FileResponse(
+        blob.path,
+        media_type=content_type,
+        headers={"Content-Disposition": disposition},
+    )
+
+
+@app.get("/api/stats")
+@cached("stats")
+async def get_stats(
+    days: int = Query(default=14, ge=1, le=3650, description="Window in days, counted back from today"),
+):
+    """
+    Circular counts for the last `days` days: per source (top-level keys, as the
+    dashboard header reads them), per category and per day. One RPC over the
+    precomputed aggregates (sql/005).
+    """
+    client = await get_client()
+    data = (await client.rpc("circular_stats", {"window_days": days}).execute()).data or {}
+
+    by_source = data.get("by_source") or {}
+    stats = {source: by_source.get(source, 0) for source in ["SEBI", "BSE", "NSE"]}
+    stats["total"] = data.get("total", 0)
+    stats["days"] = days
+    stats["by_category"] = data.get("by_category", [])
+    stats["by_day"] = data.get("by_day", [])
     stats["last_updated"] = datetime.now(timezone.utc).isoformat()
     return stats
 
@@ -223,10 +635,13 @@ def get_stats():
 # === Bookmark endpoints ===
 
 @app.get("/api/bookmarks")
-def list_bookmarks():
+async def list_bookmarks(
+    fields: str = Query(default=None, description="Comma-separated columns, or 'all' (default: table columns)"),
+):
     """Get all bookmarked circulars."""
-    client = get_client()
-    bookmarks_result = (
+    client = await get_client()
+    columns = _select_columns(fields)
+    bookmarks_result = await (
         client.table("bookmarks")
         .select("circular_id, created_at")
         .order("created_at", desc=True)
@@ -237,9 +652,9 @@ def list_bookmarks():
         return {"bookmarks": [], "total": 0}
 
     circular_ids = [b["circular_id"] for b in bookmarks_result.data]
-    circulars_result = (
+    circulars_result = await (
         client.table("circulars")
-        .select("*")
+        .select(columns)
         .in_("id", circular_ids)
         .execute()
     )
@@ -253,35 +668,56 @@ def list_bookmarks():
             circular["bookmarked_at"] = b["created_at"]
             bookmarks.append(circular)
 
-    return {"bookmarks": bookmarks, "total": len(bookmarks)}
+    return FastJSONResponse({"bookmarks": bookmarks, "total": len(bookmarks)})
 
 
 @app.post("/api/bookmarks/{circular_id}")
-def add_bookmark(circular_id: str):
+async def add_bookmark(circular_id: str):
     """Bookmark a circular."""
-    client = get_client()
-    circular = client.table("circulars").select("id").eq("id", circular_id).execute()
+    client = await get_client()
+    circular = await client.table("circulars").select("id").eq("id", circular_id).execute()
     if not circular.data:
         raise HTTPException(status_code=404, detail="Circular not found")
 
     try:
-        client.table("bookmarks").upsert(
+        await client.table("bookmarks").upsert(
             {"circular_id": circular_id},
             on_conflict="circular_id",
         ).execute()
+        response_cache.invalidate("circulars")
+        response_cache.invalidate("search")
+        _forget_data_versions()
         return {"status": "bookmarked", "circular_id": circular_id}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to bookmark: {str(e)}")
 
 
 @app.delete("/api/bookmarks/{circular_id}")
-def remove_bookmark(circular_id: str):
+async def remove_bookmark(circular_id: str):
     """Remove a bookmark."""
-    client = get_client()
-    client.table("bookmarks").delete().eq("circular_id", circular_id).execute()
+    client = await get_client()
+    await client.table("bookmarks").delete().eq("circular_id", circular_id).execute()
+    response_cache.invalidate("circulars")
+    response_cache.invalidate("search")
+    _forget_data_versions()
     return {"status": "removed", "circular_id": circular_id}
 
 
+# === Cache control ===
+
+@app.post("/api/cache/invalidate")
+async def invalidate_cache(x_cache_token: str = Header(default=None)):
+    """Drop all cached responses. Called by the pipeline after it writes."""
+    token = os.getenv("CACHE_INVALIDATE_TOKEN")
+    if not token:
+        raise HTTPException(status_code=503, detail="CACHE_INVALIDATE_TOKEN not configured")
+    if not x_cache_token or not hmac.compare_digest(x_cache_token, token):
+        raise HTTPException(status_code=403, detail="Invalid cache token")
+    dropped = response_cache.invalidate()
+    _forget_data_versions()
+    return {"status": "invalidated", "entries": dropped}
+
+
 # === Dashboard serving ===
 
 @app.get("/")
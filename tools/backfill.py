@@ -0,0 +1,183 @@
+"""
+Tool: Backfill
+Loads historical circulars over an arbitrary date range. The range is split into
+per-source chunks (NSE: from_date/to_date windows of its circulars API; SEBI: date
+windows whose listing pages are walked via nextValue), and chunks from all sources
+are scraped → PDF-resolved → stored in parallel. Every stored chunk is checkpointed
+in pipeline_state, so an interrupted backfill resumes where it stopped.
+Rows go through store_circulars in bulk; aggregates are refreshed once at the end.
+
+BSE's listing API takes no dates (it returns recent circulars), so BSE is one chunk
+filtered to the range — it cannot reach further back than the API lists. Such
+sources are never checkpointed (nothing proves the range was covered); they are
+re-listed on every run, which is one request plus cached detail lookups.
+
+Usage:
+    python tools/backfill.py --from 2020-01-01                      # all sources, up to today
+    python tools/backfill.py --from 2018-01-01 --to 2021-12-31 --sources SEBI,NSE
+    python tools/backfill.py --from 2020-01-01 --workers 8          # more chunks in flight
+    python tools/backfill.py --from 2020-01-01 --restart            # ignore checkpoints
+"""
+
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+import metrics
+import pipeline_engine
+import pipeline_state
+from store_circulars import refresh_aggregates, store_circulars
+
+# Days per chunk for sources whose listing is date-addressable. Others are
+# backfilled as a single, never-checkpointed chunk.
+CHUNK_DAYS = {"NSE": 30, "SEBI": 90}
+DEFAULT_WORKERS = 4
+
+
+def plan_chunks(start, end, chunk_days=None):
+    """[(from, to), ...] YYYY-MM-DD windows covering start..end, newest first."""
+    first = datetime.strptime(start, "%Y-%m-%d")
+    last = datetime.strptime(end, "%Y-%m-%d")
+    if first > last:
+        raise ValueError(f"Backfill start {start} is after end {end}")
+    if not chunk_days:
+        return [(start, end)]
+
+    chunks = []
+    chunk_end = last
+    while chunk_end >= first:
+        chunk_start = max(first, chunk_end - timedelta(days=chunk_days - 1))
+        chunks.append((chunk_start.strftime("%Y-%m-%d"), chunk_end.strftime("%Y-%m-%d")))
+        chunk_end = chunk_start - timedelta(days=1)
+    return chunks
+
+
+def run_chunk(source, chunk, tag="Backfill"):
+    """
+    Scrape → resolve PDFs → store one (from, to) chunk. It is checkpointed only if the
+    source's listing is date-addressable (CHUNK_DAYS) and every row stored.
+    """
+    since, until = chunk
+    days = (datetime.strptime(until, "%Y-%m-%d") - datetime.strptime(since, "%Y-%m-%d")).days + 1
+    start = time.perf_counter()
+
+    if source.resolve_pdfs:
+        circulars = source.scrape(days=days, since=since, until=until, resolve_pdfs=False)
+        source.resolve_pdfs(circulars)
+    else:
+        circulars = source.scrape(days=days, since=since, until=until)
+
+    counts = store_circulars(circulars, refresh=False)
+    counts["scraped"] = len(circulars)
+    if not counts["failed"]:
+        if source.name in CHUNK_DAYS:
+            pipeline_state.mark_backfill_chunk(source.name, chunk, counts)
+        pipeline_state.advance_high_water(source.name, circulars)
+
+    elapsed = time.perf_counter() - start
+    metrics.observe("circulars_stage_seconds", elapsed, source=source.name, stage="backfill_chunk")
+    print(f"[{tag}] {source.name} {since}..{until}: {counts['scraped']} scraped, "
+          f"{counts['inserted']} new, {counts['updated']} updated, {counts['failed']} failed "
+          f"({elapsed:.1f}s)")
+    return counts
+
+
+def backfill(start, end=None, sources=None, workers=DEFAULT_WORKERS, chunk_days=None,
+             restart=False, tag="Backfill"):
+    """
+    Backfill `sources` (default: all) from `start` to `end` (YYYY-MM-DD, default today).
+    `chunk_days` overrides CHUNK_DAYS for every date-addressable source. Chunks already checkpointed
+    are skipped unless restart=True. Returns {source: totals dict}.
+    """
+    end = end or datetime.now().strftime("%Y-%m-%d")
+    selected = pipeline_engine.resolve_sources(sources)
+
+    tasks = []
+    totals = {}
+    for source in selected:
+        if restart:
+            pipeline_state.reset_backfill(source.name)
+        done = pipeline_state.backfill_done(source.name)
+        size = (chunk_days or CHUNK_DAYS[source.name]) if source.name in CHUNK_DAYS else None
+        chunks = plan_chunks(start, end, size)
+        pending = [c for c in chunks if f"{c[0]}..{c[1]}" not in done]
+        totals[source.name] = {
+            "chunks": len(chunks), "resumed": len(chunks) - len(pending), "scraped": 0,
+            "inserted": 0, "updated": 0, "unchanged": 0, "failed": 0, "errors": 0,
+        }
+        tasks.extend((source, chunk) for chunk in pending)
+        print(f"[{tag}] {source.name}: {len(pending)} of {len(chunks)} chunks to run")
+        if source.name not in CHUNK_DAYS:
+            print(f"[{tag}] {source.name}: listing is not date-addressable — only circulars "
+                  f"it still lists are loaded, and the range is not checkpointed")
+
+    # Interleave sources so every exchange is worked on (and rate limited) at once
+    tasks.sort(key=lambda t: (t[1][1], t[0].name), reverse=True)
+
+    start_time = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        futures = {pool.submit(run_chunk, source, chunk, tag): (source, chunk) for source, chunk in tasks}
+        for future in as_completed(futures):
+            source, chunk = futures[future]
+            total = totals[source.name]
+            try:
+                counts = future.result()
+            except Exception as e:
+                print(f"[{tag}] {source.name} {chunk[0]}..{chunk[1]} failed: {e}")
+                total["errors"] += 1
+                continue
+            for key in ("scraped", "inserted", "updated", "unchanged", "failed"):
+                total[key] += counts[key]
+
+    touched = {name for name, t in totals.items() if t["inserted"] or t["updated"]}
+    if touched:
+        refresh_aggregates(sources=touched)
+        pipeline_engine.invalidate_api_cache(tag)
+
+    elapsed = time.perf_counter() - start_time
+    print(f"\n[{tag}] === DONE in {elapsed:.1f}s ({start}..{end}) ===")
+    for name, t in totals.items():
+        status = (f"{t['scraped']} scraped, {t['inserted']} new, {t['updated']} updated, "
+                  f"{t['failed']} failed [{t['chunks']} chunks, {t['resumed']} resumed]")
+        if t["errors"] or t["failed"]:
+            status += f" — {t['errors']} chunk errors; re-run to retry unfinished chunks"
+        print(f"  {name}: {status}")
+    return totals
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Backfill historical SEBI/BSE/NSE circulars.")
+    parser.add_argument("--from", dest="start", required=True, help="First date, YYYY-MM-DD")
+    parser.add_argument("--to", dest="end", default=None, help="Last date, YYYY-MM-DD (default: today)")
+    parser.add_argument("--sources", default=None,
+                        help="Comma-separated sources to backfill (default: all), e.g. SEBI,NSE")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS,
+                        help=f"Chunks processed concurrently (default: {DEFAULT_WORKERS})")
+    parser.add_argument("--chunk-days", type=int, default=None,
+                        help="Days per chunk for NSE/SEBI (default: per-source)")
+    parser.add_argument("--restart", action="store_true",
+                        help="Discard checkpoints and backfill every chunk again")
+    args = parser.parse_args(argv)
+
+    sources = [s.strip() for s in args.sources.split(",") if s.strip()] if args.sources else None
+    try:
+        totals = backfill(
+            args.start,
+            args.end,
+            sources=sources,
+            workers=args.workers,
+            chunk_days=args.chunk_days,
+            restart=args.restart,
+        )
+    except ValueError as e:
+        parser.error(str(e))
+    return 0 if all(not t["errors"] and not t["failed"] for t in totals.values()) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,133 @@
+"""
+Tool: Exchange Session Manager
+One shared cookie jar per exchange. The homepage/listing handshake that issues
+NSE's Akamai cookies (and BSE/SEBI session cookies) runs once per cookie lifetime
+instead of once per request, and is refreshed in the background shortly before
+the cookies expire — as long as the jar is still being used.
+Used by the scrapers and by the API's PDF proxy.
+"""
+
+import threading
+import time
+
+import requests
+
+import metrics
+
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+
+# source → (handshake URL, seconds to wait after it, fallback lifetime for session cookies)
+HANDSHAKES = {
+    "NSE": ("https://www.nseindia.com/", 1.0, 15 * 60),
+    "BSE": ("https://www.bseindia.com/", 0.5, 30 * 60),
+    "SEBI": ("https://www.sebi.gov.in/sebiweb/home/HomeAction.do?doListing=yes&sid=1&ssid=7&smid=0", 0.0, 10 * 60),
+}
+
+# Refresh once this fraction of the cookie lifetime has passed
+REFRESH_AT = 0.8
+# Cap on lifetime taken from cookie expiry (Akamai often sets long-lived trackers)
+MAX_LIFETIME = 2 * 3600
+
+
+class SessionManager:
+    """Warm cookie jar for one exchange. Thread-safe."""
+
+    def __init__(self, source, url, settle=0.0, default_ttl=600):
+        self.source = source
+        self.url = url
+        self.settle = settle
+        self.default_ttl = default_ttl
+        self._jar = requests.cookies.RequestsCookieJar()
+        self._lock = threading.Lock()       # one handshake at a time
+        self._jar_lock = threading.Lock()   # swapping / copying the published jar
+        self._expires_at = 0.0
+        self._last_used = 0.0
+        self._timer = None
+        self.handshakes = 0
+
+    @property
+    def fresh(self):
+        return time.time() < self._expires_at
+
+    def cookies(self):
+        """Return a copy of the warm cookie jar, doing the handshake first if it has expired."""
+        self._last_used = time.time()
+        if not self.fresh:
+            with self._lock:
+                if not self.fresh:
+                    self._handshake()
+        return self._current()
+
+    def _current(self):
+        with self._jar_lock:
+            return self._jar.copy()
+
+    def apply(self, session):
+        """Copy the warm cookies into a caller's requests.Session."""
+        session.cookies.update(self.cookies())
+        return session
+
+    def refresh(self):
+        """Force a new handshake (e.g. after a 403) and return a copy of the new jar."""
+        with self._lock:
+            self._handshake()
+        return self._current()
+
+    def _handshake(self):
+        # Handshake in a fresh session and publish its jar only when complete, so
+        # readers never see the cleared or half-filled jar while the GET is in flight
+        with metrics.instrument(requests.Session()) as session:
+            session.headers.update({"User-Agent": USER_AGENT, "Accept": "text/html,*/*"})
+            session.get(self.url, timeout=10)
+        self.handshakes += 1
+        if self.settle:
+            time.sleep(self.settle)
+        with self._jar_lock:
+            self._jar = session.cookies
+
+        now = time.time()
+        lifetime = self.default_ttl
+        expiries = [c.expires for c in session.cookies if c.expires]
+        if expiries:
+            lifetime = max(60, min(min(expiries) - now, MAX_LIFETIME))
+        self._expires_at = now + lifetime
+        self._schedule(lifetime * REFRESH_AT)
+
+    def _schedule(self, delay):
+        if self._timer:
+            self._timer.cancel()
+        self._timer = threading.Timer(delay, self._background_refresh)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def _background_refresh(self):
+        # Stop refreshing once nobody has used the jar for a full lifetime
+        if time.time() - self._last_used > self.default_ttl:
+            return
+        try:
+            self.refresh()
+        except Exception as e:
+            print(f"[Sessions] {self.source} background refresh failed: {e}")
+
+
+_managers = {}
+_managers_lock = threading.Lock()
+
+
+def get(source):
+    """Return the process-wide SessionManager for an exchange."""
+    with _managers_lock:
+        manager = _managers.get(source)
+        if manager is None:
+            url, settle, ttl = HANDSHAKES[source]
+            manager = SessionManager(source, url, settle, ttl)
+            _managers[source] = manager
+        return manager
+
+
+def stats():
+    with _managers_lock:
+        return {
+            name: {"fresh": m.fresh, "handshakes": m.handshakes}
+            for name, m in _managers.items()
+        }
@@ -0,0 +1,174 @@
+"""
+Tool: PDF Text Extraction
+Pipeline stage that turns prefetched documents into searchable text.
+Runs after prefetch_pdfs: PDFs (and PDFs inside BSE .zip attachments) are parsed
+page by page in a process pool, normalized, and stored on the circular row as
+body_text + page_count. text_sha256 records which document the text came from,
+so a re-run only touches circulars whose PDF has not been extracted yet, and each
+distinct document is parsed once no matter how many circulars point at it.
+"""
+
+import os
+import re
+import shutil
+import tempfile
+import unicodedata
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import pdf_cache
+import pdf_fetcher
+from supabase_client import get_client
+
+BATCH_LIMIT = 200
+
+# Postgres tsvectors are capped at 1 MB; keep stored text comfortably below that
+MAX_TEXT_CHARS = 500_000
+
+_SPACES = re.compile(r"[ \t]+")
+_BLANK_LINES = re.compile(r"\n{3,}")
+
+
+def normalize_text(text):
+    text = unicodedata.normalize("NFKC", text).replace("\x00", "")
+    text = "\n".join(_SPACES.sub(" ", line).strip() for line in text.splitlines())
+    return _BLANK_LINES.sub("\n\n", text).strip()
+
+
+def _extract_pdf(fileobj, parts, budget):
+    """Append normalized page texts to `parts`, one page at a time. Returns (pages, chars used)."""
+    from pypdf import PdfReader
+
+    reader = PdfReader(fileobj)
+    pages = 0
+    used = 0
+    for page in reader.pages:
+        pages += 1
+        if used >= budget:
+            continue  # still count pages, stop keeping text
+        try:
+            text = normalize_text(page.extract_text() or "")
+        except Exception:
+            text = ""
+        if text:
+            text = text[:budget - used]
+            parts.append(text)
+            used += len(text) + 2
+    return pages, used
+
+
+def extract_file(path):
+    """
+    Extract text from a cached document (PDF, or ZIP of PDFs).
+    Runs in a worker process. Returns (text, page_count).
+    """
+    parts = []
+    pages = 0
+    budget = MAX_TEXT_CHARS
+
+    if zipfile.is_zipfile(path):
+        with zipfile.ZipFile(path) as archive:
+            for member in archive.infolist():
+                if not member.filename.lower().endswith(".pdf") or budget <= 0:
+                    continue
+                # pypdf needs a seekable file; spill each member to disk rather than memory
+                with tempfile.TemporaryFile() as tmp:
+                    with archive.open(member) as src:
+                        shutil.copyfileobj(src, tmp, pdf_cache.CHUNK_SIZE)
+                    tmp.seek(0)
+                    n, used = _extract_pdf(tmp, parts, budget)
+                pages += n
+                budget -= used
+    else:
+        with open(path, "rb") as f:
+            pages, _ = _extract_pdf(f, parts, budget)
+
+    return "\n\n".join(parts), pages
+
+
+def pending_circulars(client, source=None, limit=BATCH_LIMIT):
+    """Prefetched circulars whose text has not been extracted yet."""
+    query = (
+        client.table("circulars")
+        .select("id, source, pdf_url, pdf_sha256, pdf_content_type")
+        .not_.is_("pdf_sha256", "null")
+        .is_("text_sha256", "null")
+        .order("published_date", desc=True)
+        .limit(limit)
+    )
+    if source:
+        query = query.eq("source", source)
+    return query.execute().data
+
+
+def _local_path(client, row):
+    """Path of the document in pdf_cache, fetching it (bucket first, then upstream) if needed."""
+    def fetch():
+        if pdf_fetcher.STORAGE_BUCKET:
+            try:
+                return pdf_fetcher.open_stored(client, row["pdf_sha256"], row.get("pdf_content_type"))
+            except Exception:
+                pass
+        return pdf_fetcher.open_pdf(row["pdf_url"], row["source"])
+
+    return pdf_cache.get_or_fetch(row["pdf_url"], fetch).path
+
+
+def extract_texts(source=None, max_workers=None, tag="Extract"):
+    """
+    Extract and store text for every pending circular (optionally for one source).
+    Returns counts: {extracted, failed}.
+    """
+    client = get_client()
+    rows = pending_circulars(client, source)
+    counts = {"extracted": 0, "failed": 0}
+    if not rows:
+        return counts
+
+    # One parse per distinct document
+    by_hash = {}
+    for row in rows:
+        by_hash.setdefault(row["pdf_sha256"], []).append(row)
+
+    paths = {}
+    for sha256, group in by_hash.items():
+        try:
+            paths[sha256] = _local_path(client, group[0])
+        except Exception as e:
+            print(f"  [{tag}] Could not load {group[0]['pdf_url']} — {e}")
+            counts["failed"] += len(group)
+
+    workers = max_workers or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=max(1, min(workers, len(paths) or 1))) as pool:
+        futures = {sha256: pool.submit(extract_file, path) for sha256, path in paths.items()}
+        for sha256, future in futures.items():
+            group = by_hash[sha256]
+            try:
+                text, page_count = future.result()
+            except BrokenProcessPool as e:
+                # Worker died (e.g. out of memory) — leave pending for the next run
+                print(f"  [{tag}] Worker crashed on {group[0]['pdf_url']} — {e}")
+                counts["failed"] += len(group)
+                continue
+            except Exception as e:
+                # Same bytes fail the same way — record it so re-runs don't retry forever
+                print(f"  [{tag}] Unreadable document: {group[0]['pdf_url']} — {e}")
+                text, page_count = "", None
+            try:
+                client.table("circulars").update({
+                    "body_text": text,
+                    "page_count": page_count,
+                    "text_sha256": sha256,
+                }).in_("id", [r["id"] for r in group]).execute()
+                counts["extracted"] += len(group)
+            except Exception as e:
+                print(f"  [{tag}] Failed: {group[0]['pdf_url']} — {e}")
+                counts["failed"] += len(group)
+
+    return counts
+
+
+if __name__ == "__main__":
+    result = extract_texts()
+    print(f"[Extract] {result['extracted']} extracted, {result['failed']} failed")
@@ -0,0 +1,177 @@
+"""
+Tool: Metrics
+Process-wide counters and histograms for the pipeline and the API server,
+rendered in the Prometheus text format (GET /metrics) or as a JSON snapshot
+(the pipeline's per-run report). No external dependency; thread-safe.
+
+Series used across tools:
+    circulars_http_requests_total{host,status}      outbound HTTP (via instrument / instrument_async)
+    circulars_http_response_bytes_total{host}
+    circulars_http_request_seconds{host}             histogram
+    circulars_http_retries_total{source,reason}      scraper retries (403s, 530s, errors)
+    circulars_cache_requests_total{cache,result}     hit / miss
+    circulars_rows_total{source,result}              store_circulars outcomes
+    circulars_stage_seconds{source,stage}            histogram of pipeline stage timings
+    circulars_api_request_seconds{path,status}       histogram of API handler latency
+"""
+
+import threading
+import time
+from urllib.parse import urlparse
+
+DEFAULT_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+# For API handlers, which should mostly answer in milliseconds
+FAST_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+_lock = threading.Lock()
+_counters = {}     # name → {labels: value}
+_histograms = {}   # name → {labels: [bucket counts..., count, sum]}
+_buckets = {}      # histogram name → bucket bounds
+
+
+def _labels(labels):
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def inc(name, value=1, **labels):
+    """Add `value` to a counter series."""
+    key = _labels(labels)
+    with _lock:
+        series = _counters.setdefault(name, {})
+        series[key] = series.get(key, 0) + value
+
+
+def observe(name, seconds, buckets=DEFAULT_BUCKETS, **labels):
+    """Record one observation in a histogram series."""
+    key = _labels(labels)
+    with _lock:
+        bounds = _buckets.setdefault(name, tuple(buckets))
+        series = _histograms.setdefault(name, {})
+        state = series.get(key)
+        if state is None:
+            state = series[key] = [0] * (len(bounds) + 2)
+        for i, bound in enumerate(bounds):
+            if seconds <= bound:
+                state[i] += 1
+        state[-2] += 1
+        state[-1] += seconds
+
+
+def cache_result(cache, hit):
+    inc("circulars_cache_requests_total", cache=cache, result="hit" if hit else "miss")
+
+
+def _record_response(resp, *args, **kwargs):
+    host = urlparse(resp.url).netloc
+    inc("circulars_http_requests_total", host=host, status=resp.status_code)
+    observe("circulars_http_request_seconds", resp.elapsed.total_seconds(), host=host)
+    if kwargs.get("stream"):
+        size = int(resp.headers.get("Content-Length") or 0)
+    else:
+        size = len(resp.content)  # read now rather than right after the hook
+    inc("circulars_http_response_bytes_total", size, host=host)
+
+
+def instrument(session):
+    """Count every response a requests.Session receives. Returns the session."""
+    if _record_response not in session.hooks["response"]:
+        session.hooks["response"].append(_record_response)
+    return session
+
+
+async def _mark_request(request):
+    request.extensions["metrics_started"] = time.perf_counter()
+
+
+async def _record_async_response(response):
+    # Runs when the headers arrive: the body may still be streaming, so size
+    # comes from Content-Length and latency is time to first byte
+    host = urlparse(str(response.request.url)).netloc
+    inc("circulars_http_requests_total", host=host, status=response.status_code)
+    started = response.request.extensions.get("metrics_started")
+    if started is not None:
+        observe("circulars_http_request_seconds", time.perf_counter() - started, host=host)
+    inc("circulars_http_response_bytes_total", int(response.headers.get("Content-Length") or 0), host=host)
+
+
+def instrument_async(client):
+    """instrument() for an httpx.AsyncClient. Returns the client."""
+    client.event_hooks["request"].append(_mark_request)
+    client.event_hooks["response"].append(_record_async_response)
+    return client
+
+
+def snapshot():
+    """Plain-dict copy of every series: {"counters": {...}, "histograms": {...}}."""
+    def fmt(key):
+        return ",".join(f"{k}={v}" for k, v in key) or "_"
+
+    with _lock:
+        return {
+            "counters": {
+                name: {fmt(k): v for k, v in series.items()}
+                for name, series in _counters.items()
+            },
+            "histograms": {
+                name: {fmt(k): {"count": s[-2], "sum": round(s[-1], 4)} for k, s in series.items()}
+                for name, series in _histograms.items()
+            },
+        }
+
+
+def diff(before, after):
+    """What changed between two snapshots (e.g. during one pipeline run)."""
+    out = {"counters": {}, "histograms": {}}
+    for name, series in after["counters"].items():
+        prev = before["counters"].get(name, {})
+        changed = {k: v - prev.get(k, 0) for k, v in series.items() if v != prev.get(k, 0)}
+        if changed:
+            out["counters"][name] = changed
+    for name, series in after["histograms"].items():
+        prev = before["histograms"].get(name, {})
+        changed = {}
+        for k, s in series.items():
+            p = prev.get(k, {"count": 0, "sum": 0})
+            if s["count"] != p["count"]:
+                changed[k] = {"count": s["count"] - p["count"], "sum": round(s["sum"] - p["sum"], 4)}
+        if changed:
+            out["histograms"][name] = changed
+    return out
+
+
+def _escape(value):
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _series(name, key, extra=()):
+    pairs = list(key) + list(extra)
+    if not pairs:
+        return name
+    return name + "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+
+def render(gauges=None):
+    """
+    Prometheus text exposition of every series, plus point-in-time `gauges`
+    sampled by the caller: {name: {((label, value), ...): number}}.
+    """
+    lines = []
+    with _lock:
+        for name, series in sorted(_counters.items()):
+            lines.append(f"# TYPE {name} counter")
+            for key, value in sorted(series.items()):
+                lines.append(f"{_series(name, key)} {value}")
+        for name, series in sorted(_histograms.items()):
+            bounds = _buckets[name]
+            lines.append(f"# TYPE {name} histogram")
+            for key, state in sorted(series.items()):
+                for bound, count in zip(bounds, state):
+                    lines.append(f"{_series(name + '_bucket', key, [('le', str(bound))])} {count}")
+                lines.append(f"{_series(name + '_bucket', key, [('le', '+Inf')])} {state[-2]}")
+                lines.append(f"{_series(name + '_count', key)} {state[-2]}")
+                lines.append(f"{_series(name + '_sum', key)} {round(state[-1], 6)}")
+    for name, series in sorted((gauges or {}).items()):
+        lines.append(f"# TYPE {name} gauge")
+        for key, value in series.items():
+            lines.append(f"{_series(name, key)} {value}")
+    return "\n".join(lines) + "\n"
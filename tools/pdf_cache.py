@@ -0,0 +1,291 @@
+"""
+Tool: PDF Blob Cache
+Content-addressed on-disk cache for circular PDFs/ZIPs served by the API proxy.
+Regulatory documents never change once published, so a cached copy is always valid.
+
+Layout under PDF_CACHE_DIR:
+    blobs/ab/cd/<sha256>   file bodies, sharded by content hash
+    index.db               SQLite: pdf_url → sha256, plus per-blob size and last access
+Writes go to a temp file and are os.replace()d into place (atomic). When the total
+exceeds PDF_CACHE_MAX_BYTES, least recently used blobs are evicted. Concurrent
+misses for the same URL share one upstream fetch. Only bodies that start like a PDF
+or ZIP are kept: an HTML challenge or error page served with a 200 is discarded.
+"""
+
+import asyncio
+import hashlib
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import Future
+
+import metrics
+
+if os.getenv("PDF_CACHE_DIR"):
+    CACHE_DIR = os.getenv("PDF_CACHE_DIR")
+elif os.getenv("VERCEL"):
+    # Only /tmp is writable on Vercel
+    CACHE_DIR = os.path.join(tempfile.gettempdir(), "pdf_cache")
+else:
+    CACHE_DIR = os.path.join(os.path.dirname(__file__), '..', '.tmp', 'pdf_cache')
+
+MAX_BYTES = int(os.getenv("PDF_CACHE_MAX_BYTES", str(1024 * 1024 * 1024)))
+CHUNK_SIZE = 64 * 1024
+# Leading bytes of the documents exchanges publish (PDF, and ZIP bundles)
+DOCUMENT_MAGIC = (b"%PDF", b"PK")
+
+CachedBlob = namedtuple("CachedBlob", "path sha256 size content_type")
+
+
+class NotADocument(ValueError):
+    """The upstream body is not a PDF or ZIP (e.g. a bot-challenge page)."""
+
+_local = threading.local()
+_evict_lock = threading.Lock()
+_inflight = {}
+_inflight_lock = threading.Lock()
+_ainflight = {}   # key → asyncio.Task, for aget_or_fetch (one event loop per process)
+
+
+def _conn():
+    conn = getattr(_local, "conn", None)
+    if conn is None:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        conn = sqlite3.connect(os.path.join(CACHE_DIR, "index.db"), timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(
+            "CREATE TABLE IF NOT EXISTS refs ("
+            " key TEXT PRIMARY KEY, sha256 TEXT NOT NULL, content_type TEXT);"
+            "CREATE TABLE IF NOT EXISTS blobs ("
+            " sha256 TEXT PRIMARY KEY, size INTEGER NOT NULL, last_access REAL NOT NULL);"
+            "CREATE INDEX IF NOT EXISTS blobs_last_access_idx ON blobs (last_access);"
+        )
+        conn.commit()
+        _local.conn = conn
+    return conn
+
+
+def blob_path(sha256):
+    return os.path.join(CACHE_DIR, "blobs", sha256[:2], sha256[2:4], sha256)
+
+
+def get(key):
+    """Return the CachedBlob for `key` (e.g. a pdf_url), or None. Marks it recently used."""
+    conn = _conn()
+    row = conn.execute(
+        "SELECT r.sha256, b.size, r.content_type FROM refs r JOIN blobs b USING (sha256)"
+        " WHERE r.key = ?",
+        (key,),
+    ).fetchone()
+    if row is None:
+        return None
+    sha256, size, content_type = row
+    path = blob_path(sha256)
+    if not os.path.exists(path):
+        # Evicted by another process, or removed by hand
+        conn.execute("DELETE FROM refs WHERE key = ?", (key,))
+        conn.commit()
+        return None
+    conn.execute("UPDATE blobs SET last_access = ? WHERE sha256 = ?", (time.time(), sha256))
+    conn.commit()
+    return CachedBlob(path, sha256, size, content_type)
+
+
+def _incoming():
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=CACHE_DIR, prefix=".incoming-")
+    return os.fdopen(fd, "wb"), tmp_path
+
+
+def _discard(tmp_path):
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+
+
+def _check_document(tmp_path, head, content_type):
+    if not head.lstrip().startswith(DOCUMENT_MAGIC):
+        _discard(tmp_path)
+        raise NotADocument(f"Not a PDF/ZIP body ({content_type or 'no content type'}): {head[:16]!r}")
+
+
+def _commit(key, tmp_path, sha256, size, content_type):
+    """Move a fully written temp file into place and index it under `key`."""
+    path = blob_path(sha256)
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        os.replace(tmp_path, path)
+    except BaseException:
+        _discard(tmp_path)
+        raise
+
+    conn = _conn()
+    conn.execute(
+        "INSERT OR REPLACE INTO blobs (sha256, size, last_access) VALUES (?, ?, ?)",
+        (sha256, size, time.time()),
+    )
+    conn.execute(
+        "INSERT OR REPLACE INTO refs (key, sha256, content_type) VALUES (?, ?, ?)",
+        (key, sha256, content_type),
+    )
+    conn.commit()
+    evict(keep=sha256)
+    return CachedBlob(path, sha256, size, content_type)
+
+
+def put(key, chunks, content_type=None):
+    """
+    Stream `chunks` (iterable of bytes) into the cache under `key`. Returns the CachedBlob.
+    Raises NotADocument, caching nothing, if the body is not a PDF or ZIP.
+    """
+    digest = hashlib.sha256()
+    size = 0
+    head = b""
+    f, tmp_path = _incoming()
+    try:
+        with f:
+            for chunk in chunks:
+                if not chunk:
+                    continue
+                if len(head) < 64:
+                    head += chunk[:64]
+                f.write(chunk)
+                digest.update(chunk)
+                size += len(chunk)
+    except BaseException:
+        _discard(tmp_path)
+        raise
+    _check_document(tmp_path, head, content_type)
+    return _commit(key, tmp_path, digest.hexdigest(), size, content_type)
+
+
+async def aput(key, chunks, content_type=None):
+    """put() for an async iterable of bytes. Index and eviction work runs off the event loop."""
+    digest = hashlib.sha256()
+    size = 0
+    head = b""
+    f, tmp_path = await asyncio.to_thread(_incoming)
+    try:
+        with f:
+            async for chunk in chunks:
+                if not chunk:
+                    continue
+                if len(head) < 64:
+                    head += chunk[:64]
+                f.write(chunk)  # 64 KiB into the page cache: cheaper than a thread hop
+                digest.update(chunk)
+                size += len(chunk)
+    except BaseException:
+        _discard(tmp_path)
+        raise
+    _check_document(tmp_path, head, content_type)
+    return await asyncio.to_thread(_commit, key, tmp_path, digest.hexdigest(), size, content_type)
+
+
+def get_or_fetch(key, fetch_fn):
+    """
+    Return the cached blob for `key`, fetching it on a miss.
+    `fetch_fn()` returns (chunks, content_type). Concurrent misses for the same key
+    wait on the first caller's fetch instead of each going upstream.
+    """
+    blob = get(key)
+    metrics.cache_result("pdf_blob", blob is not None)
+    if blob is not None:
+        return blob
+
+    with _inflight_lock:
+        future = _inflight.get(key)
+        leader = future is None
+        if leader:
+            future = Future()
+            _inflight[key] = future
+    if not leader:
+        return future.result()
+
+    try:
+        blob = get(key)
+        if blob is None:
+            chunks, content_type = fetch_fn()
+            blob = put(key, chunks, content_type)
+        future.set_result(blob)
+        return blob
+    except BaseException as e:
+        future.set_exception(e)
+        raise
+    finally:
+        with _inflight_lock:
+            _inflight.pop(key, None)
+
+
+async def aget_or_fetch(key, fetch_fn):
+    """
+    get_or_fetch() for the async API: `fetch_fn()` is a coroutine returning
+    (async chunks, content_type), and waiting callers hold no thread.
+    The download runs as its own task shared by every caller, so a caller that
+    disconnects stops waiting without cancelling it for the others.
+    """
+    blob = await asyncio.to_thread(get, key)
+    metrics.cache_result("pdf_blob", blob is not None)
+    if blob is not None:
+        return blob
+
+    task = _ainflight.get(key)
+    if task is None:
+        task = _ainflight[key] = asyncio.ensure_future(_afetch(key, fetch_fn))
+        task.add_done_callback(lambda t: _afetch_done(key, t))
+    return await asyncio.shield(task)
+
+
+async def _afetch(key, fetch_fn):
+    blob = await asyncio.to_thread(get, key)
+    if blob is None:
+        chunks, content_type = await fetch_fn()
+        blob = await aput(key, chunks, content_type)
+    return blob
+
+
+def _afetch_done(key, task):
+    if _ainflight.get(key) is task:
+        del _ainflight[key]
+    if not task.cancelled():
+        task.exception()  # retrieved: no "never retrieved" warning when every caller left
+
+
+def evict(keep=None):
+    """Delete least recently used blobs until the cache fits in MAX_BYTES."""
+    with _evict_lock:
+        conn = _conn()
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM blobs").fetchone()[0]
+        if total <= MAX_BYTES:
+            return 0
+        evicted = 0
+        for sha256, size in conn.execute(
+            "SELECT sha256, size FROM blobs ORDER BY last_access"
+        ).fetchall():
+            if total <= MAX_BYTES:
+                break
+            if sha256 == keep:
+                continue
+            try:
+                os.remove(blob_path(sha256))
+            except FileNotFoundError:
+                pass
+            conn.execute("DELETE FROM refs WHERE sha256 = ?", (sha256,))
+            conn.execute("DELETE FROM blobs WHERE sha256 = ?", (sha256,))
+            total -= size
+            evicted += 1
+        conn.commit()
+        return evicted
+
+
+def stats():
+    count, total = _conn().execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM blobs").fetchone()
+    return {"blobs": count, "bytes": total, "max_bytes": MAX_BYTES}
+
+
+if __name__ == "__main__":
+    s = stats()
+    print(f"[PDF Cache] {CACHE_DIR}: {s['blobs']} blobs, {s['bytes'] / 1e6:.1f} MB "
+          f"of {s['max_bytes'] / 1e6:.0f} MB")
@@ -0,0 +1,150 @@
+"""
+Tool: PDF Fetcher
+Opens circular documents from the exchange websites, and from the optional
+Supabase Storage bucket (PDF_STORAGE_BUCKET) that the prefetch stage fills.
+Shared by the API proxy and the pipeline's prefetch stage.
+
+The pipeline uses requests (open_pdf/open_stored); the async API proxy uses
+aopen_pdf/aopen_stored over one pooled httpx.AsyncClient, so a slow upstream
+download holds no worker thread.
+"""
+
+import asyncio
+import os
+import threading
+
+import httpx
+import requests
+
+import exchange_sessions
+import metrics
+
+PDF_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+    "Accept": "application/pdf,*/*",
+}
+
+REFERERS = {
+    "NSE": "https://www.nseindia.com/",
+    "BSE": "https://www.bseindia.com/",
+    "SEBI": "https://www.sebi.gov.in/",
+}
+
+CHUNK_SIZE = 64 * 1024
+
+STORAGE_BUCKET = os.getenv("PDF_STORAGE_BUCKET")
+
+_async_http = None
+_async_lock = threading.Lock()
+
+
+def _headers(source):
+    headers = dict(PDF_HEADERS)
+    if source in REFERERS:
+        headers["Referer"] = REFERERS[source]
+    if source == "NSE":
+        headers["Accept-Language"] = "en-US,en;q=0.9"
+    return headers
+
+
+def make_session(source):
+    """Session with the headers (and, for NSE, the warm Akamai cookies) each exchange expects."""
+    session = metrics.instrument(requests.Session())
+    session.headers.update(_headers(source))
+    if source == "NSE":
+        exchange_sessions.get("NSE").apply(session)
+    return session
+
+
+def open_pdf(pdf_url, source, session=None):
+    """Start downloading a document upstream. Returns (chunks, content_type)."""
+    session = session or make_session(source)
+    resp = session.get(pdf_url, timeout=30, stream=True)
+    resp.raise_for_status()
+
+    def chunks():
+        try:
+            yield from resp.iter_content(chunk_size=CHUNK_SIZE)
+        finally:
+            resp.close()
+
+    return chunks(), resp.headers.get("Content-Type", "application/pdf")
+
+
+def storage_path(sha256):
+    return f"{sha256[:2]}/{sha256}"
+
+
+def upload_blob(client, blob):
+    """Copy a pdf_cache.CachedBlob into the storage bucket (no-op if unconfigured)."""
+    if not STORAGE_BUCKET:
+        return False
+    client.storage.from_(STORAGE_BUCKET).upload(
+        storage_path(blob.sha256),
+        blob.path,
+        file_options={"content-type": blob.content_type or "application/pdf", "upsert": "true"},
+    )
+    return True
+
+
+def open_stored(client, sha256, content_type=None):
+    """Download a prefetched document from the storage bucket. Returns (chunks, content_type)."""
+    data = client.storage.from_(STORAGE_BUCKET).download(storage_path(sha256))
+    return [data], content_type or "application/pdf"
+
+
+def get_async_http():
+    """The API's shared httpx.AsyncClient, created on first use."""
+    global _async_http
+    with _async_lock:
+        if _async_http is None:
+            _async_http = metrics.instrument_async(httpx.AsyncClient(
+                timeout=httpx.Timeout(30, connect=10),
+                limits=httpx.Limits(max_connections=200, max_keepalive_connections=50),
+                follow_redirects=True,
+            ))
+        return _async_http
+
+
+async def close_async_http():
+    global _async_http
+    with _async_lock:
+        client, _async_http = _async_http, None
+    if client is not None:
+        await client.aclose()
+
+
+async def aopen_pdf(pdf_url, source):
+    """open_pdf() over the async client. Returns (async chunks, content_type)."""
+    cookies = None
+    if source == "NSE":
+        # Usually the already-warm jar; a due handshake runs off the event loop
+        jar = await asyncio.to_thread(exchange_sessions.get("NSE").cookies)
+        cookies = {c.name: c.value for c in jar}
+    client = get_async_http()
+    request = client.build_request("GET", pdf_url, headers=_headers(source), cookies=cookies)
+    resp = await client.send(request, stream=True)
+    try:
+        resp.raise_for_status()
+    except BaseException:
+        await resp.aclose()
+        raise
+
+    async def chunks():
+        try:
+            async for chunk in resp.aiter_bytes(CHUNK_SIZE):
+                yield chunk
+        finally:
+            await resp.aclose()
+
+    return chunks(), resp.headers.get("Content-Type", "application/pdf")
+
+
+async def aopen_stored(client, sha256, content_type=None):
+    """open_stored() for supabase_client's async client."""
+    data = await client.storage.from_(STORAGE_BUCKET).download(storage_path(sha256))
+
+    async def chunks():
+        yield data
+
+    return chunks(), content_type or "application/pdf"
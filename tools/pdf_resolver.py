@@ -0,0 +1,90 @@
+"""
+Tool: Detail Page PDF Resolver
+Resolves PDF URLs from circular detail pages with bounded concurrency.
+A per-host token bucket paces requests instead of fixed sleeps.
+Results already in the persistent pdf_url_cache skip the fetch entirely.
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+
+import pdf_url_cache
+
+DEFAULT_WORKERS = 6
+
+
+class TokenBucket:
+    """Thread-safe token bucket: `rate` tokens per second, up to `burst` stored."""
+
+    def __init__(self, rate, burst=1):
+        self.rate = float(rate)
+        self.burst = max(1, int(burst))
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Block until a token is available, then consume it."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+_buckets = {}
+_buckets_lock = threading.Lock()
+
+
+def get_bucket(host, rate, burst=1):
+    """Return the shared bucket for `host`, creating it on first use."""
+    with _buckets_lock:
+        bucket = _buckets.get(host)
+        if bucket is None:
+            bucket = TokenBucket(rate, burst)
+            _buckets[host] = bucket
+        return bucket
+
+
+def resolve_pdf_urls(session, circulars, extract_fn, tag, rate=2.0, burst=2,
+                     max_workers=DEFAULT_WORKERS):
+    """
+    Fill `pdf_url` on each circular that has a `detail_url`, in place.
+    `extract_fn(session, detail_url)` does the fetch + parse for one page.
+    Cached results are applied without fetching; fresh results are cached.
+    Output order is the input order; failures are logged per item and leave pdf_url unset.
+    """
+    pending = []
+    for circular in circulars:
+        if not circular.get("detail_url"):
+            continue
+        hit, pdf_url = pdf_url_cache.get(circular["detail_url"])
+        if hit:
+            circular["pdf_url"] = pdf_url
+        else:
+            pending.append(circular)
+    if not pending:
+        return circulars
+
+    def resolve(circular):
+        host = urlparse(circular["detail_url"]).netloc
+        get_bucket(host, rate, burst).acquire()
+        try:
+            pdf_url = extract_fn(session, circular["detail_url"])
+            pdf_url_cache.put(circular["detail_url"], pdf_url)
+            circular["pdf_url"] = pdf_url
+        except Exception as e:
+            print(f"  [{tag}] Failed to get PDF for: {circular['title'][:50]} — {e}")
+
+    workers = max(1, min(max_workers, len(pending)))
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        list(pool.map(resolve, pending))
+
+    return circulars
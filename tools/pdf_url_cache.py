@@ -0,0 +1,78 @@
+"""
+Tool: PDF URL Cache
+Persistent detail_url → pdf_url cache shared across pipeline runs (local SQLite).
+A circular's PDF link never changes once published, so found links never expire.
+"Not found" results expire after NEGATIVE_TTL so they get retried later.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+
+import metrics
+
+CACHE_PATH = os.getenv(
+    "PDF_URL_CACHE_PATH",
+    os.path.join(os.path.dirname(__file__), '..', '.tmp', 'pdf_url_cache.db'),
+)
+
+# Seconds before a "no PDF found" result is retried
+NEGATIVE_TTL = int(os.getenv("PDF_URL_CACHE_NEGATIVE_TTL", str(3 * 24 * 3600)))
+
+_local = threading.local()
+
+
+def _conn():
+    """One connection per thread — the resolver calls in from a thread pool."""
+    conn = getattr(_local, "conn", None)
+    if conn is None:
+        os.makedirs(os.path.dirname(os.path.abspath(CACHE_PATH)), exist_ok=True)
+        conn = sqlite3.connect(CACHE_PATH, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS pdf_urls ("
+            " detail_url TEXT PRIMARY KEY,"
+            " pdf_url TEXT,"
+            " resolved_at REAL NOT NULL)"
+        )
+        conn.commit()
+        _local.conn = conn
+    return conn
+
+
+def get(detail_url):
+    """
+    Look up a detail URL.
+    Returns (hit, pdf_url). Expired negative entries count as a miss.
+    """
+    row = _conn().execute(
+        "SELECT pdf_url, resolved_at FROM pdf_urls WHERE detail_url = ?",
+        (detail_url,),
+    ).fetchone()
+    if row is None:
+        metrics.cache_result("pdf_url", False)
+        return False, None
+    pdf_url, resolved_at = row
+    if pdf_url is None and time.time() - resolved_at > NEGATIVE_TTL:
+        metrics.cache_result("pdf_url", False)
+        return False, None
+    metrics.cache_result("pdf_url", True)
+    return True, pdf_url
+
+
+def put(detail_url, pdf_url):
+    """Record the resolution result (pdf_url may be None for "not found")."""
+    conn = _conn()
+    conn.execute(
+        "INSERT OR REPLACE INTO pdf_urls (detail_url, pdf_url, resolved_at) VALUES (?, ?, ?)",
+        (detail_url, pdf_url, time.time()),
+    )
+    conn.commit()
+
+
+if __name__ == "__main__":
+    conn = _conn()
+    total = conn.execute("SELECT COUNT(*) FROM pdf_urls").fetchone()[0]
+    negative = conn.execute("SELECT COUNT(*) FROM pdf_urls WHERE pdf_url IS NULL").fetchone()[0]
+    print(f"[PDF Cache] {CACHE_PATH}: {total} entries ({negative} not-found)")
@@ -0,0 +1,340 @@
+"""
+Tool: Pipeline Engine
+Single scrape → resolve PDFs → store engine used by both the CLI (run_pipeline.py)
+and the Modal cron (modal_scheduler.py). Sources are pluggable via register_source().
+
+Runs are incremental: each source resumes from its high-water mark (newest
+published_date stored) minus OVERLAP_DAYS. full=True ignores the marks.
+Each run writes a JSON report (results plus the metrics it moved) to the state dir.
+"""
+
+import math
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Optional
+
+import requests
+
+import metrics
+import pipeline_state
+import response_cache
+from store_circulars import store_circulars
+
+DEFAULT_DAYS = 14
+
+# Days re-scraped before a source's high-water mark (late uploads, back-dated circulars)
+OVERLAP_DAYS = 2
+
+
+@dataclass
+class Source:
+    name: str
+    scrape: Callable                 # scrape(days=..., since=..., [until=...], [resolve_pdfs=False]) → circular dicts
+    resolve_pdfs: Optional[Callable] = None  # resolve_pdfs(circulars) fills pdf_url in place
+
+
+@dataclass
+class SourceResult:
+    scraped: int = 0
+    inserted: int = 0
+    updated: int = 0
+    unchanged: int = 0
+    failed: int = 0
+    days: int = 0
+    since: Optional[str] = None
+    prefetched: int = 0
+    timings: dict = field(default_factory=lambda: {
+        "scrape": 0.0, "pdf_resolution": 0.0, "store": 0.0, "prefetch": 0.0,
+    })
+    error: Optional[str] = None
+    prefetch_error: Optional[str] = None   # prefetch is best effort: not a source failure
+
+    @property
+    def stored(self):
+        return self.inserted + self.updated
+
+    @property
+    def skipped(self):
+        return self.unchanged + self.failed
+
+    def to_dict(self):
+        d = {
+            "scraped": self.scraped,
+            "stored": self.stored,
+            "skipped": self.skipped,
+            "inserted": self.inserted,
+            "updated": self.updated,
+            "unchanged": self.unchanged,
+            "failed": self.failed,
+            "days": self.days,
+            "since": self.since,
+            "prefetched": self.prefetched,
+            "timings": dict(self.timings),
+        }
+        if self.error:
+            d["error"] = self.error
+        if self.prefetch_error:
+            d["prefetch_error"] = self.prefetch_error
+        return d
+
+
+@dataclass
+class PipelineResult:
+    sources: dict = field(default_factory=dict)   # name → SourceResult
+    started_at: Optional[str] = None
+    elapsed: float = 0.0
+    extracted: int = 0
+    extract_time: float = 0.0
+    report_path: Optional[str] = None
+
+    @property
+    def ok(self):
+        return all(r.error is None for r in self.sources.values())
+
+    def to_dict(self):
+        """Per-source dicts, same shape the pipeline has always returned."""
+        return {name: r.to_dict() for name, r in self.sources.items()}
+
+
+_registry = {}
+_builtins_loaded = False
+
+
+def register_source(name, scrape, resolve_pdfs=None):
+    """Add (or replace) a source. Registration order is run/report order."""
+    _registry[name] = Source(name, scrape, resolve_pdfs)
+
+
+def available_sources():
+    _register_builtin_sources()
+    return list(_registry)
+
+
+def _register_builtin_sources():
+    global _builtins_loaded
+    if _builtins_loaded:
+        return
+    _builtins_loaded = True
+    from scrape_sebi import scrape_sebi, resolve_pdf_links as resolve_sebi_pdfs
+    from scrape_bse import scrape_bse, resolve_pdf_links as resolve_bse_pdfs
+    from scrape_nse import scrape_nse
+
+    custom = dict(_registry)
+    _registry.clear()
+    register_source("SEBI", scrape_sebi, resolve_sebi_pdfs)
+    register_source("BSE", scrape_bse, resolve_bse_pdfs)
+    register_source("NSE", scrape_nse)
+    _registry.update(custom)
+
+
+def resolve_sources(sources=None):
+    """Source objects for `sources` (names; default: all registered). Raises ValueError on unknown names."""
+    _register_builtin_sources()
+    names = [s.upper() for s in sources] if sources else list(_registry)
+    unknown = [n for n in names if n not in _registry]
+    if unknown:
+        raise ValueError(f"Unknown source(s): {', '.join(unknown)}. "
+                         f"Available: {', '.join(_registry)}")
+    return [_registry[n] for n in names]
+
+
+def days_since_last_run(name, default=DEFAULT_DAYS):
+    """Whole days back to the source's last successful run (+1 day overlap)."""
+    last = pipeline_state.last_run(name)
+    if last is None:
+        return default
+    elapsed = (datetime.now(timezone.utc) - last).total_seconds() / 86400
+    return max(1, math.ceil(elapsed) + 1)
+
+
+def incremental_since(name, overlap_days=OVERLAP_DAYS):
+    """Start date (YYYY-MM-DD) for an incremental run, or None if the source has no mark yet."""
+    mark = pipeline_state.high_water(name)
+    if not mark:
+        return None
+    start = datetime.strptime(mark["published_date"], "%Y-%m-%d") - timedelta(days=overlap_days)
+    return start.strftime("%Y-%m-%d")
+
+
+def run_source(source, days, since=None, tag="Pipeline", prefetch=False):
+    """Scrape → resolve PDFs → store (→ prefetch PDFs) for one source, timing each phase."""
+    result = SourceResult(days=days, since=since)
+    name = source.name
+
+    try:
+        start = time.perf_counter()
+        if source.resolve_pdfs:
+            circulars = source.scrape(days=days, since=since, resolve_pdfs=False)
+        else:
+            circulars = source.scrape(days=days, since=since)
+        result.scraped = len(circulars)
+        result.timings["scrape"] = round(time.perf_counter() - start, 2)
+        print(f"[{tag}] {name}: scraped {len(circulars)} circulars ({result.timings['scrape']}s)")
+
+        if source.resolve_pdfs:
+            start = time.perf_counter()
+            source.resolve_pdfs(circulars)
+            result.timings["pdf_resolution"] = round(time.perf_counter() - start, 2)
+            found = sum(1 for c in circulars if c.get("pdf_url"))
+            print(f"[{tag}] {name}: resolved {found}/{len(circulars)} PDFs "
+                  f"({result.timings['pdf_resolution']}s)")
+
+        start = time.perf_counter()
+        counts = store_circulars(circulars)
+        result.timings["store"] = round(time.perf_counter() - start, 2)
+        result.inserted = counts["inserted"]
+        result.updated = counts["updated"]
+        result.unchanged = counts["unchanged"]
+        result.failed = counts["failed"]
+        print(f"[{tag}] {name}: {result.inserted} new, {result.updated} updated, "
+              f"{result.unchanged} unchanged, {result.failed} failed ({result.timings['store']}s)")
+
+        # Only advance past rows that were actually stored
+        if not result.failed:
+            pipeline_state.advance_high_water(name, circulars)
+
+    except Exception as e:
+        print(f"[{tag}] {name} failed: {e}")
+        result.error = str(e)
+
+    # After the store succeeded, so a prefetch failure never keeps the run from being marked
+    if prefetch and result.error is None:
+        from prefetch_pdfs import prefetch_pdfs
+
+        start = time.perf_counter()
+        try:
+            fetched = prefetch_pdfs(source=name, tag=tag)
+            result.prefetched = fetched["fetched"]
+            print(f"[{tag}] {name}: prefetched {fetched['fetched']} PDFs, "
+                  f"{fetched['failed']} failed ({time.perf_counter() - start:.2f}s)")
+        except Exception as e:
+            print(f"[{tag}] {name} prefetch failed (will retry next run): {e}")
+            result.prefetch_error = str(e)
+        result.timings["prefetch"] = round(time.perf_counter() - start, 2)
+
+    for stage, seconds in result.timings.items():
+        if seconds:
+            metrics.observe("circulars_stage_seconds", seconds, source=name, stage=stage)
+    return result
+
+
+def run(sources=None, days=DEFAULT_DAYS, since_last_run=False, full=False,
+        max_workers=None, prefetch=False, extract_text=False, tag="Pipeline"):
+    """
+    Run the pipeline for `sources` (default: all registered) concurrently.
+    Each source starts from its high-water mark minus OVERLAP_DAYS. Sources without
+    a mark use `days` — or, with since_last_run, the time since their last successful run.
+    full=True ignores the marks and scrapes the whole `days` window.
+    prefetch=True downloads newly stored PDFs into the cache after each source's store.
+    extract_text=True then extracts text from prefetched PDFs (one process pool, all sources).
+    Returns a PipelineResult.
+    """
+    names = [source.name for source in resolve_sources(sources)]
+
+    plan = {}
+    for name in names:
+        since = None if full else incremental_since(name)
+        window = days_since_last_run(name, days) if since_last_run and not full else days
+        plan[name] = (window, since)
+    summary = ", ".join(
+        f"{n} since {since}" if since else f"{n} {window}d"
+        for n, (window, since) in plan.items()
+    )
+    print(f"[{tag}] Scraping circulars{' (full)' if full else ''} — {summary}\n")
+
+    started = datetime.now(timezone.utc)
+    result = PipelineResult(started_at=started.isoformat())
+    metrics_before = metrics.snapshot()
+    start = time.perf_counter()
+    workers = max_workers or len(names)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {
+            pool.submit(run_source, _registry[name], *plan[name], tag, prefetch): name
+            for name in names
+        }
+        for future in as_completed(futures):
+            name = futures[future]
+            result.sources[name] = future.result()
+            if result.sources[name].error is None:
+                pipeline_state.mark_run(name, started)
+    result.sources = {name: result.sources[name] for name in names}
+
+    if extract_text:
+        from extract_text import extract_texts
+
+        stage_start = time.perf_counter()
+        try:
+            counts = extract_texts(tag=tag)
+            result.extracted = counts["extracted"]
+            print(f"[{tag}] Text: {counts['extracted']} extracted, {counts['failed']} failed")
+        except Exception as e:
+            print(f"[{tag}] Text extraction failed: {e}")
+        result.extract_time = round(time.perf_counter() - stage_start, 2)
+        metrics.observe("circulars_stage_seconds", result.extract_time, source="ALL", stage="extract_text")
+
+    result.elapsed = round(time.perf_counter() - start, 2)
+
+    if any(r.stored for r in result.sources.values()):
+        invalidate_api_cache(tag)
+
+    _print_summary(result, tag)
+    _save_report(result, started, metrics_before, tag)
+    return result
+
+
+def _save_report(result, started, metrics_before, tag):
+    report = {
+        "started_at": result.started_at,
+        "elapsed": result.elapsed,
+        "sources": result.to_dict(),
+        "extracted": result.extracted,
+        "extract_time": result.extract_time,
+        "metrics": metrics.diff(metrics_before, metrics.snapshot()),
+    }
+    try:
+        result.report_path = pipeline_state.save_report(report, started)
+        print(f"[{tag}] Run report: {result.report_path}")
+    except OSError as e:
+        print(f"[{tag}] Could not write run report: {e}")
+
+
+def invalidate_api_cache(tag="Pipeline"):
+    """Drop cached API responses — in this process, and on the API server if configured."""
+    response_cache.invalidate()
+
+    base_url = os.getenv("API_BASE_URL")
+    token = os.getenv("CACHE_INVALIDATE_TOKEN")
+    if not base_url or not token:
+        return
+    try:
+        resp = requests.post(
+            base_url.rstrip("/") + "/api/cache/invalidate",
+            headers={"X-Cache-Token": token},
+            timeout=10,
+        )
+        resp.raise_for_status()
+        print(f"[{tag}] API cache invalidated")
+    except Exception as e:
+        print(f"[{tag}] API cache invalidation failed: {e}")
+
+
+def _print_summary(result, tag):
+    total_scraped = sum(r.scraped for r in result.sources.values())
+    total_stored = sum(r.stored for r in result.sources.values())
+    print(f"\n[{tag}] === DONE in {result.elapsed}s ===")
+    print(f"[{tag}] Total: {total_scraped} scraped, {total_stored} stored")
+    for name, r in result.sources.items():
+        t = r.timings
+        status = (f"{r.scraped} scraped, {r.stored} stored, {r.skipped} skipped "
+                  f"[scrape {t['scrape']}s, pdf {t['pdf_resolution']}s, store {t['store']}s, "
+                  f"prefetch {t['prefetch']}s]")
+        if r.error:
+            status += f" (ERROR: {r.error[:50]})"
+        elif r.prefetch_error:
+            status += f" (prefetch error: {r.prefetch_error[:50]})"
+        print(f"  {name}: {status}")
+    if result.extract_time:
+        print(f"  Text: {result.extracted} extracted [{result.extract_time}s]")
@@ -0,0 +1,121 @@
+"""
+Tool: Pipeline State
+Small JSON file recording per-source pipeline progress between runs:
+last successful run time and the high-water mark (latest published_date + ID seen).
+Backfill checkpoints (date-range chunks already stored, per source) live in the
+same file. Per-run JSON reports (timings, counters) are kept next to it under runs/.
+Lives in PIPELINE_STATE_DIR (default .tmp/); Modal mounts a Volume there.
+"""
+
+import json
+import os
+import threading
+from datetime import datetime, timezone
+
+STATE_DIR = os.getenv(
+    "PIPELINE_STATE_DIR",
+    os.path.join(os.path.dirname(__file__), '..', '.tmp'),
+)
+STATE_PATH = os.path.join(STATE_DIR, "pipeline_state.json")
+REPORTS_DIR = os.path.join(STATE_DIR, "runs")
+
+_lock = threading.Lock()
+
+
+def load():
+    """Return the whole state dict ({"sources": {name: {...}}, "backfill": {name: {...}}})."""
+    try:
+        with open(STATE_PATH) as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {"sources": {}}
+
+
+def get_source(name):
+    return load().get("sources", {}).get(name, {})
+
+
+def _write(state):
+    os.makedirs(STATE_DIR, exist_ok=True)
+    tmp_path = STATE_PATH + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(state, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, STATE_PATH)
+
+
+def update_source(name, **fields):
+    """Merge `fields` into a source's record and write the file atomically."""
+    with _lock:
+        state = load()
+        state.setdefault("sources", {}).setdefault(name, {}).update(fields)
+        _write(state)
+
+
+def last_run(name):
+    """UTC datetime of the source's last successful run, or None."""
+    value = get_source(name).get("last_run")
+    return datetime.fromisoformat(value) if value else None
+
+
+def mark_run(name, when=None):
+    when = when or datetime.now(timezone.utc)
+    update_source(name, last_run=when.isoformat())
+
+
+def high_water(name):
+    """{"published_date": "YYYY-MM-DD", "id": ...} of the newest circular stored, or None."""
+    return get_source(name).get("high_water")
+
+
+def advance_high_water(name, circulars):
+    """Move the source's mark to the newest circular in `circulars`; never moves backwards."""
+    dated = [c for c in circulars if c.get("published_date")]
+    if not dated:
+        return high_water(name)
+    newest = max(dated, key=lambda c: (c["published_date"], str(c.get("circular_number") or "")))
+    mark = {"published_date": newest["published_date"], "id": newest.get("circular_number")}
+
+    # Compare and write under one lock: backfill workers advance marks concurrently
+    with _lock:
+        state = load()
+        record = state.setdefault("sources", {}).setdefault(name, {})
+        current = record.get("high_water")
+        if current and current["published_date"] >= mark["published_date"]:
+            return current
+        record["high_water"] = mark
+        _write(state)
+    return mark
+
+
+def backfill_done(name):
+    """{"<from>..<to>": counts} of the source's backfill chunks already stored."""
+    return load().get("backfill", {}).get(name, {}).get("chunks", {})
+
+
+def mark_backfill_chunk(name, chunk, counts):
+    """Checkpoint one stored chunk ((from, to) dates) so a resumed backfill skips it."""
+    with _lock:
+        state = load()
+        record = state.setdefault("backfill", {}).setdefault(name, {})
+        record.setdefault("chunks", {})[f"{chunk[0]}..{chunk[1]}"] = counts
+        record["updated_at"] = datetime.now(timezone.utc).isoformat()
+        _write(state)
+
+
+def reset_backfill(name):
+    """Forget a source's backfill checkpoints (the next backfill starts over)."""
+    with _lock:
+        state = load()
+        if state.get("backfill", {}).pop(name, None) is not None:
+            _write(state)
+
+
+def save_report(report, started_at):
+    """Write one run's report to runs/<UTC start time>.json. Returns the path."""
+    os.makedirs(REPORTS_DIR, exist_ok=True)
+    path = os.path.join(REPORTS_DIR, started_at.strftime("%Y%m%dT%H%M%SZ") + ".json")
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(report, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, path)
+    return path
@@ -0,0 +1,94 @@
+"""
+Tool: PDF Prefetch
+Optional pipeline stage run after store_circulars: downloads every circular whose
+PDF has not been fetched yet, in parallel with a per-host concurrency limit.
+Each document goes into the local pdf_cache (and the PDF_STORAGE_BUCKET, if set),
+and its size, content type and SHA-256 are recorded on the circular row, so the
+API can serve the first view immediately with a real Content-Length.
+"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+
+import pdf_cache
+import pdf_fetcher
+from supabase_client import get_client
+
+MAX_WORKERS = 8
+PER_HOST_LIMIT = 2
+BATCH_LIMIT = 500
+
+
+def pending_circulars(client, source=None, limit=BATCH_LIMIT):
+    """Circulars with a pdf_url that have not been prefetched yet."""
+    query = (
+        client.table("circulars")
+        .select("id, source, pdf_url")
+        .not_.is_("pdf_url", "null")
+        .is_("pdf_sha256", "null")
+        .order("published_date", desc=True)
+        .limit(limit)
+    )
+    if source:
+        query = query.eq("source", source)
+    return query.execute().data
+
+
+def prefetch_pdfs(source=None, max_workers=MAX_WORKERS, per_host=PER_HOST_LIMIT, tag="Prefetch"):
+    """
+    Download and record every pending PDF (optionally for one source).
+    Returns counts: {fetched, failed}.
+    """
+    client = get_client()
+    rows = pending_circulars(client, source)
+    counts = {"fetched": 0, "failed": 0}
+    if not rows:
+        return counts
+
+    host_limits = {}
+    sessions = {}
+    lock = threading.Lock()
+
+    def host_limit(host):
+        with lock:
+            if host not in host_limits:
+                host_limits[host] = threading.BoundedSemaphore(per_host)
+            return host_limits[host]
+
+    def session_for(src):
+        # One session per exchange: the NSE cookie handshake happens once, not per file
+        with lock:
+            if src not in sessions:
+                sessions[src] = pdf_fetcher.make_session(src)
+            return sessions[src]
+
+    def fetch(row):
+        pdf_url = row["pdf_url"]
+        try:
+            with host_limit(urlparse(pdf_url).netloc):
+                blob = pdf_cache.get_or_fetch(
+                    pdf_url,
+                    lambda: pdf_fetcher.open_pdf(pdf_url, row["source"], session_for(row["source"])),
+                )
+            pdf_fetcher.upload_blob(client, blob)
+            client.table("circulars").update({
+                "pdf_sha256": blob.sha256,
+                "pdf_size": blob.size,
+                "pdf_content_type": blob.content_type,
+            }).eq("id", row["id"]).execute()
+            return True
+        except Exception as e:
+            print(f"  [{tag}] Failed: {pdf_url} — {e}")
+            return False
+
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(rows)))) as pool:
+        for ok in pool.map(fetch, rows):
+            counts["fetched" if ok else "failed"] += 1
+
+    return counts
+
+
+if __name__ == "__main__":
+    result = prefetch_pdfs()
+    print(f"[Prefetch] {result['fetched']} fetched, {result['failed']} failed")
@@ -0,0 +1,121 @@
+"""
+Tool: Response Cache
+In-process TTL + LRU cache for read-only API responses.
+Data only changes when the pipeline writes or a bookmark changes, so entries live
+for RESPONSE_CACHE_TTL seconds unless explicitly invalidated first.
+"""
+
+import functools
+import inspect
+import os
+import threading
+import time
+from collections import OrderedDict
+
+DEFAULT_TTL = float(os.getenv("RESPONSE_CACHE_TTL", "300"))
+MAX_ENTRIES = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "256"))
+
+_MISS = object()
+
+
+class TTLCache:
+    """Thread-safe, size-bounded LRU whose entries also expire after `ttl` seconds."""
+
+    def __init__(self, maxsize=MAX_ENTRIES, ttl=DEFAULT_TTL):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()   # key → (expires_at, value)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self._data[key]
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key, value, ttl=None):
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def invalidate(self, namespace=None):
+        """Drop every entry, or only those of one namespace. Returns entries dropped."""
+        with self._lock:
+            if namespace is None:
+                dropped = len(self._data)
+                self._data.clear()
+                return dropped
+            keys = [k for k in self._data if k[0] == namespace]
+            for k in keys:
+                del self._data[k]
+            return len(keys)
+
+    def stats(self):
+        with self._lock:
+            return {"entries": len(self._data), "max_entries": self.maxsize,
+                    "hits": self.hits, "misses": self.misses}
+
+
+cache = TTLCache()
+
+
+def make_key(namespace, params, normalize=None):
+    """Key from query params: None dropped, strings stripped, order-independent."""
+    normalize = normalize or {}
+    items = []
+    for name, value in params.items():
+        if value is None:
+            continue
+        if isinstance(value, str):
+            value = value.strip()
+            if not value:
+                continue
+        if name in normalize:
+            value = normalize[name](value)
+        items.append((name, value))
+    return (namespace, tuple(sorted(items)))
+
+
+def cached(namespace, ttl=None, normalize=None):
+    """
+    Cache a keyword-argument endpoint's return value in `cache`.
+    `normalize` maps param name → function applied before keying (e.g. str.upper).
+    Works on both def and async def endpoints.
+    """
+    def decorator(fn):
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(**params):
+                key = make_key(namespace, params, normalize)
+                value = cache.get(key, _MISS)
+                if value is _MISS:
+                    value = await fn(**params)
+                    cache.set(key, value, ttl)
+                return value
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(**params):
+            key = make_key(namespace, params, normalize)
+            value = cache.get(key, _MISS)
+            if value is _MISS:
+                value = fn(**params)
+                cache.set(key, value, ttl)
+            return value
+        return wrapper
+    return decorator
+
+
+def invalidate(namespace=None):
+    return cache.invalidate(namespace)
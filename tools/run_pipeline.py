@@ -1,85 +1,87 @@
 """
-Tool: Pipeline Orchestrator
-Scrapes circulars from SEBI, BSE, and NSE, then stores in Supabase.
+Tool: Pipeline CLI
+Scrapes circulars from SEBI, BSE, and NSE concurrently, then stores in Supabase.
+Thin command-line wrapper around pipeline_engine. Runs are incremental: a source
+with a high-water mark is scraped from that mark minus OVERLAP_DAYS (2), whatever
+--days says. --days only sets the window for --full runs and for sources with no
+mark yet (a first run); --since-last-run only changes the latter.
+
+Usage:
+    python tools/run_pipeline.py                          # all sources, new circulars only
+    python tools/run_pipeline.py --sources NSE,BSE        # only NSE and BSE, new circulars only
+    python tools/run_pipeline.py --full --sources NSE,BSE --days 3   # re-scrape the last 3 days
+    python tools/run_pipeline.py --full --days 30         # ignore marks, rebuild 30 days
+    python tools/run_pipeline.py --since-last-run         # unmarked sources: since last run
+    python tools/run_pipeline.py --prefetch-pdfs          # also download new PDFs
+    python tools/run_pipeline.py --prefetch-pdfs --extract-text
 """
 
+import argparse
 import sys
 import os
-import time
 
 sys.path.insert(0, os.path.dirname(__file__))
 
-from scrape_sebi import scrape_sebi
-from scrape_bse import scrape_bse
-from scrape_nse import scrape_nse
-from store_circulars import store_circulars
+import pipeline_engine
 
 
-def run(days=14):
-    """Run the full scrape → store pipeline for all 3 sources."""
-    print(f"[Pipeline] Scraping circulars from last {days} days...\n")
+def run(days=pipeline_engine.DEFAULT_DAYS, sources=None, since_last_run=False, full=False,
+        max_workers=None, prefetch=False, extract_text=False):
+    """Run the pipeline and return per-source result dicts."""
+    result = pipeline_engine.run(
+        sources=sources,
+        days=days,
+        since_last_run=since_last_run,
+        full=full,
+        max_workers=max_workers,
+        prefetch=prefetch,
+        extract_text=extract_text,
+    )
+    return result.to_dict()
 
-    results = {}
 
-    # SEBI
-    print("[Pipeline] === SEBI ===")
-    try:
-        sebi = scrape_sebi(days=days)
-        print(f"[Pipeline] SEBI: scraped {len(sebi)} circulars")
-        ins, skip = store_circulars(sebi)
-        results["SEBI"] = {"scraped": len(sebi), "stored": ins, "skipped": skip}
-        print(f"[Pipeline] SEBI: {ins} stored, {skip} skipped")
-    except Exception as e:
-        print(f"[Pipeline] SEBI failed: {e}")
-        results["SEBI"] = {"scraped": 0, "stored": 0, "skipped": 0, "error": str(e)}
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Scrape and store SEBI/BSE/NSE circulars.")
+    parser.add_argument("legacy_days", nargs="?", type=int, help=argparse.SUPPRESS)
+    parser.add_argument("--sources", default=None,
+                        help="Comma-separated sources to run (default: all), e.g. SEBI,NSE")
+    parser.add_argument("--days", type=int, default=None,
+                        help=f"Look-back window in days for --full runs and for sources with no "
+                             f"high-water mark yet; ignored for marked sources "
+                             f"(default: {pipeline_engine.DEFAULT_DAYS})")
+    parser.add_argument("--since-last-run", action="store_true",
+                        help="Sources with no high-water mark look back to their last successful run "
+                             "instead of --days (marked sources always resume from their mark)")
+    parser.add_argument("--full", action="store_true",
+                        help="Ignore high-water marks and scrape the whole --days window")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Max sources processed concurrently (default: one per source)")
+    parser.add_argument("--prefetch-pdfs", action="store_true",
+                        help="After storing, download new PDFs into the cache / storage bucket")
+    parser.add_argument("--extract-text", action="store_true",
+                        help="Extract searchable text from prefetched PDFs")
+    args = parser.parse_args(argv)
 
-    time.sleep(2)
+    days = args.days or args.legacy_days or pipeline_engine.DEFAULT_DAYS
+    if (args.days or args.legacy_days) and not args.full:
+        print(f"[Pipeline] Note: the {days}-day window only applies to sources without a "
+              f"high-water mark; add --full to re-scrape it for every source")
+    sources = [s.strip() for s in args.sources.split(",") if s.strip()] if args.sources else None
 
-    # BSE
-    print("\n[Pipeline] === BSE ===")
     try:
-        bse = scrape_bse(days=days)
-        print(f"[Pipeline] BSE: scraped {len(bse)} circulars")
-        ins, skip = store_circulars(bse)
-        results["BSE"] = {"scraped": len(bse), "stored": ins, "skipped": skip}
-        print(f"[Pipeline] BSE: {ins} stored, {skip} skipped")
-    except Exception as e:
-        print(f"[Pipeline] BSE failed: {e}")
-        results["BSE"] = {"scraped": 0, "stored": 0, "skipped": 0, "error": str(e)}
-
-    time.sleep(2)
-
-    # NSE
-    print("\n[Pipeline] === NSE ===")
-    try:
-        nse = scrape_nse(days=days)
-        print(f"[Pipeline] NSE: scraped {len(nse)} circulars")
-        ins, skip = store_circulars(nse)
-        results["NSE"] = {"scraped": len(nse), "stored": ins, "skipped": skip}
-        print(f"[Pipeline] NSE: {ins} stored, {skip} skipped")
-    except Exception as e:
-        print(f"[Pipeline] NSE failed: {e}")
-        results["NSE"] = {"scraped": 0, "stored": 0, "skipped": 0, "error": str(e)}
-
-    # Summary
-    total_scraped = sum(r["scraped"] for r in results.values())
-    total_stored = sum(r["stored"] for r in results.values())
-    print(f"\n[Pipeline] === DONE ===")
-    print(f"[Pipeline] Total: {total_scraped} scraped, {total_stored} stored")
-    for source, r in results.items():
-        status = f"{r['scraped']} scraped, {r['stored']} stored"
-        if "error" in r:
-            status += f" (ERROR: {r['error'][:50]})"
-        print(f"  {source}: {status}")
-
-    return results
+        result = pipeline_engine.run(
+            sources=sources,
+            days=days,
+            since_last_run=args.since_last_run,
+            full=args.full,
+            max_workers=args.workers,
+            prefetch=args.prefetch_pdfs,
+            extract_text=args.extract_text,
+        )
+    except ValueError as e:
+        parser.error(str(e))
+    return 0 if result.ok else 1
 
 
 if __name__ == "__main__":
-    days = 14
-    if len(sys.argv) > 1:
-        try:
-            days = int(sys.argv[1])
-        except ValueError:
-            pass
-    run(days=days)
+    sys.exit(main())
@@ -4,15 +4,22 @@ Fetches circulars from BSE India via their JSON API and ASP.NET detail pages.
 """
 
 import re
-import time
 import requests
 from datetime import datetime, timedelta
 from bs4 import BeautifulSoup
 
+import exchange_sessions
+import metrics
+from pdf_resolver import resolve_pdf_urls
+
 API_URL = "https://api.bseindia.com/BseIndiaAPI/api/GetDataCirToListComp/w"
 DETAIL_BASE = "https://www.bseindia.com/markets/MarketInfo/DispNewNoticesCirculars.aspx?page="
 BSE_BASE = "https://www.bseindia.com"
 
+# Detail page fetch rate (requests/second) and burst, per host
+DETAIL_RATE = 4.0
+DETAIL_BURST = 4
+
 HEADERS = {
     "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
     "Accept": "application/json, text/plain, */*",
@@ -21,30 +28,30 @@ HEADERS = {
 }
 
 
-def scrape_bse(days=7):
+def scrape_bse(days=7, resolve_pdfs=True, since=None, until=None):
     """
-    Scrape BSE circulars from the last `days` days.
+    Scrape BSE circulars from the last `days` days, or from `since` (YYYY-MM-DD) if given,
+    up to `until` (YYYY-MM-DD, default today).
     Uses BSE JSON API for listing, then scrapes detail pages for PDF links.
+    The JSON API takes no dates (it lists recent circulars), so the window is a filter.
+    With resolve_pdfs=False, pdf_url is left None for resolve_pdf_links() to fill later.
+    Raises RuntimeError if both the API and the ASP.NET fallback fail.
     """
-    session = requests.Session()
+    session = metrics.instrument(requests.Session())
     session.headers.update(HEADERS)
 
-    # Step 1: Visit BSE main page for cookies
+    # Step 1: BSE main page cookies (shared jar — visited once per cookie lifetime)
     try:
-        session.get(BSE_BASE + "/", timeout=10, headers={
-            "User-Agent": HEADERS["User-Agent"],
-            "Accept": "text/html",
-        })
+        exchange_sessions.get("BSE").apply(session)
     except Exception:
         pass
 
-    time.sleep(0.5)
-
     # Step 2: Call JSON API
     try:
         resp = session.get(API_URL, timeout=15)
         if resp.status_code == 301:
             # Redirect — try with explicit headers
+            metrics.inc("circulars_http_retries_total", source="BSE", reason="301")
             resp = session.get(API_URL, timeout=15, headers={
                 "Referer": "https://www.bseindia.com/corporates/CirularToListedComp.html",
                 "Origin": "https://www.bseindia.com",
@@ -55,16 +62,17 @@ def scrape_bse(days=7):
     except Exception as e:
         print(f"[BSE] API request failed: {e}")
         print("[BSE] Falling back to ASP.NET scraping...")
-        return _scrape_bse_aspnet(session, days)
+        return _scrape_bse_aspnet(session, days, since, until)
 
     # Step 3: Parse JSON response
     # API returns {"Table": [...]} where each item has mr_heading, mr_date, articleid
     items = data.get("Table", []) if isinstance(data, dict) else data
     if not isinstance(items, list):
         print(f"[BSE] Unexpected response format: {type(data)}")
-        return _scrape_bse_aspnet(session, days)
+        return _scrape_bse_aspnet(session, days, since, until)
 
-    cutoff = datetime.now() - timedelta(days=days)
+    end = datetime.strptime(until, "%Y-%m-%d") if until else datetime.now()
+    cutoff = datetime.strptime(since, "%Y-%m-%d") if since else end - timedelta(days=days)
     circulars = []
 
     for item in items:
@@ -77,7 +85,7 @@ def scrape_bse(days=7):
         # Filter by date
         try:
             pub_dt = datetime.strptime(published_date, "%Y-%m-%d")
-            if pub_dt < cutoff:
+            if pub_dt < cutoff or (until and pub_dt > end):
                 continue
         except ValueError:
             pass
@@ -95,26 +103,30 @@ def scrape_bse(days=7):
             "department": "BSE",
         })
 
-    # Step 4: Extract PDF URLs from detail pages (limit to avoid rate limiting)
-    for circular in circulars:
-        if circular["detail_url"]:
-            try:
-                pdf_url = _extract_pdf_url(session, circular["detail_url"])
-                circular["pdf_url"] = pdf_url
-                time.sleep(0.3)
-            except Exception as e:
-                print(f"  [BSE] Failed PDF for: {circular['title'][:50]} — {e}")
+    # Step 4: Extract PDF URLs from detail pages
+    if resolve_pdfs:
+        resolve_pdf_links(circulars, session)
 
     return circulars
 
 
-def _scrape_bse_aspnet(session, days):
+def resolve_pdf_links(circulars, session=None):
+    """Fill pdf_url from detail pages (parallel, rate limited per host). Mutates in place."""
+    if session is None:
+        session = metrics.instrument(requests.Session())
+        session.headers.update(HEADERS)
+    return resolve_pdf_urls(session, circulars, _fetch_pdf_url, "BSE",
+                            rate=DETAIL_RATE, burst=DETAIL_BURST)
+
+
+def _scrape_bse_aspnet(session, days, since=None, until=None):
     """Fallback: scrape BSE via ASP.NET NoticesCirculars page."""
     listing_url = "https://www.bseindia.com/markets/MarketInfo/NoticesCirculars.aspx"
 
     resp = session.get(listing_url, timeout=15, headers={
         "Accept": "text/html,application/xhtml+xml",
     })
+    resp.raise_for_status()
     soup = BeautifulSoup(resp.text, "lxml")
 
     viewstate = _get_field(soup, "__VIEWSTATE")
@@ -122,11 +134,10 @@ def _scrape_bse_aspnet(session, days):
     event_validation = _get_field(soup, "__EVENTVALIDATION")
 
     if not viewstate:
-        print("[BSE] Failed to extract ViewState tokens")
-        return []
+        raise RuntimeError("BSE fallback failed: no ViewState tokens on the listing page")
 
-    today = datetime.now()
-    from_date = today - timedelta(days=days)
+    to_date = datetime.strptime(until, "%Y-%m-%d") if until else datetime.now()
+    from_date = datetime.strptime(since, "%Y-%m-%d") if since else to_date - timedelta(days=days)
 
     form_data = {
         "__VIEWSTATE": viewstate,
@@ -134,7 +145,7 @@ def _scrape_bse_aspnet(session, days):
         "__EVENTVALIDATION": event_validation,
         "ctl00$ContentPlaceHolder1$rdbPeriod": "rdbPeriod",
         "ctl00$ContentPlaceHolder1$txtFromDt": from_date.strftime("%d/%m/%Y"),
-        "ctl00$ContentPlaceHolder1$txtToDate": today.strftime("%d/%m/%Y"),
+        "ctl00$ContentPlaceHolder1$txtToDate": to_date.strftime("%d/%m/%Y"),
         "ctl00$ContentPlaceHolder1$ddlSegName": "",
         "ctl00$ContentPlaceHolder1$ddlCategoryName": "",
         "ctl00$ContentPlaceHolder1$btnSubmit": "Submit",
@@ -144,6 +155,7 @@ def _scrape_bse_aspnet(session, days):
         "Referer": listing_url,
         "Accept": "text/html",
     }, timeout=30)
+    resp.raise_for_status()
 
     soup = BeautifulSoup(resp.text, "lxml")
     circulars = []
@@ -194,7 +206,7 @@ def _parse_bse_date(text):
     return datetime.now().strftime("%Y-%m-%d")
 
 
-def _extract_pdf_url(session, detail_url):
+def _fetch_pdf_url(session, detail_url):
     """Fetch BSE detail page and extract PDF download link."""
     if not detail_url:
         return None
@@ -203,6 +215,8 @@ def _extract_pdf_url(session, detail_url):
         "Accept": "text/html",
         "User-Agent": HEADERS["User-Agent"],
     })
+    # A 403/5xx raises (retried next run) instead of being cached as "no PDF"
+    resp.raise_for_status()
     soup = BeautifulSoup(resp.text, "lxml")
 
     # Look for DownloadAttach.aspx links
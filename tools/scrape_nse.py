@@ -1,13 +1,17 @@
 """
 Tool: NSE Circular Scraper
 Fetches circulars from NSE India via their internal JSON API.
-Uses session-first cookie pattern to handle Akamai Bot Manager.
+Uses session-first cookie pattern to handle Akamai Bot Manager
+(cookies shared via exchange_sessions).
 """
 
 import time
 import requests
 from datetime import datetime, timedelta
 
+import exchange_sessions
+import metrics
+
 NSE_BASE = "https://www.nseindia.com"
 CIRCULARS_API = "/api/circulars"
 ARCHIVES_BASE = "https://nsearchives.nseindia.com"
@@ -24,34 +28,35 @@ HEADERS = {
 }
 
 
-def scrape_nse(days=7):
+def scrape_nse(days=7, since=None, until=None):
     """
-    Scrape NSE circulars from the last `days` days.
+    Scrape NSE circulars from the last `days` days, or from `since` (YYYY-MM-DD) if given,
+    up to `until` (YYYY-MM-DD, default today).
     Returns list of dicts matching the standard circular shape.
+    Raises RuntimeError if the cookie handshake or the API call fails, so an
+    outage is never mistaken for a window with no circulars.
     """
-    session = requests.Session()
+    session = metrics.instrument(requests.Session())
     session.headers.update(HEADERS)
 
-    # Step 1: Acquire Akamai cookies by visiting homepage
+    # Step 1: Acquire Akamai cookies (shared jar — homepage visited once per cookie lifetime)
     try:
-        session.get(NSE_BASE + "/", timeout=10)
-        time.sleep(1)
+        exchange_sessions.get("NSE").apply(session)
     except Exception as e:
-        print(f"[NSE] Failed to acquire cookies: {e}")
-        return []
+        raise RuntimeError(f"NSE cookie handshake failed: {e}") from e
 
     # Step 2: Call circulars API
-    today = datetime.now()
-    from_date = today - timedelta(days=days)
+    to_date = datetime.strptime(until, "%Y-%m-%d") if until else datetime.now()
+    from_date = datetime.strptime(since, "%Y-%m-%d") if since else to_date - timedelta(days=days)
 
     params = {
         "from_date": from_date.strftime("%d-%m-%Y"),
-        "to_date": today.strftime("%d-%m-%Y"),
+        "to_date": to_date.strftime("%d-%m-%Y"),
     }
 
     data = _fetch_with_retry(session, NSE_BASE + CIRCULARS_API, params)
     if data is None:
-        return []
+        raise RuntimeError("NSE circulars API failed after retries")
 
     # Step 3: Parse response
     circulars = []
@@ -102,17 +107,20 @@ def _fetch_with_retry(session, url, params, max_retries=3):
                 return resp.json()
             elif resp.status_code == 403:
                 print(f"[NSE] Got 403, re-acquiring cookies (attempt {attempt + 1}/{max_retries})")
+                metrics.inc("circulars_http_retries_total", source="NSE", reason="403")
                 session.cookies.clear()
-                session.get(NSE_BASE + "/", timeout=10)
-                time.sleep(2)
+                session.cookies.update(exchange_sessions.get("NSE").refresh())
+                time.sleep(1)
             else:
                 print(f"[NSE] Unexpected status: {resp.status_code}")
                 return None
         except requests.exceptions.JSONDecodeError:
             print(f"[NSE] Invalid JSON response (attempt {attempt + 1})")
+            metrics.inc("circulars_http_retries_total", source="NSE", reason="invalid_json")
             time.sleep(1)
         except Exception as e:
             print(f"[NSE] Request failed: {e}")
+            metrics.inc("circulars_http_retries_total", source="NSE", reason="error")
             time.sleep(1)
 
     print("[NSE] All retries exhausted")
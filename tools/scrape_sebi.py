@@ -5,43 +5,58 @@ Requires session cookie (JSESSIONID) from listing page.
 """
 
 import re
-import time
 import requests
 from datetime import datetime, timedelta
 from urllib.parse import urljoin, parse_qs, urlparse
 from bs4 import BeautifulSoup
 
+import exchange_sessions
+import metrics
+from pdf_resolver import resolve_pdf_urls
+
 LISTING_URL = "https://www.sebi.gov.in/sebiweb/home/HomeAction.do?doListing=yes&sid=1&ssid=7&smid=0"
 AJAX_URL = "https://www.sebi.gov.in/sebiweb/ajax/home/getnewslistinfo.jsp"
 BASE_URL = "https://www.sebi.gov.in"
 
+# Detail page fetch rate (requests/second) and burst, per host
+DETAIL_RATE = 3.0
+DETAIL_BURST = 3
+
+# Safety stop for listing pagination
+MAX_PAGES = 400
+
 HEADERS = {
     "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
     "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
 }
 
 
-def scrape_sebi(days=7):
+def scrape_sebi(days=7, resolve_pdfs=True, since=None, until=None, max_pages=MAX_PAGES):
     """
-    Scrape SEBI circulars from the last `days` days.
+    Scrape SEBI circulars from the last `days` days, or from `since` (YYYY-MM-DD) if given,
+    up to `until` (YYYY-MM-DD, default today).
     Returns list of dicts: {title, circular_number, published_date, detail_url, pdf_url, category, department}
+    The listing is paginated (nextValue); pages are walked until one adds nothing new.
+    With resolve_pdfs=False, pdf_url is left None for resolve_pdf_links() to fill later.
+    Raises RuntimeError if a listing page fails, so a partial listing is never
+    mistaken for a complete one.
     """
-    session = requests.Session()
+    session = metrics.instrument(requests.Session())
     session.headers.update(HEADERS)
 
-    # Step 1: Get session cookie
-    session.get(LISTING_URL, timeout=15)
+    # Step 1: Get session cookie (shared jar — listing page visited once per cookie lifetime)
+    exchange_sessions.get("SEBI").apply(session)
 
-    # Step 2: Query by date range
-    today = datetime.now()
-    from_date = today - timedelta(days=days)
+    # Step 2: Query by date range, one listing page at a time
+    to_date = datetime.strptime(until, "%Y-%m-%d") if until else datetime.now()
+    from_date = datetime.strptime(since, "%Y-%m-%d") if since else to_date - timedelta(days=days)
 
     form_data = {
         "nextValue": "1",
         "next": "s",
         "search": "",
         "fromDate": from_date.strftime("%d-%m-%Y"),
-        "toDate": today.strftime("%d-%m-%Y"),
+        "toDate": to_date.strftime("%d-%m-%Y"),
         "fromYear": "",
         "toYear": "",
         "deptId": "-1",
@@ -56,26 +71,53 @@ def scrape_sebi(days=7):
         "doDirect": "-1",
     }
 
-    resp = session.post(
-        AJAX_URL,
-        data=form_data,
-        headers={
-            "Content-Type": "application/x-www-form-urlencoded",
-            "Referer": LISTING_URL,
-        },
-        timeout=15,
-    )
+    circulars = []
+    seen = set()
+    for page in range(1, max_pages + 1):
+        if page > 1:
+            form_data.update(nextValue=str(page), next="n")
+        rows = [c for c in _parse_listing(_fetch_listing(session, form_data))
+                if c["detail_url"] not in seen]
+        # The last page is served again (or empty) once we run past the end
+        if not rows:
+            break
+        seen.update(c["detail_url"] for c in rows)
+        circulars.extend(rows)
+    else:
+        raise RuntimeError(f"SEBI listing still had new rows after {max_pages} pages "
+                           f"({from_date:%Y-%m-%d}..{to_date:%Y-%m-%d}); narrow the window")
+
+    # Step 4: Extract PDF URLs from detail pages
+    if resolve_pdfs:
+        resolve_pdf_links(circulars, session)
+
+    return circulars
+
+
+def _fetch_listing(session, form_data):
+    """POST one listing page; re-establishes the session once on a 530."""
+    headers = {
+        "Content-Type": "application/x-www-form-urlencoded",
+        "Referer": LISTING_URL,
+    }
+    resp = session.post(AJAX_URL, data=form_data, headers=headers, timeout=15)
 
     if resp.status_code == 530:
         # Re-establish session
-        session.get(LISTING_URL, timeout=15)
-        resp = session.post(AJAX_URL, data=form_data, headers={
-            "Content-Type": "application/x-www-form-urlencoded",
-            "Referer": LISTING_URL,
-        }, timeout=15)
-
-    # Step 3: Parse HTML response (split by #@#, take first fragment)
-    html_content = resp.text.split("#@#")[0]
+        metrics.inc("circulars_http_retries_total", source="SEBI", reason="530")
+        session.cookies.clear()
+        session.cookies.update(exchange_sessions.get("SEBI").refresh())
+        resp = session.post(AJAX_URL, data=form_data, headers=headers, timeout=15)
+    resp.raise_for_status()
+    # Listing fragments always carry the '#@#' paging trailer; error pages do not
+    if "#@#" not in resp.text:
+        raise RuntimeError(f"SEBI listing page {form_data['nextValue']} returned no listing")
+    return resp.text
+
+
+def _parse_listing(text):
+    """Step 3: Parse HTML response (split by #@#, take first fragment)."""
+    html_content = text.split("#@#")[0]
     soup = BeautifulSoup(html_content, "lxml")
 
     circulars = []
@@ -111,18 +153,16 @@ def scrape_sebi(days=7):
             "category": "Circular",
             "department": "SEBI",
         })
+    return circulars
 
-    # Step 4: Extract PDF URLs from detail pages
-    for circular in circulars:
-        if circular["detail_url"]:
-            try:
-                pdf_url = _extract_pdf_url(session, circular["detail_url"])
-                circular["pdf_url"] = pdf_url
-                time.sleep(0.5)  # Rate limit
-            except Exception as e:
-                print(f"  [SEBI] Failed to get PDF for: {circular['title'][:50]} — {e}")
 
-    return circulars
+def resolve_pdf_links(circulars, session=None):
+    """Fill pdf_url from detail pages (parallel, rate limited per host). Mutates in place."""
+    if session is None:
+        session = metrics.instrument(requests.Session())
+        session.headers.update(HEADERS)
+    return resolve_pdf_urls(session, circulars, _fetch_pdf_url, "SEBI",
+                            rate=DETAIL_RATE, burst=DETAIL_BURST)
 
 
 def _extract_id_from_url(url):
@@ -131,9 +171,11 @@ def _extract_id_from_url(url):
     return match.group(1) if match else None
 
 
-def _extract_pdf_url(session, detail_url):
+def _fetch_pdf_url(session, detail_url):
     """Fetch detail page and extract PDF URL from iframe."""
     resp = session.get(detail_url, timeout=15)
+    # A 403/5xx raises (retried next run) instead of being cached as "no PDF"
+    resp.raise_for_status()
     soup = BeautifulSoup(resp.text, "lxml")
 
     iframe = soup.find("iframe")
@@ -0,0 +1,541 @@
+"""
+Tool: SQLite Store
+Embedded alternative to Supabase for single-node deployments, offline runs and
+benchmarks. Selected with STORAGE_BACKEND=sqlite (file: SQLITE_PATH, default
+.tmp/circulars.db); supabase_client.get_client() then returns a SQLiteClient.
+
+SQLiteClient implements the slice of the supabase-py query builder this repo uses —
+table().select/insert/upsert/update/delete, eq/neq/gt/gte/lt/lte/in_/is_/not_/or_,
+order/limit/range, count="exact"/head=True — plus rpc() for the SQL functions in
+sql/ (search, stats, categories refresh), so callers do not change.
+
+The schema mirrors the Postgres one: WAL mode, UNIQUE(source, detail_url),
+(source, published_date, id) and (published_date, id) indexes, an FTS5 index over
+title, circular number and body text, and data_versions bumped by triggers.
+"""
+
+import os
+import re
+import sqlite3
+import threading
+import uuid
+from datetime import date, timedelta
+
+DEFAULT_PATH = os.path.join(os.path.dirname(__file__), '..', '.tmp', 'circulars.db')
+
+IDENTIFIER = re.compile(r"^[a-z_][a-z0-9_]*$")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS circulars (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    id TEXT NOT NULL UNIQUE,
+    source TEXT NOT NULL,
+    title TEXT NOT NULL,
+    circular_number TEXT,
+    published_date TEXT NOT NULL,
+    detail_url TEXT NOT NULL DEFAULT '',
+    pdf_url TEXT,
+    category TEXT,
+    department TEXT,
+    created_at TEXT NOT NULL DEFAULT (strftime('%Y-%m-%dT%H:%M:%fZ', 'now')),
+    pdf_sha256 TEXT,
+    pdf_size INTEGER,
+    pdf_content_type TEXT,
+    body_text TEXT,
+    page_count INTEGER,
+    text_sha256 TEXT,
+    UNIQUE (source, detail_url)
+);
+CREATE INDEX IF NOT EXISTS circulars_published_idx ON circulars (published_date DESC, id DESC);
+CREATE INDEX IF NOT EXISTS circulars_source_published_idx
+    ON circulars (source, published_date DESC, id DESC);
+CREATE INDEX IF NOT EXISTS circulars_pdf_pending_idx ON circulars (published_date DESC)
+    WHERE pdf_url IS NOT NULL AND pdf_sha256 IS NULL;
+CREATE INDEX IF NOT EXISTS circulars_text_pending_idx ON circulars (published_date DESC)
+    WHERE pdf_sha256 IS NOT NULL AND text_sha256 IS NULL;
+
+CREATE TABLE IF NOT EXISTS bookmarks (
+    circular_id TEXT PRIMARY KEY,
+    created_at TEXT NOT NULL DEFAULT (strftime('%Y-%m-%dT%H:%M:%fZ', 'now'))
+);
+
+CREATE TABLE IF NOT EXISTS circular_categories (
+    source TEXT NOT NULL,
+    category TEXT NOT NULL,
+    n INTEGER NOT NULL,
+    PRIMARY KEY (source, category)
+);
+
+CREATE TABLE IF NOT EXISTS data_versions (
+    key TEXT PRIMARY KEY,
+    version INTEGER NOT NULL DEFAULT 0,
+    updated_at TEXT NOT NULL DEFAULT (strftime('%Y-%m-%dT%H:%M:%fZ', 'now'))
+);
+INSERT OR IGNORE INTO data_versions (key) VALUES ('circulars'), ('bookmarks');
+"""
+
+# SQLite has no statement-level triggers; one bump per row is cheap inside a transaction
+VERSION_TRIGGERS = """
+CREATE TRIGGER IF NOT EXISTS {table}_version_{event} AFTER {event} ON {table}
+BEGIN
+    UPDATE data_versions
+    SET version = version + 1, updated_at = strftime('%Y-%m-%dT%H:%M:%fZ', 'now')
+    WHERE key = '{table}';
+END;
+"""
+
+FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS circulars_fts USING fts5(
+    title, circular_number, body_text,
+    content='circulars', content_rowid='seq', tokenize='porter unicode61'
+);
+CREATE TRIGGER IF NOT EXISTS circulars_fts_insert AFTER INSERT ON circulars BEGIN
+    INSERT INTO circulars_fts (rowid, title, circular_number, body_text)
+    VALUES (new.seq, new.title, new.circular_number, new.body_text);
+END;
+CREATE TRIGGER IF NOT EXISTS circulars_fts_delete AFTER DELETE ON circulars BEGIN
+    INSERT INTO circulars_fts (circulars_fts, rowid, title, circular_number, body_text)
+    VALUES ('delete', old.seq, old.title, old.circular_number, old.body_text);
+END;
+CREATE TRIGGER IF NOT EXISTS circulars_fts_update AFTER UPDATE OF title, circular_number, body_text
+ON circulars BEGIN
+    INSERT INTO circulars_fts (circulars_fts, rowid, title, circular_number, body_text)
+    VALUES ('delete', old.seq, old.title, old.circular_number, old.body_text);
+    INSERT INTO circulars_fts (rowid, title, circular_number, body_text)
+    VALUES (new.seq, new.title, new.circular_number, new.body_text);
+END;
+"""
+
+# Tables whose rows get a generated text id when inserted without one
+GENERATED_IDS = {"circulars"}
+# Internal columns never returned by select("*")
+HIDDEN_COLUMNS = {"seq"}
+
+SEARCH_FIELDS = ("id", "title", "circular_number", "published_date", "source", "category",
+                 "pdf_url", "detail_url")
+
+
+class QueryError(ValueError):
+    """Malformed query (unknown table/column, bad filter) — PostgREST would answer 400."""
+
+
+class Result:
+    """Same shape as postgrest's APIResponse: .data and .count."""
+
+    def __init__(self, data, count=None):
+        self.data = data
+        self.count = count
+
+
+def _split_top_level(expr):
+    """Split a PostgREST or=(...) body on commas that are not inside parentheses."""
+    parts, depth, current = [], 0, ""
+    for ch in expr:
+        if ch == "," and depth == 0:
+            parts.append(current)
+            current = ""
+            continue
+        depth += ch == "("
+        depth -= ch == ")"
+        current += ch
+    if current:
+        parts.append(current)
+    return parts
+
+
+def parse_filter(term):
+    """
+    PostgREST logical filter → tree: 'col.op.value' → (column, op, value);
+    'and(...)' / 'or(...)' → ("and" | "or", [subtrees]).
+    benchmarks/fake_supabase.py evaluates the same trees, so both stand-ins read or_() alike.
+    """
+    match = re.fullmatch(r"(and|or)\((.*)\)", term)
+    if match:
+        return match.group(1), [parse_filter(t) for t in _split_top_level(match.group(2))]
+    try:
+        column, op, value = term.split(".", 2)
+    except ValueError:
+        raise QueryError(f"Bad filter: {term}")
+    return column, op, value
+
+
+_OPERATORS = {"eq": "=", "neq": "!=", "gt": ">", "gte": ">=", "lt": "<", "lte": "<="}
+
+
+class Query:
+    def __init__(self, client, table):
+        self.client = client
+        self.table = table
+        self.action = "select"
+        self.columns = "*"
+        self.count = None
+        self.head = False
+        self.where = []     # (sql, params)
+        self.orders = []
+        self.limit_n = None
+        self.offset = 0
+        self.payload = None
+        self.on_conflict = None
+        self._negate = False
+
+    # --- actions ---
+    def select(self, columns="*", count=None, head=False):
+        self.columns, self.count, self.head = columns, count, head
+        return self
+
+    def insert(self, rows):
+        self.action, self.payload = "insert", rows
+        return self
+
+    def upsert(self, rows, on_conflict=None, **kwargs):
+        self.action, self.payload, self.on_conflict = "upsert", rows, on_conflict
+        return self
+
+    def update(self, values):
+        self.action, self.payload = "update", values
+        return self
+
+    def delete(self):
+        self.action = "delete"
+        return self
+
+    # --- filters ---
+    @property
+    def not_(self):
+        self._negate = True
+        return self
+
+    def _add(self, sql, params=()):
+        if self._negate:
+            self._negate = False
+            sql = f"NOT ({sql})"
+        self.where.append((sql, list(params)))
+        return self
+
+    def _column(self, name):
+        return self.client.column(self.table, name)
+
+    def _compare(self, column, op, value):
+        return self._add(f"{self._column(column)} {_OPERATORS[op]} ?", [value])
+
+    def eq(self, column, value):
+        return self._compare(column, "eq", value)
+
+    def neq(self, column, value):
+        return self._compare(column, "neq", value)
+
+    def gt(self, column, value):
+        return self._compare(column, "gt", value)
+
+    def gte(self, column, value):
+        return self._compare(column, "gte", value)
+
+    def lt(self, column, value):
+        return self._compare(column, "lt", value)
+
+    def lte(self, column, value):
+        return self._compare(column, "lte", value)
+
+    def in_(self, column, values):
+        values = list(values)
+        if not values:
+            return self._add("0")
+        return self._add(f"{self._column(column)} IN ({', '.join('?' * len(values))})", values)
+
+    def is_(self, column, value):
+        if str(value).lower() == "null":
+            return self._add(f"{self._column(column)} IS NULL")
+        return self._add(f"{self._column(column)} IS ?", [value])
+
+    def or_(self, expr):
+        sql, params = self._condition(parse_filter(f"or({expr})"))
+        return self._add(sql, params)
+
+    def _condition(self, node):
+        """parse_filter() tree → (sql, params)."""
+        if len(node) == 2:
+            parts = [self._condition(child) for child in node[1]]
+            joiner = f" {node[0].upper()} "
+            return "(" + joiner.join(sql for sql, _ in parts) + ")", [p for _, ps in parts for p in ps]
+        column, op, value = node
+        if op == "is":
+            return (f"{self._column(column)} IS NULL", []) if value == "null" else \
+                (f"{self._column(column)} IS ?", [value])
+        if op not in _OPERATORS:
+            raise QueryError(f"Unsupported operator: {op}")
+        return f"{self._column(column)} {_OPERATORS[op]} ?", [value]
+
+    # --- shaping ---
+    def order(self, column, desc=False):
+        self.orders.append(f"{self._column(column)} {'DESC' if desc else 'ASC'}")
+        return self
+
+    def limit(self, n):
+        self.limit_n = int(n)
+        return self
+
+    def range(self, start, end):
+        self.offset, self.limit_n = int(start), int(end) - int(start) + 1
+        return self
+
+    # --- execution ---
+    def _where_sql(self):
+        if not self.where:
+            return "", []
+        return " WHERE " + " AND ".join(sql for sql, _ in self.where), \
+            [p for _, params in self.where for p in params]
+
+    def execute(self):
+        return getattr(self, "_" + self.action)(self.client.conn())
+
+    def _select(self, conn):
+        where, params = self._where_sql()
+        count = None
+        if self.count:
+            count = conn.execute(f"SELECT count(*) FROM {self.table}{where}", params).fetchone()[0]
+        if self.head:
+            return Result([], count)
+
+        if self.columns.strip() == "*":
+            columns = [c for c in self.client.columns(self.table) if c not in HIDDEN_COLUMNS]
+        else:
+            columns = [self._column(c.strip()) for c in self.columns.split(",") if c.strip()]
+        sql = f"SELECT {', '.join(columns)} FROM {self.table}{where}"
+        if self.orders:
+            sql += " ORDER BY " + ", ".join(self.orders)
+        if self.limit_n is not None or self.offset:
+            sql += " LIMIT ? OFFSET ?"
+            params = params + [self.limit_n if self.limit_n is not None else -1, self.offset]
+        rows = conn.execute(sql, params).fetchall()
+        return Result([dict(zip(columns, row)) for row in rows], count)
+
+    def _rows(self):
+        rows = self.payload if isinstance(self.payload, list) else [self.payload]
+        if self.table in GENERATED_IDS:
+            rows = [row if row.get("id") else {**row, "id": str(uuid.uuid4())} for row in rows]
+        return rows
+
+    def _write_rows(self, conn, conflict_sql=""):
+        rows = self._rows()
+        if not rows:
+            return Result([])
+        # Group by column set so each group is one executemany
+        groups = {}
+        for row in rows:
+            groups.setdefault(tuple(row), []).append(row)
+        with conn:
+            for keys, group in groups.items():
+                columns = [self._column(k) for k in keys]
+                sql = (f"INSERT INTO {self.table} ({', '.join(columns)}) "
+                       f"VALUES ({', '.join('?' * len(columns))}){conflict_sql(columns) if conflict_sql else ''}")
+                conn.executemany(sql, [[row[k] for k in keys] for row in group])
+        return Result(rows)
+
+    def _insert(self, conn):
+        return self._write_rows(conn)
+
+    def _upsert(self, conn):
+        if not self.on_conflict:
+            return self._write_rows(conn)
+        target = [self._column(c.strip()) for c in self.on_conflict.split(",")]
+
+        def conflict_sql(columns):
+            updates = [c for c in columns if c not in target and c != "id"]
+            if not updates:
+                return f" ON CONFLICT ({', '.join(target)}) DO NOTHING"
+            return (f" ON CONFLICT ({', '.join(target)}) DO UPDATE SET "
+                    + ", ".join(f"{c} = excluded.{c}" for c in updates))
+
+        return self._write_rows(conn, conflict_sql)
+
+    def _update(self, conn):
+        where, params = self._where_sql()
+        columns = [self._column(k) for k in self.payload]
+        sql = f"UPDATE {self.table} SET {', '.join(f'{c} = ?' for c in columns)}{where}"
+        with conn:
+            conn.execute(sql, list(self.payload.values()) + params)
+        return Result([])
+
+    def _delete(self, conn):
+        where, params = self._where_sql()
+        with conn:
+            conn.execute(f"DELETE FROM {self.table}{where}", params)
+        return Result([])
+
+
+class RPC:
+    def __init__(self, client, name, params):
+        self.client = client
+        self.name = name
+        self.params = params or {}
+
+    def execute(self):
+        fn = getattr(self.client, "_rpc_" + self.name, None)
+        if fn is None:
+            raise QueryError(f"Unknown function: {self.name}")
+        return Result(fn(self.client.conn(), **self.params))
+
+
+class SQLiteClient:
+    """Drop-in for the supabase-py Client, backed by one SQLite file."""
+
+    def __init__(self, path=None):
+        self.path = os.path.abspath(path or os.getenv("SQLITE_PATH") or DEFAULT_PATH)
+        self._local = threading.local()
+        self._conns = set()   # every thread's open connection, for close()
+        self._conns_lock = threading.Lock()
+        self._columns = {}
+        self._lock = threading.Lock()
+        self.fts = True
+        self._init_schema()
+
+    @property
+    def postgrest(self):
+        return self
+
+    def conn(self):
+        """One connection per thread (the API and pipeline call in from thread pools)."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None or conn not in self._conns:
+            # check_same_thread=False only so close() can close it from another thread
+            conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            with self._conns_lock:
+                self._conns.add(conn)
+            self._local.conn = conn
+        return conn
+
+    def close(self):
+        """Close every thread's connection; a thread that calls in again reconnects."""
+        with self._conns_lock:
+            conns, self._conns = self._conns, set()
+        for conn in conns:
+            conn.close()
+        self._local.conn = None
+
+    def _init_schema(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        conn = self.conn()
+        with conn:
+            conn.executescript(SCHEMA)
+            for table in ("circulars", "bookmarks"):
+                for event in ("INSERT", "UPDATE", "DELETE"):
+                    conn.executescript(VERSION_TRIGGERS.format(table=table, event=event))
+        try:
+            with conn:
+                conn.executescript(FTS_SCHEMA)
+        except sqlite3.OperationalError as e:
+            # SQLite built without FTS5: search falls back to LIKE
+            print(f"[SQLite] FTS5 unavailable, search will scan: {e}")
+            self.fts = False
+
+    def columns(self, table):
+        with self._lock:
+            if table not in self._columns:
+                rows = self.conn().execute(f"PRAGMA table_info({table})").fetchall() \
+                    if IDENTIFIER.match(table) else []
+                if not rows:
+                    raise QueryError(f"Unknown table: {table}")
+                self._columns[table] = [r[1] for r in rows]
+            return self._columns[table]
+
+    def column(self, table, name):
+        if name not in self.columns(table):
+            raise QueryError(f"Unknown column: {table}.{name}")
+        return name
+
+    def table(self, name):
+        self.columns(name)
+        return Query(self, name)
+
+    def rpc(self, name, params=None):
+        return RPC(self, name, params)
+
+    # --- SQL functions (sql/003, 005, 006) ---
+    def _rpc_search_circulars(self, conn, q, source_filter=None, page_size=20, page_offset=0):
+        terms = re.findall(r"\w+", q)
+        if not terms:
+            return []
+        if self.fts:
+            # Implicit AND of quoted terms; bm25 weights mirror setweight A/A/C
+            match = " ".join('"' + t.replace('"', '""') + '"' for t in terms)
+            # bm25() is only valid in the MATCH query itself, so rank first, then count
+            sql = (
+                "WITH hits AS (SELECT rowid AS seq, -bm25(circulars_fts, 10.0, 10.0, 1.0) AS rank"
+                " FROM circulars_fts WHERE circulars_fts MATCH ?)"
+                f" SELECT {', '.join('c.' + f for f in SEARCH_FIELDS)}, hits.rank,"
+                " count(*) OVER () AS total FROM hits JOIN circulars c ON c.seq = hits.seq"
+                " WHERE (? IS NULL OR c.source = ?)"
+                " ORDER BY hits.rank DESC, c.published_date DESC, c.id DESC LIMIT ? OFFSET ?"
+            )
+            params = [match, source_filter, source_filter, page_size, page_offset]
+        else:
+            like = " AND ".join(
+                "(title LIKE ? OR circular_number LIKE ? OR body_text LIKE ?)" for _ in terms
+            )
+            sql = (
+                f"SELECT {', '.join(SEARCH_FIELDS)}, 0.0 AS rank, count(*) OVER () AS total"
+                f" FROM circulars WHERE {like} AND (? IS NULL OR source = ?)"
+                " ORDER BY published_date DESC, id DESC LIMIT ? OFFSET ?"
+            )
+            params = [f"%{t}%" for t in terms for _ in range(3)]
+            params += [source_filter, source_filter, page_size, page_offset]
+        names = list(SEARCH_FIELDS) + ["rank", "total"]
+        return [dict(zip(names, row)) for row in conn.execute(sql, params).fetchall()]
+
+    def _rpc_refresh_circular_stats(self, conn):
+        # Stats are computed on read from the indexed table; nothing to refresh
+        return None
+
+    def _rpc_circular_stats(self, conn, window_days=14):
+        cutoff = (date.today() - timedelta(days=int(window_days))).isoformat()
+        by_source = dict(conn.execute(
+            "SELECT source, count(*) FROM circulars WHERE published_date >= ? GROUP BY source",
+            [cutoff],
+        ).fetchall())
+        by_category = [
+            {"source": s, "category": c, "count": n}
+            for s, c, n in conn.execute(
+                "SELECT source, trim(category) AS c, count(*) AS n FROM circulars"
+                " WHERE published_date >= ? AND trim(coalesce(category, '')) <> ''"
+                " GROUP BY source, c ORDER BY n DESC, source, c",
+                [cutoff],
+            ).fetchall()
+        ]
+        by_day = [
+            {"date": d, "source": s, "count": n}
+            for d, s, n in conn.execute(
+                "SELECT published_date, source, count(*) FROM circulars WHERE published_date >= ?"
+                " GROUP BY published_date, source ORDER BY published_date, source",
+                [cutoff],
+            ).fetchall()
+        ]
+        return {
+            "by_source": by_source,
+            "by_category": by_category,
+            "by_day": by_day,
+            "total": sum(by_source.values()),
+        }
+
+    def _rpc_refresh_circular_categories(self, conn, sources=None):
+        scope, params = "", []
+        if sources:
+            scope = f" AND source IN ({', '.join('?' * len(sources))})"
+            params = list(sources)
+        with conn:
+            conn.execute(f"DELETE FROM circular_categories WHERE 1{scope}", params)
+            conn.execute(
+                "INSERT INTO circular_categories (source, category, n)"
+                " SELECT source, trim(category), count(*) FROM circulars"
+                f" WHERE trim(coalesce(category, '')) <> ''{scope}"
+                " GROUP BY source, trim(category)",
+                params,
+            )
+        return None
+
+
+if __name__ == "__main__":
+    client = SQLiteClient()
+    count = client.table("circulars").select("id", count="exact", head=True).execute().count
+    print(f"[SQLite] {client.path}: {count} circulars, FTS5 {'on' if client.fts else 'off'}")
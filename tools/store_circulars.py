@@ -1,61 +1,150 @@
 """
 Tool: Circular Storage
-Upserts scraped circulars into Supabase `circulars` table.
-Skips duplicates via UNIQUE(source, detail_url) constraint.
+Bulk-upserts scraped circulars into Supabase `circulars` table.
+Dedupes via UNIQUE(source, detail_url) constraint; unchanged rows are not re-sent.
+After a write, the aggregates behind /api/stats and /api/categories are refreshed.
 """
 
-import os
-from dotenv import load_dotenv
-from supabase import create_client
+import metrics
+from supabase_client import get_client
 
-load_dotenv(os.path.join(os.path.dirname(__file__), '..', '.env'))
+# Rows per upsert request
+BATCH_SIZE = 500
 
+# detail_urls per existence lookup (keeps the PostgREST query string short)
+LOOKUP_CHUNK = 100
 
-def get_client():
-    url = os.getenv("SUPABASE_URL")
-    key = os.getenv("SUPABASE_SERVICE_KEY")
-    return create_client(url, key)
+ROW_FIELDS = (
+    "source", "title", "circular_number", "published_date",
+    "detail_url", "pdf_url", "category", "department",
+)
 
 
-def store_circulars(circulars):
+def _to_row(c):
+    return {
+        "source": c["source"],
+        "title": c["title"],
+        "circular_number": c.get("circular_number"),
+        "published_date": c["published_date"],
+        "detail_url": c.get("detail_url", ""),
+        "pdf_url": c.get("pdf_url"),
+        # Stored trimmed: /api/categories lists trim(category), and the list filter
+        # matches the column exactly
+        "category": (c.get("category") or "").strip(),
+        "department": c.get("department", ""),
+    }
+
+
+def _fetch_existing(client, rows):
+    """Return {(source, detail_url): stored_row} for rows already in the table."""
+    existing = {}
+    by_source = {}
+    for row in rows:
+        by_source.setdefault(row["source"], []).append(row["detail_url"])
+
+    for source, urls in by_source.items():
+        for i in range(0, len(urls), LOOKUP_CHUNK):
+            result = (
+                client.table("circulars")
+                .select(", ".join(ROW_FIELDS))
+                .eq("source", source)
+                .in_("detail_url", urls[i:i + LOOKUP_CHUNK])
+                .execute()
+            )
+            for r in result.data:
+                existing[(r["source"], r["detail_url"])] = r
+    return existing
+
+
+def _tally(counts, kind, row):
+    counts[kind] += 1
+    metrics.inc("circulars_rows_total", source=row["source"], result=kind)
+
+
+def _upsert(client, rows):
+    client.table("circulars").upsert(
+        rows,
+        on_conflict="source,detail_url",
+    ).execute()
+
+
+def refresh_aggregates(client=None, sources=None):
+    """
+    Rebuild the precomputed stats and categories (sql/005, sql/006), the latter
+    only for `sources` if given. Failures are logged, not raised.
     """
-    Upsert a list of circular dicts into Supabase.
-    Returns (inserted, skipped) counts.
+    client = client or get_client()
+    try:
+        client.rpc("refresh_circular_stats").execute()
+        client.rpc("refresh_circular_categories", {
+            "sources": sorted(sources) if sources else None,
+        }).execute()
+    except Exception as e:
+        print(f"  [Store] Aggregate refresh failed — {e}")
+
+
+def store_circulars(circulars, batch_size=BATCH_SIZE, refresh=True):
+    """
+    Upsert a list of circular dicts into Supabase in chunks of `batch_size`.
+    Rows identical to what is already stored are not re-sent.
+    If a chunk fails, its rows are retried one by one so a bad row is isolated.
+    refresh=False skips refresh_aggregates() (bulk loads call it once at the end).
+    Returns counts: {inserted, updated, unchanged, failed}.
     """
+    counts = {"inserted": 0, "updated": 0, "unchanged": 0, "failed": 0}
     if not circulars:
-        return 0, 0
+        return counts
 
     client = get_client()
-    inserted = 0
-    skipped = 0
 
+    # Last occurrence wins — a batch may not touch the same key twice
+    rows = {}
     for c in circulars:
-        row = {
-            "source": c["source"],
-            "title": c["title"],
-            "circular_number": c.get("circular_number"),
-            "published_date": c["published_date"],
-            "detail_url": c.get("detail_url", ""),
-            "pdf_url": c.get("pdf_url"),
-            "category": c.get("category", ""),
-            "department": c.get("department", ""),
-        }
+        row = _to_row(c)
+        rows[(row["source"], row["detail_url"])] = row
+    rows = list(rows.values())
 
+    for i in range(0, len(rows), max(1, batch_size)):
+        chunk = rows[i:i + batch_size]
         try:
-            client.table("circulars").upsert(
-                row,
-                on_conflict="source,detail_url",
-            ).execute()
-            inserted += 1
+            existing = _fetch_existing(client, chunk)
         except Exception as e:
-            err_msg = str(e)
-            if "duplicate" in err_msg.lower() or "conflict" in err_msg.lower():
-                skipped += 1
+            print(f"  [Store] Lookup failed, counting chunk as new — {e}")
+            existing = {}
+
+        pending = []
+        for row in chunk:
+            stored = existing.get((row["source"], row["detail_url"]))
+            if stored is None:
+                pending.append(("inserted", row))
+            elif any(stored.get(f) != row[f] for f in ROW_FIELDS):
+                pending.append(("updated", row))
             else:
-                print(f"  [Store] Error: {c['title'][:50]} — {e}")
-                skipped += 1
+                _tally(counts, "unchanged", row)
+
+        if not pending:
+            continue
+
+        try:
+            _upsert(client, [row for _, row in pending])
+            for kind, row in pending:
+                _tally(counts, kind, row)
+            continue
+        except Exception as e:
+            print(f"  [Store] Batch of {len(pending)} failed, retrying row by row — {e}")
+
+        for kind, row in pending:
+            try:
+                _upsert(client, row)
+                _tally(counts, kind, row)
+            except Exception as e:
+                print(f"  [Store] Error: {row['title'][:50]} — {e}")
+                _tally(counts, "failed", row)
+
+    if refresh and (counts["inserted"] or counts["updated"]):
+        refresh_aggregates(client, {row["source"] for row in rows})
 
-    return inserted, skipped
+    return counts
 
 
 if __name__ == "__main__":
@@ -0,0 +1,155 @@
+"""
+Tool: Supabase Client
+One lazily created Supabase client per process, shared by the API server and the pipeline.
+Its PostgREST transport is a single pooled httpx.Client (thread-safe), so TLS
+connections are reused across requests and FastAPI threadpool workers.
+
+STORAGE_BACKEND=sqlite swaps in the embedded store from sqlite_store.py (file at
+SQLITE_PATH); callers use the same query builder either way.
+
+The async API server uses get_async_client(): supabase-py's AsyncClient over a
+pooled httpx.AsyncClient, so a request waiting on the database holds no thread.
+Builders are the same; only execute() is awaited.
+"""
+
+import asyncio
+import os
+import threading
+
+from dotenv import load_dotenv
+
+load_dotenv(os.path.join(os.path.dirname(__file__), '..', '.env'))
+
+_client = None
+_async_client = None
+_lock = threading.Lock()
+
+
+class SupabaseNotConfigured(RuntimeError):
+    pass
+
+
+def get_client():
+    """Return the shared client, creating it on first use."""
+    global _client
+    if _client is not None:
+        return _client
+    with _lock:
+        if _client is None:
+            if _sqlite_backend():
+                from sqlite_store import SQLiteClient
+                _client = SQLiteClient(os.getenv("SQLITE_PATH"))
+                return _client
+            from supabase import create_client
+            url = os.getenv("SUPABASE_URL")
+            key = os.getenv("SUPABASE_SERVICE_KEY")
+            if not url or not key:
+                raise SupabaseNotConfigured("SUPABASE_URL or SUPABASE_SERVICE_KEY not configured")
+            client = create_client(url, key)
+            # Under the lock, instead of lazily from whichever worker thread touches it first
+            _build_postgrest(client)
+            _client = client
+    return _client
+
+
+def _build_postgrest(client):
+    """
+    supabase-py builds the PostgREST sub-client (and its connection pool) on first
+    attribute access; do it now, at creation, rather than from a request handler.
+    """
+    postgrest = client.postgrest
+    return postgrest
+
+
+def _sqlite_backend():
+    return os.getenv("STORAGE_BACKEND", "supabase").lower() == "sqlite"
+
+
+class ThreadedAsyncClient:
+    """
+    Async view of a synchronous client (the SQLite backend, or the benchmarks'
+    fake): same builder chain, but execute() runs in a worker thread and is awaited.
+    """
+
+    def __init__(self, target):
+        self._target = target
+
+    def __getattr__(self, name):
+        attr = getattr(self._target, name)
+        if name == "execute":
+            return lambda: asyncio.to_thread(attr)
+        if callable(attr):
+            return lambda *args, **kwargs: self._wrap(attr(*args, **kwargs))
+        return self._wrap(attr)
+
+    @classmethod
+    def _wrap(cls, value):
+        if hasattr(value, "execute") or hasattr(value, "table"):
+            return cls(value)
+        return value
+
+    async def aclose(self):
+        pass
+
+
+async def get_async_client():
+    """Return the shared async client, creating it on first use."""
+    global _async_client
+    if _async_client is not None:
+        return _async_client
+    if _sqlite_backend():
+        client = ThreadedAsyncClient(get_client())
+    else:
+        from supabase import acreate_client
+        url = os.getenv("SUPABASE_URL")
+        key = os.getenv("SUPABASE_SERVICE_KEY")
+        if not url or not key:
+            raise SupabaseNotConfigured("SUPABASE_URL or SUPABASE_SERVICE_KEY not configured")
+        client = await acreate_client(url, key)
+        _build_postgrest(client)
+    # Creation does no I/O, so a racing request's spare client is simply dropped
+    with _lock:
+        if _async_client is None:
+            _async_client = client
+    return _async_client
+
+
+def warm():
+    """Create the client and open a pooled connection with one cheap query."""
+    get_client().table("circulars").select("id").limit(1).execute()
+
+
+async def awarm():
+    """warm() for the async client."""
+    client = await get_async_client()
+    await client.table("circulars").select("id").limit(1).execute()
+
+
+def close_client():
+    """Close pooled connections and drop the client (next get_client() recreates it)."""
+    global _client
+    with _lock:
+        client, _client = _client, None
+    if client is None:
+        return
+    if hasattr(client, "close"):
+        client.close()
+        return
+    session = getattr(client.postgrest, "session", None)
+    if session is not None:
+        session.close()
+
+
+async def close_async_client():
+    """Close the async client's pooled connections and drop it."""
+    global _async_client
+    with _lock:
+        client, _async_client = _async_client, None
+    if client is None:
+        return
+    if isinstance(client, ThreadedAsyncClient):
+        await client.aclose()
+        return
+    session = getattr(client.postgrest, "session", None)
+    if session is not None:
+        await session.aclose()